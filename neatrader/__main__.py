@@ -8,6 +8,9 @@ from neatrader import neatrader
 if __name__ == '__main__':
     logging.basicConfig(level=logging.ERROR)
     config_path = os.path.join('neatrader', 'config.ini')
-    generations_per_iteration = int(sys.argv[1]) if len(sys.argv) > 1 else 3
-    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else math.inf
-    neatrader.run(config_path, generations_per_iteration, iterations)
+    # --headless skips plots and network renders entirely
+    headless = '--headless' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--headless']
+    generations_per_iteration = int(args[0]) if len(args) > 0 else 3
+    iterations = int(args[1]) if len(args) > 1 else math.inf
+    neatrader.run(config_path, generations_per_iteration, iterations, headless)
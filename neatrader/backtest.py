@@ -0,0 +1,189 @@
+import argparse
+import math
+import neat
+import os
+import pandas as pd
+import pickle
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from multiprocessing import get_context
+from neatrader.checkpoint import find_checkpoints
+from neatrader.evaluation import Evaluator
+from neatrader.settings import Settings
+from neatrader.trading import PruningPolicy
+from neatrader.universe import CROSS_VALIDATION, TRAINING, Market
+
+# backtest worker state, set once per worker process
+_market = None
+_settings = None
+_networks = None
+_evaluators = {}
+
+
+def _init_worker(path, settings, genomes, config):
+    global _market, _settings, _networks
+    _market = Market(path, inputs=settings.inputs)
+    _settings = settings
+    _networks = {genome_id: neat.nn.FeedForwardNetwork.create(genome, config) for genome_id, genome in genomes}
+
+
+def _evaluator(tape):
+    evaluator = _evaluators.get(tape)
+    if evaluator is None:
+        evaluator = _evaluators[tape] = Evaluator(
+            _market.security, _market.path, _market.tape(tape), None, _settings
+        )
+        if _settings.prune:
+            # only portfolios which can no longer trade stop early, their fitness is unchanged
+            evaluator.pruning = PruningPolicy()
+    return evaluator
+
+
+def _backtest(ranges):
+    """
+    ranges: list of (tape, start, end)
+    returns: a dict of genome_id: fitness for each range and the number of days simulated
+    """
+    results = []
+    days = 0
+    for tape, start, end in ranges:
+        evaluator = _evaluator(tape)
+        window = evaluator.window(start, end)
+        results.append({genome_id: evaluator.simulate(net, window)[0] for genome_id, net in _networks.items()})
+        days += len(window) * len(_networks)
+    return results, days
+
+
+def walk_forward_ranges(dates, days, step=None):
+    """
+    Date ranges of days calendar days covering dates, starting every step days.
+    With step equal to days (the default) the ranges follow each other, with a smaller step they overlap.
+    dates: sorted trading days of a tape
+    returns: list of (start, end), each end is the last trading day of its range
+    """
+    step = step or days
+    dates = list(dates)
+    ranges = []
+    if not dates:
+        return ranges
+    start = dates[0]
+    while start + timedelta(days=days) <= dates[-1]:
+        end = dates[bisect_right(dates, start + timedelta(days=days)) - 1]
+        ranges.append((start, end))
+        start += timedelta(days=step)
+    return ranges
+
+
+def load_genomes(filename, config_file):
+    """
+    filename: a neat-checkpoint-* population or a pickled winner
+    returns: list of (genome_id, genome) and the NEAT config to build their networks with
+    """
+    if os.path.basename(filename).startswith("neat-checkpoint-"):
+        pop = neat.Checkpointer.restore_checkpoint(filename)
+        return sorted(pop.population.items()), pop.config
+    with open(filename, "rb") as f:
+        winner = pickle.load(f)
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_file
+    )
+    return [(winner.key, winner)], config
+
+
+class Backtest:
+    """
+    Simulates genomes over every walk forward window of the training and cross validation
+    tapes of a market, rather than a few random windows.
+
+    Windows are split into contiguous chunks simulated by worker processes, each worker
+    builds the genomes' networks once and keeps the option chains it loads for its
+    following windows. Every genome starts each window with 100 shares, as in training.
+    """
+    def __init__(self, path, settings, days=None, step=None, tapes=(TRAINING, CROSS_VALIDATION),
+                 workers=os.cpu_count()):
+        self.market = Market(path, inputs=settings.inputs)
+        self.settings = settings
+        self.days = days or settings.simulation_days
+        self.step = step or self.days
+        self.tapes = tapes
+        self.workers = workers
+        self.days_simulated = 0
+
+    def ranges(self):
+        """ returns: list of (tape, start, end) of every window """
+        return [
+            (tape, start, end)
+            for tape in self.tapes
+            for start, end in walk_forward_ranges(self.market.tape(tape)["date"].tolist(), self.days,
+                                                  self.step)
+        ]
+
+    def run(self, genomes, config):
+        """
+        genomes: list of (genome_id, genome)
+        returns: a DataFrame with a row per window (tape, start, end) and a column of fitness per genome id
+        """
+        ranges = self.ranges()
+        if not ranges:
+            raise Exception(f"no {self.days} day windows in the tapes of {self.market}")
+        # a few chunks per worker balance the load while keeping consecutive windows together
+        size = math.ceil(len(ranges) / (self.workers * 4))
+        chunks = [ranges[i:i + size] for i in range(0, len(ranges), size)]
+        fitness = []
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(self.market.path, self.settings, genomes, config)
+        ) as executor:
+            for results, days in executor.map(_backtest, chunks):
+                fitness.extend(results)
+                self.days_simulated += days
+
+        table = pd.DataFrame(fitness, columns=[genome_id for genome_id, _ in genomes])
+        table.insert(0, "tape", [tape for tape, _, _ in ranges])
+        table.insert(1, "start", [start for _, start, _ in ranges])
+        table.insert(2, "end", [end for _, _, end in ranges])
+        return table
+
+
+def summarize(table):
+    """ returns: a row per tape and genome with the mean, stdev, min, max and share of windows with positive fitness """
+    fitness = table.drop(columns=["start", "end"]).melt(id_vars="tape", var_name="genome", value_name="fitness")
+    fitness["positive"] = fitness["fitness"] > 0
+    groups = fitness.groupby(["tape", "genome"])
+    summary = groups["fitness"].agg(["mean", "min", "max"])
+    summary.insert(1, "stdev", groups["fitness"].std(ddof=0))
+    summary["positive"] = groups["positive"].mean()
+    # best mean first within each tape
+    return summary.sort_values("mean", ascending=False).sort_index(level="tape", sort_remaining=False, kind="stable")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="backtest genomes over walk forward windows of the whole history")
+    parser.add_argument("genomes", nargs="?", help="pickled winner or neat-checkpoint-*, defaults to the last checkpoint")
+    parser.add_argument("--config", default=os.path.join("neatrader", "config.ini"))
+    parser.add_argument("--data", default=os.path.join("resources", "data"), help="directory of the symbols' data")
+    parser.add_argument("--symbol", help="symbol to backtest, defaults to the first of the config's symbols")
+    parser.add_argument("--days", type=int, help="calendar days per window, defaults to simulation_days")
+    parser.add_argument("--step", type=int, help="days between window starts, defaults to --days")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--output", default="backtest.csv")
+    args = parser.parse_args()
+
+    settings = Settings().read(args.config)
+    filename = args.genomes or next(iter(find_checkpoints()), None)
+    if filename is None:
+        raise Exception("no winner or checkpoint to backtest")
+    genomes, config = load_genomes(filename, args.config)
+    backtest = Backtest(
+        os.path.join(args.data, args.symbol or settings.symbols[0]), settings, args.days, args.step,
+        workers=args.workers
+    )
+    table = backtest.run(genomes, config)
+    table.to_csv(args.output, index=False)
+    print(f"simulated {len(genomes)} genomes over {len(table)} windows ({backtest.days_simulated} days)")
+    print(summarize(table).to_string())
@@ -0,0 +1,132 @@
+import gzip
+import logging
+import os
+import pickle
+import random
+import re
+import threading
+from collections import deque
+from glob import glob
+from neat.reporting import BaseReporter
+
+log = logging.getLogger(__name__)
+
+
+def find_checkpoints(prefix="neat-checkpoint-"):
+    """ Returns checkpoint file names, most recent generation first """
+    return sorted(
+        glob(f"{prefix}*"),
+        key=lambda name: int(re.search(r"(\d+)$", name).group(1)),
+        reverse=True
+    )
+
+
+class AsyncCheckpointer(BaseReporter):
+    """
+    Saves the population every generation_interval generations.
+
+    The population is pickled at the generation boundary so the snapshot is consistent,
+    compression and disk I/O happen on a background thread. Files are written to a hidden
+    temporary file and renamed so a crash never leaves a partial checkpoint behind.
+    Only the most recent `keep` checkpoints are retained. The file format is the same
+    gzipped pickle neat.Checkpointer uses so neat.Checkpointer.restore_checkpoint can read it.
+    """
+    def __init__(self, generation_interval=1, keep=1, prefix="neat-checkpoint-", compresslevel=1):
+        self.generation_interval = generation_interval
+        self.keep = keep
+        self.prefix = prefix
+        self.compresslevel = compresslevel
+        self.current_generation = None
+        self.last_generation_checkpoint = -1
+        # oldest first, seeded with anything left over from a previous run
+        self.saved = deque(reversed(find_checkpoints(prefix)))
+        self.pending = None
+        self.busy = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._work, name="checkpointer", daemon=True)
+        self.thread.start()
+
+    def __getstate__(self):
+        # the species set holds on to its reporters and is pickled into every checkpoint,
+        # a restored checkpointer is inert so the writer thread is left out
+        state = self.__dict__.copy()
+        for transient in ("pending", "condition", "thread"):
+            del state[transient]
+        state["busy"] = False
+        state["closed"] = True
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pending = None
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        if self.current_generation - self.last_generation_checkpoint >= self.generation_interval:
+            self.save_checkpoint(config, population, species_set, self.current_generation)
+            self.last_generation_checkpoint = self.current_generation
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        data = pickle.dumps(
+            (generation, config, population, species_set, random.getstate()),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        with self.condition:
+            # a newer snapshot supersedes one that has not been written yet
+            self.pending = (f"{self.prefix}{generation}", data)
+            self.condition.notify_all()
+
+    def flush(self):
+        """ Blocks until every submitted checkpoint is on disk """
+        with self.condition:
+            while self.pending is not None or self.busy:
+                self.condition.wait()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                filename, data = self.pending
+                self.pending = None
+                self.busy = True
+            try:
+                self._write(filename, data)
+                self._retain(filename)
+            except Exception as e:
+                log.error(f"unable to write checkpoint {filename}: {e}")
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def _write(self, filename, data):
+        directory, name = os.path.split(filename)
+        tmp = os.path.join(directory, f".{name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=self.compresslevel))
+        os.replace(tmp, filename)
+
+    def _retain(self, filename):
+        if filename in self.saved:
+            self.saved.remove(filename)
+        self.saved.append(filename)
+        while len(self.saved) > self.keep:
+            try:
+                os.remove(self.saved.popleft())
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,276 @@
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing.managers import BaseManager
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv, tape_columns
+from neatrader.model import Security
+from neatrader.trading import PruningPolicy, Simulator
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# returned by TaskBoard.lease once the coordinator is shutting down
+STOP = "stop"
+
+# the Evaluator totals a worker returns with each task, added to the local evaluator's
+COUNTERS = ("simulations", "days_simulated", "simulations_skipped", "days_skipped", "simulations_shared")
+
+
+def parse_address(address):
+    """ host:port to a (host, port) tuple """
+    host, port = address.rsplit(":", 1)
+    return (host, int(port))
+
+
+class TaskBoard:
+    """
+    Tasks waiting to be evaluated, the workers they are leased to and their results.
+
+    A task leased to a worker that does not complete it within lease_seconds is handed
+    to the next worker asking for one. Whichever result arrives first is kept, later
+    results for the same task are ignored.
+    """
+    def __init__(self, lease_seconds=120, clock=time.monotonic):
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.pending = deque()
+        self.leases = {}
+        self.results = {}
+        self.next_id = 0
+        self.resubmitted = 0
+        self.closed = False
+
+    def submit(self, task):
+        with self.lock:
+            task_id = self.next_id
+            self.next_id += 1
+            self.tasks[task_id] = task
+            self.pending.append(task_id)
+            return task_id
+
+    def lease(self, worker):
+        """ returns: (task_id, task), None when there is nothing to do or STOP """
+        with self.lock:
+            if self.closed:
+                return STOP
+            self._expire()
+            if not self.pending:
+                return None
+            task_id = self.pending.popleft()
+            self.leases[task_id] = (self.clock() + self.lease_seconds, worker)
+            return task_id, self.tasks[task_id]
+
+    def complete(self, task_id, result):
+        """ returns: True if the result was accepted """
+        with self.lock:
+            if task_id not in self.tasks or task_id in self.results:
+                return False
+            self.results[task_id] = result
+            self.leases.pop(task_id, None)
+            if task_id in self.pending:
+                # a resubmitted task finished by its first worker after all
+                self.pending.remove(task_id)
+            return True
+
+    def collect(self, task_id):
+        """ returns: the result of a completed task and forgets the task, otherwise None """
+        with self.lock:
+            if task_id not in self.results:
+                return None
+            del self.tasks[task_id]
+            return self.results.pop(task_id)
+
+    def leased(self):
+        """ returns: the number of tasks leased to workers """
+        with self.lock:
+            return len(self.leases)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+    def _expire(self):
+        now = self.clock()
+        for task_id, (deadline, worker) in list(self.leases.items()):
+            if deadline < now:
+                log.warning(f"lease of task {task_id} by {worker} expired, resubmitting")
+                del self.leases[task_id]
+                self.pending.append(task_id)
+                self.resubmitted += 1
+
+
+class Coordinator:
+    """ serves a TaskBoard to workers over TCP with multiprocessing.managers """
+    def __init__(self, address, authkey, lease_seconds=120):
+        self.board = TaskBoard(lease_seconds)
+        # a manager class per coordinator so the registered board is never shared
+        manager_class = type("CoordinatorManager", (BaseManager,), {})
+        manager_class.register("board", callable=lambda: self.board)
+        self.server = manager_class(address=address, authkey=authkey).get_server()
+        self.address = self.server.address
+        # set by serve_forever, connected workers are served until it is set
+        self.server.stop_event = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._accept, name="coordinator", daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        # Server.serve_forever never closes its listener and retries a failed accept forever,
+        # so connections are accepted here until close()
+        while True:
+            try:
+                connection = self.server.listener.accept()
+            except OSError:
+                if self.stopped.is_set():
+                    return
+                continue
+            if self.stopped.is_set():
+                connection.close()
+                return
+            threading.Thread(target=self.server.handle_request, args=(connection,), daemon=True).start()
+
+    def wait(self, task_ids, poll_seconds=0.05, timeout=None, warn_seconds=60):
+        """
+        returns: dict of task_id: result once every task is complete
+        warn_seconds: a warning is logged every warn_seconds while tasks are outstanding,
+            so a run without workers does not wait silently
+        """
+        results = {}
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        warn_at = start + warn_seconds
+        while len(results) < len(task_ids):
+            for task_id in task_ids:
+                if task_id not in results:
+                    result = self.board.collect(task_id)
+                    if result is not None:
+                        results[task_id] = result
+            if len(results) < len(task_ids):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"{len(task_ids) - len(results)} tasks were not completed")
+                if time.monotonic() > warn_at:
+                    log.warning(
+                        f"waited {time.monotonic() - start:.0f}s for {len(task_ids) - len(results)} tasks, "
+                        f"{self.board.leased()} leased to workers"
+                    )
+                    warn_at += warn_seconds
+                time.sleep(poll_seconds)
+        return results
+
+    def close(self):
+        """
+        tells workers to stop and closes the listening socket, workers already
+        connected are still answered so they receive the stop
+        """
+        self.board.close()
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        host, port = self.address
+        try:
+            # wakes the accepting thread, a coordinator on every interface is reached on loopback
+            socket.create_connection((host if host not in ("", "0.0.0.0") else "127.0.0.1", port), timeout=5).close()
+        except OSError as e:
+            log.warning(f"could not wake the coordinator to stop it: {e}")
+        self.thread.join(5)
+        self.server.listener.close()
+
+
+class DistributedEvaluator:
+    """
+    Evaluates generations on worker processes, which may run on other hosts.
+
+    Genomes are sent in chunks along with the date ranges of the generation's windows,
+    each worker holds the data set locally and returns fitnesses. The local evaluator
+    draws the date ranges and keeps the simulation totals.
+    """
+    def __init__(self, evaluator, address, authkey, lease_seconds=120, chunk_size=10):
+        self.evaluator = evaluator
+        self.chunk_size = chunk_size
+        self.coordinator = Coordinator(address, authkey, lease_seconds)
+
+    def evaluate(self, genomes, config):
+        ranges = self.evaluator.random_ranges()
+        task_ids = [
+            self.coordinator.board.submit((genomes[i:i + self.chunk_size], config, ranges, self.evaluator.settings))
+            for i in range(0, len(genomes), self.chunk_size)
+        ]
+        fitnesses = {}
+        for chunk, counts in self.coordinator.wait(task_ids).values():
+            fitnesses.update(chunk)
+            for counter, count in counts.items():
+                setattr(self.evaluator, counter, getattr(self.evaluator, counter) + count)
+        for genome_id, genome in genomes:
+            genome.fitness = fitnesses[genome_id]
+
+    def close(self):
+        self.coordinator.close()
+
+
+class WorkerManager(BaseManager):
+    pass
+
+
+WorkerManager.register("board")
+
+
+def work(address, authkey, path, tape="training.csv", poll_seconds=0.5):
+    """
+    Evaluates tasks from a coordinator until it shuts down or goes away.
+    path: the symbol's data directory on this host, e.g. resources/data/TSLA
+    """
+    path = Path(path)
+    manager = WorkerManager(address=address, authkey=authkey)
+    manager.connect()
+    board = manager.board()
+    evaluator = None
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    windows_for = (None, None)
+
+    while True:
+        try:
+            leased = board.lease(name)
+            if leased == STOP:
+                return
+            if leased is None:
+                time.sleep(poll_seconds)
+                continue
+            task_id, (genomes, config, ranges, settings) = leased
+            if evaluator is None or tuple(evaluator.settings.inputs) != tuple(settings.inputs):
+                # only the tape columns of the coordinator's inputs are read
+                training = read_csv(path / tape, columns=tape_columns(settings.inputs))
+                evaluator = Evaluator(Security(path.name), path, training, None, settings)
+            evaluator.settings = settings
+            Simulator.chain_cache.max_size = settings.chain_cache_size
+            # the threshold of quantile pruning is set by whole generations, which workers do not see
+            evaluator.pruning = PruningPolicy() if settings.prune else None
+            # the chunks of a generation share their windows
+            if windows_for[0] != (ranges, settings.inputs):
+                windows_for = ((ranges, settings.inputs), [evaluator.window(start, end) for start, end in ranges])
+            windows = windows_for[1]
+
+            before = {counter: getattr(evaluator, counter) for counter in COUNTERS}
+            evaluator.evaluate(genomes, config, windows)
+            fitnesses = {genome_id: genome.fitness for genome_id, genome in genomes}
+            counts = {counter: getattr(evaluator, counter) - before[counter] for counter in COUNTERS}
+            board.complete(task_id, (fitnesses, counts))
+        except (EOFError, ConnectionError):
+            log.info("coordinator went away")
+            return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="evaluate genomes for a neatrader coordinator")
+    parser.add_argument("coordinator", help="host:port of the coordinator")
+    parser.add_argument("--data", default=os.path.join("resources", "data", "TSLA"), help="symbol data directory")
+    parser.add_argument("--authkey", required=True, help="the authkey the coordinator printed or was configured with")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    work(parse_address(args.coordinator), args.authkey.encode(), args.data)
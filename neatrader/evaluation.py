@@ -0,0 +1,278 @@
+from functools import partial
+from neatrader.math import reducer
+from neatrader.model import Portfolio
+from neatrader.netcache import NetworkCache, constant_policy
+from neatrader.reporter import SimulationTrace
+from neatrader.trading import MarketFeatures, Simulator, SimulationWindow, StockSplitHandler
+from neatrader.trading.features import PORTFOLIO_INPUTS
+from neatrader.universe import TRAINING
+
+
+class Evaluator:
+    """
+    Scores generations of genomes on random windows of a tape.
+    Every genome of a generation is simulated over the same windows.
+    Set profiler to a PhaseProfiler to time the phases of every simulation,
+    trade_log to a TradeReporter to log the trades of every genome and prefetcher
+    to a ChainPrefetcher to load the chains of windows in the background. With a
+    prefetcher, the windows of the next generation are drawn as soon as a generation
+    is evaluated, so their chains load while NEAT reproduces. Set pruning to a
+    PruningPolicy to stop simulations whose outcome is already known, and with
+    prune_quantile set, to stop simulating genomes on further windows once they are
+    below that quantile of the previous generation. Networks whose decisions do not
+    depend on their inputs share one simulation of each window. Set tracer to a
+    TraceRecorder to keep the day by day traces of the best genomes' simulations.
+    Every simulation is then traced as it runs, and the traces of genomes the
+    tracer does not keep are dropped.
+    """
+    def __init__(self, security, path, tape, daterange_factory, settings):
+        self.security = security
+        self.path = path
+        self.tape = tape
+        self.daterange_factory = daterange_factory
+        self.settings = settings
+        self.splits = StockSplitHandler(path / "splits.csv", security).calendar()
+        self.network_cache = NetworkCache()
+        self.features = None
+        self.profiler = None
+        self.trade_log = None
+        self.prefetcher = None
+        self.next_windows = None
+        self.pruning = None
+        self.tracer = None
+        # running totals of the simulations run, and of the work pruning skipped
+        self.simulations = 0
+        self.days_simulated = 0
+        self.simulations_skipped = 0
+        self.days_skipped = 0
+        self.simulations_shared = 0
+
+    def market_features(self):
+        """ the market inputs of every day of the tape, built once per input set """
+        if self.features is None or self.features.inputs != tuple(self.settings.inputs):
+            self.features = MarketFeatures(self.tape, self.settings.inputs)
+        return self.features
+
+    def window(self, start, end):
+        if self.profiler:
+            window = self.profiler.timed("window", SimulationWindow)(self.market_features(), self.splits, start, end)
+        else:
+            window = SimulationWindow(self.market_features(), self.splits, start, end)
+        if self.prefetcher:
+            dates = [row[0] for row in window.rows] + [end]
+            self.prefetcher.prefetch(self.path, self.security, dates, self.settings.chain_profile)
+        return window
+
+    def random_ranges(self):
+        """ returns: a (start, end) date range for each window of a generation """
+        return [
+            self.daterange_factory.random_date_range(self.settings.simulation_days)
+            for _ in range(self.settings.windows)
+        ]
+
+    def random_windows(self):
+        if self.next_windows:
+            windows, self.next_windows = self.next_windows, None
+            return windows
+        return [self.window(start, end) for start, end in self.random_ranges()]
+
+    def prefetch_next(self):
+        """ draws the next generation's windows now so their chains load in the background """
+        if self.prefetcher and not self.next_windows:
+            self.next_windows = [self.window(start, end) for start, end in self.random_ranges()]
+
+    def evaluate(self, genomes, config, windows=None):
+        """
+        sets the fitness of each genome, reduced over its fitness in each window
+        genomes: list of (genome_id, genome)
+        """
+        # the rows and splits of each window are looked up once and shared
+        drawn = not windows
+        windows = windows or self.random_windows()
+        reduce = reducer(self.settings.reducer)
+
+        # unchanged genomes reuse the network compiled for them in an earlier generation
+        networks = self.network_cache.networks_for(genomes, config)
+
+        bound = None
+        if self.pruning and self.settings.prune_quantile:
+            bound = partial(self.pruning.bound, windows=len(windows))
+        for genome_id, genome in genomes:
+            traces = [] if self.tracer else None
+            genome.fitness = reduce(self.simulate_genome(genome_id, networks[genome_id], windows, bound, traces))
+            # a genome whose remaining windows were pruned has no traces of them
+            if self.tracer and len(traces) == len(windows):
+                self.tracer.offer(genome_id, genome.fitness, traces)
+        self.update_pruning(genomes)
+        if drawn:
+            self.prefetch_next()
+
+    def update_pruning(self, genomes):
+        """ the next generation is pruned below a quantile of this generation's fitness """
+        if self.pruning and self.settings.prune_quantile:
+            self.pruning.update([genome.fitness for _, genome in genomes], self.settings.prune_quantile)
+
+    def simulate_genome(self, genome_id, net, windows, bound=None, traces=None):
+        """
+        returns: the fitness of a genome's network in each window
+        bound: function of the fitnesses so far returning an upper bound of the reduced fitness
+            when it is already known to be too low, or None. Once it returns a bound, the remaining
+            windows are skipped and every window is given the bound.
+        traces: a list to append the SimulationTrace of each simulated window to
+        """
+        if self.trade_log is not None:
+            self.trade_log.genome_id = genome_id
+        fitnesses = []
+        days_skipped = 0
+        for i, window in enumerate(windows):
+            fitness, skipped = self.simulate(net, window, self.trade_log, traces)
+            fitnesses.append(fitness)
+            days_skipped += skipped
+            upper = bound(fitnesses) if bound else None
+            if upper is not None:
+                self.simulations_skipped += len(windows) - i - 1
+                days_skipped += sum(len(window) for window in windows[i + 1:])
+                fitnesses = [upper] * len(windows)
+                break
+        self.simulations += len(windows)
+        self.days_simulated += sum(len(window) for window in windows) - days_skipped
+        self.days_skipped += days_skipped
+        return fitnesses
+
+    def simulate(self, net, window, reporter=None, traces=None):
+        """
+        traces: a list to append the SimulationTrace of the simulation to
+        returns: the fitness and the days which were not simulated
+        """
+        # trades are logged per genome so logged simulations are never shared
+        policy = constant_policy(net) if reporter is None else None
+        shared = window.policy_fitness.get(policy)
+        if shared is not None and (traces is None or shared[1] is not None):
+            self.simulations_shared += 1
+            fitness, trace = shared
+            if traces is not None:
+                # the same days, only outputs which do not affect the policy may differ
+                traces.append(trace)
+            return fitness, len(window)
+
+        trace = None
+        if traces is not None:
+            trace = SimulationTrace(len(PORTFOLIO_INPUTS) + len(self.settings.inputs))
+            traces.append(trace)
+        portfolio = Portfolio(cash=0.0, securities={self.security: 100})
+        simulator = Simulator(
+            self.security, portfolio, self.path, self.tape, reporter,
+            inputs=self.settings.inputs, chain_profile=self.settings.chain_profile,
+            search_buckets=self.settings.search_buckets, trace=trace
+        )
+        if self.profiler:
+            self.profiler.instrument(simulator)
+        fitness = simulator.simulate_window(net, window, self.pruning)
+        if policy is not None:
+            window.policy_fitness[policy] = (fitness, trace)
+        return fitness, simulator.days_skipped
+
+
+def relative_fitness(fitnesses, windows):
+    """ returns: each window's fitness as a fraction of the value of holding 100 shares at its end """
+    return [fitness / window.baseline if window.baseline else fitness for fitness, window in zip(fitnesses, windows)]
+
+
+class UniverseEvaluator:
+    """
+    Scores generations of genomes on several symbols of a Universe.
+
+    Each generation samples symbols_per_generation symbols, or all of them when 0,
+    and draws random windows of each. Every (genome, symbol) pair is simulated over
+    the windows of the symbol, and a genome's fitness is reduced over the windows of
+    all sampled symbols. Networks are compiled once and shared by every symbol.
+    Fitness is a dollar difference to holding 100 shares, so with more than one symbol
+    in the universe each window's fitness is divided by the value of those shares,
+    otherwise the most expensive underlyings would dominate the reduced fitness.
+    Pruning only stops simulations whose portfolio can no longer change, as the
+    windows of other symbols may still raise a genome's fitness.
+    """
+    def __init__(self, universe, settings, tape=TRAINING):
+        self.universe = universe
+        self.settings = settings
+        self.tape = tape
+        self.relative = len(universe.symbols) > 1
+        self.network_cache = NetworkCache()
+        self.evaluators = {}
+        self.profiler = None
+        self.trade_log = None
+        self.prefetcher = None
+        self.pruning = None
+        self.tracer = None
+        self.next_symbols = None
+
+    @property
+    def simulations(self):
+        return sum(evaluator.simulations for evaluator in self.evaluators.values())
+
+    @property
+    def days_simulated(self):
+        return sum(evaluator.days_simulated for evaluator in self.evaluators.values())
+
+    @property
+    def simulations_skipped(self):
+        return sum(evaluator.simulations_skipped for evaluator in self.evaluators.values())
+
+    @property
+    def days_skipped(self):
+        return sum(evaluator.days_skipped for evaluator in self.evaluators.values())
+
+    @property
+    def simulations_shared(self):
+        return sum(evaluator.simulations_shared for evaluator in self.evaluators.values())
+
+    def evaluator(self, symbol):
+        """ the Evaluator of a symbol, its market is read the first time it is sampled """
+        evaluator = self.evaluators.get(symbol)
+        if evaluator is None:
+            market = self.universe.market(symbol)
+            evaluator = Evaluator(
+                market.security, market.path, market.tape(self.tape), market.daterange_factory(self.tape),
+                self.settings
+            )
+            evaluator.network_cache = self.network_cache
+            self.evaluators[symbol] = evaluator
+        evaluator.profiler = self.profiler
+        evaluator.trade_log = self.trade_log
+        evaluator.prefetcher = self.prefetcher
+        evaluator.pruning = self.pruning
+        return evaluator
+
+    def evaluate(self, genomes, config, symbols=None):
+        """ symbols: defaults to a sample of the universe """
+        drawn = not symbols
+        if drawn:
+            symbols = self.next_symbols or self.universe.sample(self.settings.symbols_per_generation)
+            self.next_symbols = None
+        reduce = reducer(self.settings.reducer)
+        networks = self.network_cache.networks_for(genomes, config)
+
+        fitnesses = {genome_id: [] for genome_id, _ in genomes}
+        traces = {genome_id: [] for genome_id, _ in genomes} if self.tracer else {}
+        windows = {}
+        for symbol in symbols:
+            evaluator = self.evaluator(symbol)
+            windows[symbol] = evaluator.random_windows()
+            for genome_id, _ in genomes:
+                window_fitness = evaluator.simulate_genome(
+                    genome_id, networks[genome_id], windows[symbol], traces=traces.get(genome_id)
+                )
+                if self.relative:
+                    window_fitness = relative_fitness(window_fitness, windows[symbol])
+                fitnesses[genome_id] += window_fitness
+
+        for genome_id, genome in genomes:
+            genome.fitness = reduce(fitnesses[genome_id])
+            if self.tracer:
+                self.tracer.offer(genome_id, genome.fitness, traces[genome_id])
+
+        if drawn and self.prefetcher:
+            # the next generation's symbols and windows, so their chains load while NEAT reproduces
+            self.next_symbols = self.universe.sample(self.settings.symbols_per_generation)
+            for symbol in self.next_symbols:
+                self.evaluator(symbol).prefetch_next()
@@ -0,0 +1,79 @@
+import os
+import pandas as pd
+import pickle
+from collections import defaultdict
+from pathlib import Path
+
+SMALL_DATE = "%y%m%d"
+
+# every other column of these files is a float64
+TAPE = {"date": str}
+CLOSE = {"date": str}
+CHAIN = {"direction": "category", "expiration": str}
+SPLITS = {"date": str, "multiplier": "int64"}
+
+
+def tape_columns(inputs):
+    """ returns: the columns of a tape a simulation with these market inputs reads """
+    return list(dict.fromkeys(("date", "close", *inputs)))
+
+
+def parse_dates(values, date_format=SMALL_DATE):
+    """ parses a Series of date strings at once, quotes around them are ignored """
+    return pd.to_datetime(values.astype(str).str.strip("'\""), format=date_format)
+
+
+def read_csv(path, dtypes=TAPE, columns=None, dates=("date",), date_format=SMALL_DATE, cache=False):
+    """
+    Reads a csv file of this project's data sets.
+
+    dtypes: dict of column: dtype, columns not in it are read as float64
+    columns: the columns to read, all of them by default
+    dates: columns parsed as datetimes with date_format, they should be read as str
+    cache: keep the parsed frame in a hidden pickle next to the file, .<name>.pkl,
+        which is read instead of the file until the file is modified
+    returns: a DataFrame
+    """
+    path = Path(path)
+    key = None
+    if cache:
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size, tuple(columns or ()), tuple(dates), date_format)
+        df = _read_sidecar(path, key)
+        if df is not None:
+            return df
+
+    df = pd.read_csv(path, usecols=columns, dtype=defaultdict(lambda: "float64", dtypes))
+    for column in dates:
+        if column in df.columns:
+            df[column] = parse_dates(df[column], date_format)
+
+    if cache:
+        _write_sidecar(path, key, df)
+    return df
+
+
+def sidecar(path):
+    return path.with_name(f".{path.name}.pkl")
+
+
+def _read_sidecar(path, key):
+    try:
+        with open(sidecar(path), "rb") as f:
+            cached_key, df = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return df if cached_key == key else None
+
+
+def _write_sidecar(path, key, df):
+    # written to a temporary file and renamed so readers never see a partial sidecar
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump((key, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, sidecar(path))
+    except OSError:
+        # a read only data set is parsed every time
+        if tmp.exists():
+            tmp.unlink()
@@ -1,3 +1,5 @@
+import numpy as np
+
 
 def min_max(x, mn, mx):
     """
@@ -8,3 +10,24 @@ def min_max(x, mn, mx):
 
 def un_min_max(x, mn, mx):
     return (((mx - mn) * (x + 1)) / 2) + mn
+
+
+def reducer(name):
+    """
+    Returns a function combining a list of values into one.
+    name: mean, min, max, median or a quantile written as q<fraction>, e.g. q0.25
+    """
+    if name.startswith("q"):
+        q = float(name[1:])
+        return lambda values: float(np.quantile(values, q))
+    reducers = {"mean": np.mean, "min": np.min, "max": np.max, "median": np.median}
+    if name not in reducers:
+        raise ValueError(f"unknown reducer: {name}")
+    return lambda values: float(reducers[name](values))
+
+
+def reducer_quantile(name):
+    """ the quantile a reducer takes, None for the mean """
+    if name.startswith("q"):
+        return float(name[1:])
+    return {"min": 0.0, "median": 0.5, "max": 1.0}.get(name)
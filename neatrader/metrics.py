@@ -0,0 +1,147 @@
+import json
+import resource
+import sys
+import tracemalloc
+from datetime import datetime
+from neat.reporting import BaseReporter
+from neatrader.trading import Simulator
+from statistics import mean, median
+from time import perf_counter
+
+
+def rss_bytes():
+    """ current resident set size, or the peak where the current size is unavailable """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return max_rss_bytes()
+
+
+def max_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def distribution(values):
+    values = list(values)
+    if not values:
+        return None
+    return {"min": min(values), "median": median(values), "mean": mean(values), "max": max(values)}
+
+
+class MetricsReporter(BaseReporter):
+    """
+    Writes one JSON line of performance metrics per generation: evaluation wall time and
+    throughput, cache statistics, memory use and the network size distribution.
+
+    Counts are for the generation, except cache sizes and memory which are current.
+    Cross validation runs in the background, so its days are counted in the generation
+    during which they were collected. With trace_allocations > 0, tracemalloc is started
+    and that many of the largest allocation sites are included, at a significant cost
+    to evaluation speed.
+    """
+    def __init__(self, filename, evaluator, cross_validator=None, trace_allocations=0):
+        self.filename = filename
+        self.evaluator = evaluator
+        self.cross_validator = cross_validator
+        self.trace_allocations = trace_allocations
+        self.generation = None
+        self.start = None
+        self.previous = self._counters()
+        # running totals for the whole run
+        self.days_simulated = 0
+        self.evaluation_seconds = 0.0
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __getstate__(self):
+        # the species set holds on to its reporters and is pickled into every checkpoint,
+        # the evaluator and its data are left out
+        state = self.__dict__.copy()
+        state["evaluator"] = None
+        state["cross_validator"] = None
+        return state
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.start = perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        seconds = perf_counter() - self.start
+        counters = self._counters()
+        delta = {key: counters[key] - self.previous[key] for key in counters}
+        self.previous = counters
+        self.days_simulated += delta["days_simulated"] + delta["cv_days_simulated"]
+        self.evaluation_seconds += seconds
+
+        sizes = [genome.size() for genome in population.values()]
+        cache = self.evaluator.network_cache
+        line = {
+            "generation": self.generation,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "population": len(population),
+            "species": len(species.species),
+            "evaluation_seconds": seconds,
+            "genomes_per_second": len(population) / seconds,
+            "simulations": delta["simulations"],
+            "days_simulated": delta["days_simulated"],
+            "days_per_second": delta["days_simulated"] / seconds,
+            "cv_days_simulated": delta["cv_days_simulated"],
+            "simulations_skipped": delta["simulations_skipped"],
+            "days_skipped": delta["days_skipped"],
+            "simulations_shared": delta["simulations_shared"],
+            "network_cache": {
+                "hits": delta["network_hits"],
+                "misses": delta["network_misses"],
+                "evictions": delta["network_evictions"],
+                "size": len(cache.networks),
+            },
+            "chain_cache": {
+                "hits": delta["chain_hits"],
+                "misses": delta["chain_misses"],
+                "waits": delta["chain_waits"],
+                "evictions": delta["chain_evictions"],
+                "size": len(Simulator.chain_cache),
+            },
+            "chains_parsed": delta["chain_misses"],
+            "rss_bytes": rss_bytes(),
+            "max_rss_bytes": max_rss_bytes(),
+            "top_allocations": self._top_allocations(),
+            "network_size": {
+                "nodes": distribution(nodes for nodes, _ in sizes),
+                "connections": distribution(connections for _, connections in sizes),
+            },
+        }
+        if self.filename:
+            with open(self.filename, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+        return line
+
+    def _counters(self):
+        cache = self.evaluator.network_cache
+        return {
+            "simulations": self.evaluator.simulations,
+            "days_simulated": self.evaluator.days_simulated,
+            "simulations_skipped": self.evaluator.simulations_skipped,
+            "days_skipped": self.evaluator.days_skipped,
+            "simulations_shared": self.evaluator.simulations_shared,
+            "cv_days_simulated": self.cross_validator.days_simulated if self.cross_validator else 0,
+            "network_hits": cache.hits,
+            "network_misses": cache.misses,
+            "network_evictions": cache.evictions,
+            "chain_hits": Simulator.chain_hits,
+            "chain_misses": Simulator.chain_misses,
+            "chain_waits": Simulator.chain_waits,
+            "chain_evictions": Simulator.chain_cache.evictions,
+        }
+
+    def _top_allocations(self):
+        if not self.trace_allocations or not tracemalloc.is_tracing():
+            return []
+        statistics = tracemalloc.take_snapshot().statistics("lineno")[:self.trace_allocations]
+        return [
+            {"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+            for stat in statistics
+        ]
@@ -1,3 +1,3 @@
 from neatrader.model.security import Security, Quote
-from neatrader.model.option import Option, OptionChain
+from neatrader.model.option import Option, OptionChain, SearchGrid
 from neatrader.model.portfolio import Portfolio
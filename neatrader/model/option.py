@@ -2,12 +2,15 @@ import logging
 import math
 import pandas as pd
 from datetime import timedelta
-from functools import lru_cache
+from bisect import bisect_left
 from itertools import chain
 from neatrader.utils import flatten_dict, add_value, small_date
 
 log = logging.getLogger(__name__)
 
+# days ahead of the expirations OptionChain.iv is taken at for the iv_<days> columns of close.csv
+IV_DAYS = (10, 20, 30, 60, 90)
+
 
 class Option:
     """ A stock option """
@@ -74,6 +77,13 @@ class OptionChain:
         }
         self.security = security
         self.date = date
+        # prices of contracts left out when the chain was imported, keyed by (direction, expiration, strike)
+        self.pruned_prices = {}
+        # memoized lookups, kept on the chain so they are freed along with it
+        self._prices = {}
+        self._ivs = {}
+        self._thetas = {}
+        self._grids = {}
 
     def __str__(self):
         date = self.date.strftime("%Y%m%d")
@@ -117,6 +127,13 @@ class OptionChain:
         contracts = self.chain[direction][expiration]
         return self._find_closest_delta(delta, contracts.values())
 
+    def search_grid(self, close, buckets=64):
+        """ the SearchGrid of this chain for a close, created the first time it is asked for """
+        grid = self._grids.get((close, buckets))
+        if grid is None:
+            grid = self._grids[(close, buckets)] = SearchGrid(self, close, buckets)
+        return grid
+
     def _find_closest_expiration(self, theta, expirations):
         # price_weighted_dict should already be sorted and we could use binary search
         # but this wont be more than about 20 elements
@@ -134,13 +151,17 @@ class OptionChain:
         return closest_expiration
 
     def _find_closest_delta(self, delta, contracts):
+        return self._bisect_delta(delta, self._sort_by_delta(contracts))
+
+    def _sort_by_delta(self, contracts):
         # filter out nan deltas and 0 prices
         contracts = filter(
             lambda contract: not math.isnan(contract.delta) and contract.price > 0,
             contracts
         )
-        contracts = sorted(contracts, key=lambda contract: contract.delta, reverse=True)
+        return sorted(contracts, key=lambda contract: contract.delta, reverse=True)
 
+    def _bisect_delta(self, delta, contracts):
         # use binary search to find the closest contract
         i, j = 0, len(contracts) - 1
         while i <= j:
@@ -161,8 +182,16 @@ class OptionChain:
         raise Exception(f"Unable to find contract close to delta: {delta}, ",
                         f"contracts: {contracts}")
 
-    @lru_cache(maxsize=None)
     def get_price(self, contract):
+        price = self._prices.get(contract)
+        if price is None:
+            price = self._prices[contract] = self._price(contract)
+        return price
+
+    def _price(self, contract):
+        price = self.pruned_prices.get((contract.direction, contract.expiration, contract.strike))
+        if price is not None:
+            return price
         option = self.get_option(contract.direction, contract.expiration, contract.strike)
         if option is None:
             log.error(f"could not locate {contract} to provide a price")
@@ -191,11 +220,16 @@ class OptionChain:
             "put": otm_puts
         }
 
-    @lru_cache(maxsize=None)
     def iv(self, expiration, underlying_price):
         """ calculates the price-weighted implied volatility
             of all out of the money contracts with the same expiration.
         """
+        key = (expiration, underlying_price)
+        if key not in self._ivs:
+            self._ivs[key] = self._iv(expiration, underlying_price)
+        return self._ivs[key]
+
+    def _iv(self, expiration, underlying_price):
         price_total = 0.0
         iv = 0.0
         contracts = chain.from_iterable(self.otm(expiration, underlying_price).values())
@@ -229,8 +263,13 @@ class OptionChain:
             add_value(contracts, "vega", contract.vega)
         return pd.DataFrame(contracts)
 
-    @lru_cache(maxsize=None)
     def _expirations_by_price_weighted_theta(self, direction, close):
+        result = self._thetas.get((direction, close))
+        if result is None:
+            result = self._thetas[(direction, close)] = self._price_weighted_thetas(direction, close)
+        return result
+
+    def _price_weighted_thetas(self, direction, close):
         """
         Calculates an average, price-weighted theta for each expiration (calls or puts)
         so an expiration date can be determined (searched for) by a given theta.
@@ -261,3 +300,72 @@ class OptionChain:
                 del result[first_key]
 
         return result
+
+
+class SearchGrid:
+    """
+    Memoized OptionChain.search for a single chain and close.
+
+    theta and delta are quantized into `buckets` buckets over [-1, 1], the range of the
+    network outputs. The searches only compare their argument with fixed thresholds: the
+    expiration thetas, the contract deltas and the midpoints between neighbours. A bucket
+    without a threshold in it has a single result, which is stored the first time the
+    bucket is hit. Other buckets and values out of range run the same search over
+    contracts sorted once per expiration, so the result is always the contract
+    OptionChain.search returns.
+    """
+    # margin around thresholds covering the rounding of the squared errors the searches compare
+    MARGIN = 1e-9
+
+    def __init__(self, chain, close, buckets=64, low=-1.0, high=1.0):
+        self.chain = chain
+        self.close = close
+        self.buckets = buckets
+        self.low = low
+        self.width = (high - low) / buckets
+        self.expirations = chain._expirations_by_price_weighted_theta(Option.CALL, close)
+        self.theta_thresholds = self._thresholds(self.expirations.values())
+        self.theta_cells = [None] * buckets
+        # expiration: (contracts sorted by delta, delta thresholds, delta cells)
+        self.contracts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, theta, delta):
+        expiration = self._lookup(self.theta_cells, self.theta_thresholds, theta, self._expiration)
+        contracts, thresholds, cells = self._contracts(expiration)
+        return self._lookup(cells, thresholds, delta, lambda value: self.chain._bisect_delta(value, contracts))
+
+    def _lookup(self, cells, thresholds, value, search):
+        i = math.floor((value - self.low) / self.width) if math.isfinite(value) else -1
+        if not 0 <= i < self.buckets:
+            self.misses += 1
+            return search(value)
+        result = cells[i]
+        if result is None:
+            left = self.low + i * self.width
+            right = left + self.width
+            k = bisect_left(thresholds, left - self.MARGIN)
+            if left <= value <= right and (k == len(thresholds) or thresholds[k] > right + self.MARGIN):
+                result = cells[i] = search(left + self.width / 2)
+            else:
+                self.misses += 1
+                return search(value)
+        self.hits += 1
+        return result
+
+    def _expiration(self, theta):
+        return self.chain._find_closest_expiration(theta, self.expirations)
+
+    def _contracts(self, expiration):
+        entry = self.contracts.get(expiration)
+        if entry is None:
+            contracts = self.chain._sort_by_delta(self.chain.calls()[expiration].values())
+            entry = (contracts, self._thresholds(contract.delta for contract in contracts), [None] * self.buckets)
+            self.contracts[expiration] = entry
+        return entry
+
+    def _thresholds(self, values):
+        """ the values and the midpoints between neighbours, where a closest value search can change """
+        values = sorted(set(values))
+        return sorted(values + [(a + b) / 2 for a, b in zip(values, values[1:])])
@@ -1,139 +1,150 @@
 import math
 import neat
-import neatrader.visualize as vis
-import os
-import pandas as pd
-import re
-from glob import glob
+import pickle
+import secrets
 from importlib import resources
-from neatrader.daterange import DateRangeFactory
-from neatrader.model import Portfolio, Security
-from neatrader.reporter import TradeReporter
-from neatrader.trading import Simulator
-from neatrader.utils import from_small_date
+from neatrader.checkpoint import AsyncCheckpointer, find_checkpoints
+from neatrader.distributed import DistributedEvaluator, parse_address
+from neatrader.evaluation import Evaluator, UniverseEvaluator
+from neatrader.metrics import MetricsReporter
+from neatrader.profiler import PhaseProfiler, ProfileReporter
+from neatrader.reporter import TraceRecorder
+from neatrader.report_worker import ReportSnapshot, ReportWorker
+from neatrader.settings import Settings
+from neatrader.stats import StatisticsLog
+from neatrader.trading import ChainPrefetcher, PruningPolicy, Simulator
+from neatrader.trading.features import PORTFOLIO_INPUTS
+from neatrader.universe import CROSS_VALIDATION, Universe
+from neatrader.validation import CrossValidator
 from pathlib import Path
-from time import perf_counter_ns
-
-TSLA = Security("TSLA")
 
 
 def find_data_path():
-    path = None
-    with resources.path("resources.data", "TSLA") as fp:
-        path = Path(fp)
-    return path
+    """ the directory holding a data set per symbol """
+    with resources.path("resources", "data") as fp:
+        return Path(fp)
 
 
-path = find_data_path()
-training = pd.read_csv(path / "training.csv", parse_dates=['date'], date_parser=from_small_date)
-validation = pd.read_csv(path / "cross_validation.csv", parse_dates=['date'], date_parser=from_small_date)
-training_daterange_factory = DateRangeFactory(training)
-cv_daterange_factory = DateRangeFactory(validation)
-simulation_days = 90
+settings = Settings()
+# set up by run() for the symbols in the settings
+universe = None
+evaluator = None
+cross_validator = None
+# the in process evaluator, or a DistributedEvaluator serving workers
+backend = None
 
 
 def eval_genomes(genomes, config):
-    # all genomes should be compared against using the same date range
-    t_start, t_end = training_daterange_factory.random_date_range(simulation_days)
-    c_start, c_end = cv_daterange_factory.random_date_range(simulation_days)
-
-    for genome_id, genome in genomes:
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        portfolio = Portfolio(cash=0.0, securities={TSLA: 100})
-        training_sim = Simulator(TSLA, portfolio, path, training)
-
-        genome.fitness = training_sim.simulate(net, t_start, t_end)
-        genome.cv_fitness = 0  # TODO evaluate in a different place? Once per generation?
-
-
-def find_checkpoints():
-    return sorted(
-        glob('neat-checkpoint-*'),
-        key=lambda name: int(re.search(r"(\d+)", name).group(1)),
-        reverse=True
-    )
-
+    # all genomes should be compared against using the same date ranges
+    backend.evaluate(genomes, config)
 
-def cleanup_checkpoints():
-    checkpoints = find_checkpoints()
-    # keep the most recent one
-    for checkpoint in checkpoints[1:]:
-        os.remove(checkpoint)
+    # the best of this generation are cross validated while NEAT reproduces and evaluates the next one
+    cross_validator.submit(genomes, config)
 
 
-def run(config_file, generations_per_iteration, iterations=math.inf):
+def run(config_file, generations_per_iteration, iterations=math.inf, headless=False):
+    global universe, evaluator, cross_validator, backend
     print(f"running with {generations_per_iteration} generations per iteration for {iterations} iterations")
-    try:
-        config = neat.Config(
-            neat.DefaultGenome,
-            neat.DefaultReproduction,
-            neat.DefaultSpeciesSet,
-            neat.DefaultStagnation,
-            config_file
+    settings.read(config_file)
+    universe = Universe(find_data_path(), settings.symbols, settings.csv_cache, settings.inputs)
+    # cross validation and the winner's trades plot use the first symbol
+    market = universe.market(universe.symbols[0])
+    if len(universe.symbols) > 1:
+        if settings.coordinator:
+            raise Exception("distributed evaluation supports a single symbol")
+        evaluator = UniverseEvaluator(universe, settings)
+    else:
+        evaluator = Evaluator(market.security, market.path, market.tape(), market.daterange_factory(), settings)
+    backend = evaluator
+    if settings.prune:
+        evaluator.pruning = PruningPolicy(settings.reducer)
+    if settings.trace_best:
+        evaluator.tracer = TraceRecorder(settings.trace_best)
+    Simulator.chain_cache.max_size = settings.chain_cache_size
+    prefetcher = None
+    if settings.prefetch_workers:
+        prefetcher = evaluator.prefetcher = ChainPrefetcher(settings.prefetch_workers)
+    cross_validator = CrossValidator(
+        market.security, market.path, market.tape(CROSS_VALIDATION), market.daterange_factory(CROSS_VALIDATION),
+        settings.simulation_days, settings.cv_top_k, inputs=settings.inputs,
+        chain_profile=settings.chain_profile, search_buckets=settings.search_buckets,
+        relative=getattr(evaluator, "relative", False)
+    )
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_file
+    )
+    num_inputs = len(PORTFOLIO_INPUTS) + len(settings.inputs)
+    if config.genome_config.num_inputs != num_inputs:
+        raise Exception(f"num_inputs should be {num_inputs} for inputs: {' '.join(settings.inputs)}")
+
+    # the population lives in memory for the whole run, checkpoints are only read once to resume
+    checkpoint = find_checkpoints()
+    if checkpoint:
+        pop = neat.Checkpointer.restore_checkpoint(checkpoint[0])
+    else:
+        pop = neat.Population(config)
+
+    checkpointer = AsyncCheckpointer(generations_per_iteration)
+    # add a stdout reporter to show progress in terminal
+    pop.add_reporter(neat.StdOutReporter(True))
+    metrics = MetricsReporter(settings.metrics, evaluator, cross_validator, settings.trace_allocations)
+    pop.add_reporter(metrics)
+    pop.add_reporter(checkpointer)
+    # the whole run's statistics are appended to disk, a resumed run appends to them
+    stats = StatisticsLog(settings.statistics, pop.generation if checkpoint else 0)
+    pop.add_reporter(stats)
+    cross_validator.statistics = stats
+    if settings.profile:
+        evaluator.profiler = PhaseProfiler()
+        cross_validator.profiler = PhaseProfiler()
+        pop.add_reporter(ProfileReporter(evaluator.profiler, cross_validator.profiler))
+    reports = ReportWorker(headless)
+    if settings.coordinator:
+        authkey = settings.authkey or secrets.token_urlsafe(16)
+        backend = DistributedEvaluator(
+            evaluator, parse_address(settings.coordinator), authkey.encode(),
+            settings.lease_seconds, settings.chunk_size
         )
-        days_simulated = 0
-        duration_ns = 0.0
+        print(f"waiting for workers on {settings.coordinator}, start them with --authkey {authkey}")
 
+    try:
         i = 0
         while i < iterations:
-            checkpoint = find_checkpoints()
-            if checkpoint:
-                pop = neat.Checkpointer.restore_checkpoint(checkpoint[0])
-            else:
-                pop = neat.Population(config)
-
-            stats = neat.StatisticsReporter()
-
-            # add a stdout reporter to show progress in terminal
-            pop.add_reporter(neat.StdOutReporter(True))
-            pop.add_reporter(stats)
-            pop.add_reporter(neat.Checkpointer(generations_per_iteration))
-
-            start = perf_counter_ns()
             winner = pop.run(eval_genomes, generations_per_iteration)
-            end = perf_counter_ns()
+            cross_validator.flush()
 
             # display the winning genome
             print(f"\nBest genome:\n{winner}")
-
-            win_net = neat.nn.FeedForwardNetwork.create(winner, config)
-
-            # plot species
-            view = False
-            vis.plot_stats(stats, ylog=False, view=view)
-            vis.plot_species(stats, view=view)
-
-            # simulate the winning network one time for a trades plot
-            portfolio = Portfolio(cash=0.0, securities={TSLA: 100})
-            reporter = TradeReporter()
-            simulator = Simulator(TSLA, portfolio, path, training, reporter)
-            daterange = training_daterange_factory.random_date_range(90)
-            vis.plot_trades(win_net, simulator, daterange, training, path, reporter, view=view)
-            print(f"\nWinner simulation:\nfitness: {reporter.fitness:.2f}")
-            print(f"trades:")
-            for trade in reporter.row_list:
-                print(trade)
-            print(f"\nending portfolio:\n{portfolio}")
-
-            # plot the network
-            node_names = {
-                -1: "cash", -2: "shares", -3: "held option value", -4: "10 day iv", -5: "30 day iv", -6: "RSI",
-                #-4: "close", -5: "macd", -6: "macd_signal", -7: "macd_diff",
-                #-8: "bb_bbm", -9: "bb_bbh", -10: "bb_bbl", -11: "rsi", -12: "30 day IV",
-                0: "open", 1: "close", 2: "hold", 3: "strike", 4: "expiration"
-            }
-            vis.draw_net(
-                config, winner, view=view, node_names=node_names,
-                filename="neural_net", prune_unused=False, show_disabled=False
-            )
-
-            days_simulated += len(pop.population) * simulation_days * generations_per_iteration * 2
-            duration_ns += end - start
-            duration_min = duration_ns / 1000 / 1000 / 1000 / 60
-            sim_years = days_simulated / 365
-            print(f"\nSimulated {days_simulated} days in {duration_min:.2f} minutes",
+            if settings.winner:
+                # python3 -m neatrader.backtest backtests it over the whole history
+                with open(settings.winner, "wb") as f:
+                    pickle.dump(winner, f)
+
+            # plots are rendered off the evolution process, from the winner's recorded simulations
+            # when they were kept, otherwise from a simulation on a new random date range
+            daterange = market.daterange_factory().random_date_range(settings.simulation_days)
+            win_net = evaluator.network_cache.get(winner, config)
+            traces = evaluator.tracer.get(winner.key) if evaluator.tracer else None
+            reports.submit(ReportSnapshot(
+                config, winner, win_net, settings.statistics,
+                market.security, market.path, settings.inputs, market.tape(), daterange, traces
+            ))
+
+            # trading days of training and cross validation simulations over evaluation time
+            duration_min = metrics.evaluation_seconds / 60
+            sim_years = metrics.days_simulated / 252
+            print(f"\nSimulated {metrics.days_simulated} trading days in {duration_min:.2f} minutes",
                   f"({sim_years / duration_min:.2f} sim years per minute)")
             i += 1
-            cleanup_checkpoints()
     finally:
-        cleanup_checkpoints()
+        if backend is not evaluator:
+            backend.close()
+        if prefetcher:
+            prefetcher.close()
+        cross_validator.close()
+        reports.close()
+        checkpointer.close()
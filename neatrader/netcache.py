@@ -0,0 +1,79 @@
+import neat
+
+
+def structural_key(genome):
+    """
+    Everything about a genome that affects its compiled network:
+    enabled connections with their weights and every node's bias, response, activation and aggregation.
+    """
+    connections = tuple(sorted(
+        (key, cg.weight) for key, cg in genome.connections.items() if cg.enabled
+    ))
+    nodes = tuple(sorted(
+        (key, ng.bias, ng.response, ng.activation, ng.aggregation) for key, ng in genome.nodes.items()
+    ))
+    return (connections, nodes)
+
+
+def constant_policy(net):
+    """
+    The decisions of a network whose buy, sell and hold outputs do not depend on its inputs:
+    ("hold",) if it never sells, ("sell", delta, theta) if it sells every day with a delta
+    and theta which do not depend on its inputs either, otherwise None.
+    Networks with the same constant policy trade the same way on every window.
+    """
+    dependent = set(net.input_nodes)
+    for node, _, _, _, _, links in net.node_evals:
+        if any(i in dependent for i, _ in links):
+            dependent.add(node)
+    outputs = [node in dependent for node in net.output_nodes]
+    if any(outputs[:3]):
+        return None
+
+    buy, sell, hold, delta, theta = net.activate([0.0] * len(net.input_nodes))
+    # buying only closes a contract opened by selling
+    if not (sell > buy and sell > hold):
+        return ("hold",)
+    if any(outputs[3:]):
+        return None
+    return ("sell", delta, theta)
+
+
+class NetworkCache:
+    """
+    Compiled feed forward networks keyed by genome structure.
+
+    Elites and unchanged survivors are not recompiled every generation, and genomes
+    with identical structure share one network. Networks are evicted once no genome
+    of the current generation maps to them.
+    """
+    def __init__(self):
+        self.networks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, genome, config):
+        return self._get(structural_key(genome), genome, config)
+
+    def networks_for(self, genomes, config):
+        """
+        genomes: list of (genome_id, genome) making up the current generation
+        returns: dict of genome_id: network
+        """
+        keys = {genome_id: structural_key(genome) for genome_id, genome in genomes}
+        live = set(keys.values())
+        for key in [key for key in self.networks if key not in live]:
+            del self.networks[key]
+            self.evictions += 1
+        return {genome_id: self._get(keys[genome_id], genome, config) for genome_id, genome in genomes}
+
+    def _get(self, key, genome, config):
+        net = self.networks.get(key)
+        if net is None:
+            self.misses += 1
+            net = neat.nn.FeedForwardNetwork.create(genome, config)
+            self.networks[key] = net
+        else:
+            self.hits += 1
+        return net
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import neat
+import os
+import pickle
+import re
+from datetime import datetime
+from neatrader.backtest import load_genomes
+from neatrader.loader import CLOSE, read_csv
+from neatrader.model import Portfolio, Security
+from neatrader.model.option import IV_DAYS
+from neatrader.preprocess import CsvImporter, EtradeImporter
+from neatrader.preprocess.indicators import COLUMNS, IncrementalIndicators
+from neatrader.preprocess.normalizer import normalize_chain, normalize_value, read_scales
+from neatrader.quote_service import QuoteService
+from neatrader.settings import Settings
+from neatrader.trading import Simulator, StockSplitHandler
+from neatrader.trading.features import PORTFOLIO_INPUTS
+from neatrader.utils import from_small_date
+from pathlib import Path
+from time import perf_counter
+
+log = logging.getLogger(__name__)
+
+
+def implied_volatilities(chain, close):
+    """ returns: dict of iv_<days>: the price weighted iv of the expiration closest to days ahead """
+    if not chain.calls():
+        return {f"iv_{days}": None for days in IV_DAYS}
+    return {f"iv_{days}": chain.iv(chain.closest_expiration(days), close) for days in IV_DAYS}
+
+
+class DropDirectory:
+    """
+    A local directory the daily data feed drops files into, one of:
+    <YYYY-MM-DD>/<symbol>.json: an E*TRADE chain and quote, as in the etrade cache
+    chains/<yymmdd>.csv: a chain as CsvExporter writes it, once its close is in close.csv
+    Files should be moved in once written, a file which cannot be parsed yet is read again.
+    """
+    def __init__(self, path, security):
+        self.path = Path(path)
+        self.security = security
+
+    def days(self, after=None):
+        """ returns: sorted (date, file) of the days after the date after """
+        files = {}
+        for file in self.path.glob("chains/*.csv"):
+            files[from_small_date(file.stem)] = file
+        # a day dropped in both formats is read from its json
+        for file in self.path.glob(f"*/{self.security.symbol}.json"):
+            if re.fullmatch(r"\d{4}-\d{2}-\d{2}", file.parent.name):
+                files[datetime.strptime(file.parent.name, "%Y-%m-%d")] = file
+        return sorted((date, file) for date, file in files.items() if after is None or date > after)
+
+    def load(self, date, file):
+        """ returns: the close and OptionChain of a day, None when the day is not complete yet """
+        try:
+            if file.suffix == ".json":
+                importer = EtradeImporter(quote_service=QuoteService())
+                chain = importer.from_json(file, self.security)
+                return importer.quote_service.quote(self.security).quote, chain
+
+            quotes = QuoteService()
+            quotes.load_close(self.security, self.path / "close.csv")
+            quote = quotes.as_of(self.security, date)
+            if quote is None or quote.datetime != date:
+                return None
+            return quote.quote, CsvImporter().parse_chain(date, self.security, file)
+        except (OSError, ValueError) as e:
+            log.warning(f"{file} is not readable yet: {e}")
+            return None
+
+
+class PaperState:
+    """ what a PaperTrader persists after every day """
+    def __init__(self, portfolio, indicators, date=None):
+        self.portfolio = portfolio
+        self.indicators = indicators
+        # the last day traded, or of the history the indicators were seeded with
+        self.date = date
+
+
+class PaperTrader:
+    """
+    Trades a network on each new day of a DropDirectory with a paper portfolio.
+
+    Each day the indicators are updated with the close, the implied volatilities are read
+    from the chain and the day is traded by Simulator.trade as it would be in a simulation.
+    When the data set has a scales.csv its tapes and chains were normalized, so the inputs,
+    the close and the chain's greeks are normalized the same way before trading, and the
+    portfolio is valued in those units. The portfolio and indicators are pickled to
+    state_file after every day, so a restarted trader continues where it stopped, and the
+    day is appended to the journal as a line of JSON with the time from reading its files
+    to saving the state in milliseconds.
+
+    path: the symbol's data set, its close.csv seeds the indicators of a new portfolio
+    """
+    def __init__(self, path, net, drop, settings, state_file="paper.pkl", journal="paper.jsonl"):
+        self.path = Path(path)
+        self.security = Security(self.path.name)
+        self.net = net
+        self.feed = DropDirectory(drop, self.security)
+        self.settings = settings
+        self.state_file = state_file
+        self.journal = journal
+        known = {"close", *(f"iv_{days}" for days in IV_DAYS), *COLUMNS}
+        unknown = [column for column in settings.inputs if column not in known]
+        if unknown:
+            raise Exception(f"inputs not computed from the daily feed: {' '.join(unknown)}")
+        self.scales = read_scales(self.path / "scales.csv") if (self.path / "scales.csv").exists() else None
+        self.splits = StockSplitHandler(self.path / "splits.csv", self.security).calendar()
+        self.state = self._restore() or self._seed()
+        self.simulator = Simulator(
+            self.security, self.state.portfolio, self.path, None,
+            inputs=settings.inputs, chain_profile=settings.chain_profile, search_buckets=settings.search_buckets
+        )
+
+    def _restore(self):
+        try:
+            with open(self.state_file, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _seed(self):
+        # a new portfolio starts with 100 shares, as in training
+        state = PaperState(Portfolio(cash=0.0, securities={self.security: 100}), IncrementalIndicators())
+        history = read_csv(self.path / "close.csv", CLOSE, columns=["date", "close"])
+        for close in history["close"].tolist():
+            state.indicators.update(close)
+        if len(history):
+            state.date = history["date"].iloc[-1].to_pydatetime()
+        return state
+
+    def _save(self):
+        # written to a temporary file and renamed so a crash never leaves a partial state behind
+        directory, name = os.path.split(self.state_file)
+        tmp = os.path.join(directory, f".{name}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.state_file)
+
+    def market_inputs(self, row):
+        """ returns: the network's market inputs of a day, None when one is missing """
+        values = []
+        for column in self.settings.inputs:
+            value = row[column]
+            if value is None or math.isnan(value):
+                return None
+            values.append(normalize_value(column, value, self.scales) if self.scales is not None else value)
+        return tuple(values)
+
+    def trade(self, date, close, chain):
+        """ returns: the day's journal entry """
+        # the simulator reads the day's chain from the chain cache, only the latest one is kept
+        Simulator.chain_cache.pop((self.path, self.state.date, self.settings.chain_profile), None)
+        Simulator.chain_cache[(self.path, date, self.settings.chain_profile)] = chain
+
+        row = {"close": close, **self.state.indicators.update(close), **implied_volatilities(chain, close)}
+        traded = close
+        if self.scales is not None:
+            # the implied volatilities of the tapes were read from chains which were not normalized
+            normalize_chain(chain, self.scales)
+            traded = normalize_value("close", close, self.scales)
+        activation = self.simulator.trade(self.net, date, traded, self.market_inputs(row), self.splits.get(date))
+        self.state.date = date
+        self._save()
+
+        inputs, outputs, decision = activation or (None, None, None)
+        return {
+            "date": date.strftime("%Y-%m-%d"),
+            "close": close,
+            "inputs": inputs,
+            "outputs": outputs,
+            "decision": decision,
+            "value": self.simulator.portfolio_value(traded, date),
+            "portfolio": str(self.state.portfolio),
+        }
+
+    def poll(self):
+        """ trades every complete day dropped after the last one traded, returns their journal entries """
+        entries = []
+        for date, file in self.feed.days(self.state.date):
+            start = perf_counter()
+            day = self.feed.load(date, file)
+            if day is None:
+                # later days wait so days are always traded in order
+                break
+            entry = self.trade(date, *day)
+            entry["latency_ms"] = (perf_counter() - start) * 1000
+            with open(self.journal, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            entries.append(entry)
+        return entries
+
+    async def watch(self, poll_seconds=1.0, stop=None):
+        """
+        polls the drop directory every poll_seconds until stop, an asyncio.Event, is set.
+        Scanning and trading run on a thread so the event loop is never blocked on disk.
+        """
+        stop = stop or asyncio.Event()
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            for entry in await loop.run_in_executor(None, self.poll):
+                print(f"{entry['date']} {entry['decision'] or 'no decision'}: portfolio value {entry['value']:.2f}",
+                      f"({entry['latency_ms']:.1f} ms)")
+            try:
+                await asyncio.wait_for(stop.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="paper trade a winner on the days dropped into a directory")
+    parser.add_argument("drop", help="directory the daily E*TRADE json or chain csv files are dropped into")
+    parser.add_argument("--winner", default="winner.pkl", help="pickled winner to trade with")
+    parser.add_argument("--config", default=os.path.join("neatrader", "config.ini"))
+    parser.add_argument("--data", default=os.path.join("resources", "data"), help="directory of the symbols' data")
+    parser.add_argument("--symbol", help="symbol to trade, defaults to the first of the config's symbols")
+    parser.add_argument("--state", default="paper.pkl", help="file the paper portfolio is kept in")
+    parser.add_argument("--journal", default="paper.jsonl", help="file a line of JSON is appended to per day")
+    parser.add_argument("--poll", type=float, default=1.0, help="seconds between scans of the drop directory")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    settings = Settings().read(args.config)
+    genomes, config = load_genomes(args.winner, args.config)
+    if len(genomes) != 1:
+        raise Exception("paper trading needs a single winner, not a population")
+    num_inputs = len(PORTFOLIO_INPUTS) + len(settings.inputs)
+    if config.genome_config.num_inputs != num_inputs:
+        raise Exception(f"num_inputs should be {num_inputs} for inputs: {' '.join(settings.inputs)}")
+    net = neat.nn.FeedForwardNetwork.create(genomes[0][1], config)
+    trader = PaperTrader(
+        os.path.join(args.data, args.symbol or settings.symbols[0]), net, args.drop, settings, args.state,
+        args.journal
+    )
+    print(f"paper trading {trader.security} after {trader.state.date}\n{trader.state.portfolio}")
+    asyncio.run(trader.watch(args.poll))
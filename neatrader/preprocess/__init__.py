@@ -1,5 +1,7 @@
 from neatrader.preprocess.importer import EtradeImporter
-from neatrader.preprocess.importer import CsvImporter
+from neatrader.preprocess.importer import CsvImporter, ChainProfile, CHAIN_PROFILES
 from neatrader.preprocess.exporter import CsvExporter
 from neatrader.preprocess.training import TrainingSetGenerator
 from neatrader.preprocess.normalizer import Normalizer
+from neatrader.preprocess.indicators import IncrementalIndicators
+from neatrader.preprocess.synthetic import SyntheticMarket
@@ -1,8 +1,8 @@
 import json
 import numpy as np
-import pandas as pd
 import re
 from datetime import datetime
+from neatrader.loader import CHAIN, CLOSE, read_csv
 from neatrader.model import Security, Quote, OptionChain, Option
 from neatrader.quote_service import QuoteService
 from neatrader.utils import from_small_date
@@ -29,6 +29,25 @@ class EtradeImporter:
             yield chain
             security = chain.security if chain else None
 
+    def load_quotes(self, symbol, date_range):
+        """
+        Adds the quotes of a security to the quote service without building its option chains.
+        returns: the security, None when no file was found
+        """
+        security = None
+        quotes = []
+        for date in date_range:
+            try:
+                with open(self.path / str(date.date()) / f"{symbol}.json", "r") as f:
+                    quote_json = json.load(f)["quote"]
+            except FileNotFoundError:
+                continue
+            security = security or Security(quote_json["symbol"])
+            quotes.append(self._parse_quote(datetime.combine(date.date(), datetime.min.time()), quote_json))
+        if security:
+            self.quote_service.add_quotes(security, quotes)
+        return security
+
     def from_json(self, file_name, security=None):
         try:
             with open(file_name, "r") as f:
@@ -74,6 +93,42 @@ class EtradeImporter:
         return np.nan if value == -9999999.0 else value
 
 
+class ChainProfile:
+    """
+    Selects the contracts of a chain file that become Option objects.
+
+    directions: option directions to keep
+    tradable: only keep contracts with a positive price and a delta or theta, the only ones
+        OptionChain.search reads
+    Contracts of a kept direction which are pruned keep their price in the chain,
+    so contracts held from an earlier day can still be marked.
+    """
+    def __init__(self, name, directions=(Option.CALL, Option.PUT), tradable=False):
+        self.name = name
+        self.directions = directions
+        self.tradable = tradable
+
+    def __repr__(self):
+        return self.name
+
+    def mask(self, df):
+        """ returns: boolean Series of the rows to keep """
+        mask = df["direction"].isin(self.directions)
+        if self.tradable:
+            mask &= (df["price"] > 0) & (df["delta"].notna() | df["theta"].notna())
+        return mask
+
+
+CHAIN_PROFILES = {
+    profile.name: profile for profile in (
+        ChainProfile("full"),
+        # the simulator only sells calls
+        ChainProfile("calls", directions=(Option.CALL,)),
+        ChainProfile("tradable", directions=(Option.CALL,), tradable=True),
+    )
+}
+
+
 class CsvImporter:
     def chains(self, path):
         """ imports chain data from a pathlib.Path """
@@ -84,13 +139,23 @@ class CsvImporter:
             yield self.parse_chain(date, security, f)
 
     def parse_quotes(self, path):
-        df = pd.read_csv(path, parse_dates=["date"], date_parser=from_small_date)
-        for index, quote in df.iterrows():
-            yield Quote(quote["close"], quote["date"].to_pydatetime())
+        df = read_csv(path, CLOSE, columns=["date", "close"])
+        for close, date in zip(df["close"].tolist(), df["date"].tolist()):
+            yield Quote(close, date)
 
-    def parse_chain(self, date, security, path):
+    def parse_chain(self, date, security, path, profile=None):
+        """ profile: a ChainProfile or its name, every contract is kept without one """
         chain = OptionChain(security, date)
-        df = pd.read_csv(path, parse_dates=["expiration"], date_parser=from_small_date)
+        df = read_csv(path, CHAIN, dates=("expiration",))
+        if profile is not None:
+            profile = CHAIN_PROFILES.get(profile, profile)
+            keep = profile.mask(df)
+            pruned = df[~keep & df["direction"].isin(profile.directions)]
+            chain.pruned_prices = dict(zip(
+                zip(pruned["direction"], pruned["expiration"].tolist(), pruned["strike"]),
+                pruned["price"]
+            ))
+            df = df[keep]
         for index, contract in df.iterrows():
             expiration = contract["expiration"].to_pydatetime()
             direction = contract["direction"]
@@ -0,0 +1,65 @@
+import math
+from collections import deque
+
+# the columns TrainingSetGenerator adds to close.csv
+COLUMNS = ("macd", "macd_signal", "macd_diff", "bb_bbm", "bb_bbh", "bb_bbl", "rsi")
+
+
+class Ema:
+    """ pandas' ewm(adjust=False).mean() one value at a time, None until min_periods values were seen """
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def update(self, x):
+        self.value = x if self.value is None else (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else None
+
+
+class IncrementalIndicators:
+    """
+    The MACD, Bollinger Bands and RSI of TrainingSetGenerator, with the same ta defaults,
+    updated with one close at a time in constant time rather than recomputed over the history.
+    Indicators are None until enough closes were seen.
+    """
+    def __init__(self, fast=12, slow=26, signal=9, bb_window=20, bb_dev=2, rsi_window=14):
+        self.fast = Ema(2 / (fast + 1), fast)
+        self.slow = Ema(2 / (slow + 1), slow)
+        self.signal = Ema(2 / (signal + 1), signal)
+        self.closes = deque(maxlen=bb_window)
+        self.bb_dev = bb_dev
+        self.up = Ema(1 / rsi_window, rsi_window)
+        self.down = Ema(1 / rsi_window, rsi_window)
+        self.previous = None
+
+    def update(self, close):
+        """ returns: dict of COLUMNS: value after close """
+        row = dict.fromkeys(COLUMNS)
+
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is not None and slow is not None:
+            row["macd"] = fast - slow
+            row["macd_signal"] = self.signal.update(row["macd"])
+            if row["macd_signal"] is not None:
+                row["macd_diff"] = row["macd"] - row["macd_signal"]
+
+        self.closes.append(close)
+        if len(self.closes) == self.closes.maxlen:
+            mean = sum(self.closes) / len(self.closes)
+            stdev = math.sqrt(sum((c - mean) ** 2 for c in self.closes) / len(self.closes))
+            row["bb_bbm"] = mean
+            row["bb_bbh"] = mean + self.bb_dev * stdev
+            row["bb_bbl"] = mean - self.bb_dev * stdev
+
+        # the first close has no change, ta counts it as neither up nor down
+        change = close - self.previous if self.previous is not None else 0.0
+        self.previous = close
+        up = self.up.update(max(change, 0.0))
+        down = self.down.update(max(-change, 0.0))
+        if up is not None:
+            row["rsi"] = 100.0 if down == 0 else 100 - 100 / (1 + up / down)
+        return row
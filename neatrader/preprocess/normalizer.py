@@ -1,9 +1,45 @@
 import pandas as pd
 from os.path import split
 from pathlib import Path
-from neatrader.utils import from_small_date, small_date
+from neatrader.loader import CHAIN, SMALL_DATE, read_csv
 from neatrader.math import min_max
 
+# chain columns normalized on the scale of all chains
+GREEKS = ['iv', 'delta', 'theta', 'vega']
+
+
+def read_scales(path):
+    """ the min and max of each column, as Normalizer.to_csv writes them to scales.csv """
+    return pd.read_csv(path, index_col=0)
+
+
+def normalize_value(column, value, scales):
+    """ normalizes a value of a tape column the same way Normalizer normalizes the tapes """
+    if column in scales.index:
+        return min_max(value, scales['min'][column], scales['max'][column])
+    if column == 'rsi':
+        return value / 100
+    return value
+
+
+def normalize_greeks(df, scales):
+    """ normalizes the greeks of a chain file's DataFrame """
+    for column in GREEKS:
+        mn, mx = scales.loc[column]
+        df[column] = df[column].apply(lambda x: min_max(x, mn, mx))
+    return df
+
+
+def normalize_chain(chain, scales):
+    """ normalizes the greeks of the options of an OptionChain in place, as normalize_greeks does """
+    bounds = [(column, *scales.loc[column]) for column in GREEKS]
+    for expirations in chain.chain.values():
+        for options in expirations.values():
+            for option in options.values():
+                for column, mn, mx in bounds:
+                    setattr(option, column, min_max(getattr(option, column), mn, mx))
+    return chain
+
 
 class Normalizer:
     def __init__(self, path):
@@ -19,19 +55,17 @@ class Normalizer:
     def normalize_chains(self):
         for path in (self.path / 'chains').glob('**/*.csv'):
             name = split(path)[1]
-            df = pd.read_csv(path)
-            for column in ['iv', 'delta', 'theta', 'vega']:
-                mn, mx = self.scales.loc[column]
-                df[column] = df[column].apply(lambda x: min_max(x, mn, mx))
-            yield name, df
+            # expirations are written back as they were read
+            df = read_csv(path, CHAIN, dates=())
+            yield name, normalize_greeks(df, self.scales)
 
     def to_csv(self, out_path):
         training = self.normalize_training()
-        training['date'] = training['date'].apply(small_date)
+        training['date'] = training['date'].dt.strftime(SMALL_DATE)
         training.to_csv(out_path / 'training.csv', encoding='utf-8', index=False)
 
         cv = self.normalize_cv()
-        cv['date'] = cv['date'].apply(small_date)
+        cv['date'] = cv['date'].dt.strftime(SMALL_DATE)
         cv.to_csv(out_path / 'cross_validation.csv', encoding='utf-8', index=False)
 
         Path(out_path / 'chains').mkdir(exist_ok=True)
@@ -46,9 +80,8 @@ class Normalizer:
         combines the training set and cross validation sets,
         then records the min and max of each column
         """
-        train = pd.read_csv(self.path / 'training.csv', parse_dates=['date'], date_parser=from_small_date)
-        cv = pd.read_csv(self.path / 'cross_validation.csv', parse_dates=['date'],
-                         date_parser=from_small_date)
+        train = read_csv(self.path / 'training.csv')
+        cv = read_csv(self.path / 'cross_validation.csv')
         df = pd.concat([train, cv], axis=0)
 
         # stock price group. These metrics match the security price or are very similar
@@ -63,11 +96,11 @@ class Normalizer:
         self._add_scales_for_group(scales, macd, mn, mx)
 
         # option greeks are on their own scale
-        greeks = ['iv', 'delta', 'theta', 'vega']
+        greeks = GREEKS
         mins = []
         maxs = []
         for path in (self.path / 'chains').glob('**/*.csv'):
-            df = pd.read_csv(path, usecols=greeks)
+            df = read_csv(path, CHAIN, columns=greeks, dates=())
             mn, mx = self._scales_for_group(df, greeks)
             mins.append(mn)
             maxs.append(mx)
@@ -86,11 +119,8 @@ class Normalizer:
         return (mn, mx)
 
     def _normalize_set(self, path):
-        df = pd.read_csv(path, parse_dates=['date'], date_parser=from_small_date)
+        df = read_csv(path)
         for col in df.columns:
-            if col in self.scales.index:
-                mn = self.scales['min'][col]
-                mx = self.scales['max'][col]
-                df[col] = df[col].apply(lambda x: min_max(x, mn, mx))
-        df['rsi'] = df['rsi'].apply(lambda x: x / 100)
+            if col != 'date':
+                df[col] = normalize_value(col, df[col], self.scales)
         return df
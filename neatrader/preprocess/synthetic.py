@@ -0,0 +1,211 @@
+import argparse
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from neatrader.model.option import IV_DAYS
+from neatrader.preprocess.training import TrainingSetGenerator
+from neatrader.utils import small_date
+from pathlib import Path
+
+TRADING_DAYS = 252
+WEEKLY_EXPIRATIONS = 4
+STRIKE_STEPS = [0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+_erf = np.vectorize(math.erf, otypes=[float])
+
+
+def norm_cdf(x):
+    return 0.5 * (1 + _erf(x / math.sqrt(2)))
+
+
+def norm_pdf(x):
+    return np.exp(-x ** 2 / 2) / math.sqrt(2 * math.pi)
+
+
+def black_scholes(is_call, close, strike, years, iv, rate):
+    """
+    prices and greeks of european options, arguments are numpy arrays of the same shape
+    returns: (price, delta, theta per day, vega per volatility point)
+    """
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(close / strike) + (rate + iv ** 2 / 2) * years) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    discount = strike * np.exp(-rate * years)
+    decay = -close * norm_pdf(d1) * iv / (2 * sqrt_t)
+
+    call_price = close * norm_cdf(d1) - discount * norm_cdf(d2)
+    put_price = discount * norm_cdf(-d2) - close * norm_cdf(-d1)
+    price = np.where(is_call, call_price, put_price)
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1)
+    theta = np.where(is_call, decay - rate * discount * norm_cdf(d2), decay + rate * discount * norm_cdf(-d2)) / 365
+    vega = close * norm_pdf(d1) * sqrt_t / 100
+    return (price, delta, theta, vega)
+
+
+class SyntheticMarket:
+    """
+    Generates a data set in the layout of resources/data/<symbol> without any real market data.
+
+    Closing prices follow a geometric brownian motion whose volatility mean reverts and moves
+    against the price. Every trading day lists calls and puts for `expirations` expiration dates
+    and `strikes` strikes centered on the close, priced with Black-Scholes and a volatility smile.
+    Once the price rises above split_above the stock splits by split_multiplier.
+    The same seed always produces the same data set.
+    """
+    def __init__(self, symbol="SYN", years=2, strikes=40, expirations=12, seed=0, start=datetime(2019, 1, 2),
+                 price=100.0, drift=0.1, volatility=0.5, rate=0.01, split_above=None, split_multiplier=5):
+        self.symbol = symbol
+        self.years = years
+        self.strikes = strikes
+        self.expirations = expirations
+        self.seed = seed
+        self.start = start
+        self.price = price
+        self.drift = drift
+        self.volatility = volatility
+        self.rate = rate
+        self.split_above = split_above if split_above else 4 * price
+        self.split_multiplier = split_multiplier
+
+    def prices(self):
+        """ returns: DataFrame of date, close and the volatility of the day, and a dict of split date: multiplier """
+        rng = np.random.default_rng(self.seed)
+        dates = pd.bdate_range(self.start, periods=max(int(self.years * TRADING_DAYS), 2))
+        dt = 1 / TRADING_DAYS
+        shocks = rng.standard_normal((len(dates), 2))
+
+        close = np.empty(len(dates))
+        vol = np.empty(len(dates))
+        price, log_vol, mean_log_vol = self.price, math.log(self.volatility), math.log(self.volatility)
+        for i, (price_shock, vol_shock) in enumerate(shocks):
+            sigma = math.exp(log_vol)
+            close[i] = price
+            vol[i] = sigma
+            price *= math.exp((self.drift - sigma ** 2 / 2) * dt + sigma * math.sqrt(dt) * price_shock)
+            # volatility rises when the price falls
+            vol_shock = -0.5 * price_shock + math.sqrt(0.75) * vol_shock
+            log_vol += 4 * (mean_log_vol - log_vol) * dt + 1.5 * math.sqrt(dt) * vol_shock
+
+        splits = {}
+        factor = 1
+        for i, date in enumerate(dates):
+            if close[i] / factor > self.split_above:
+                factor *= self.split_multiplier
+                splits[date.to_pydatetime()] = self.split_multiplier
+            close[i] = close[i] / factor
+
+        return pd.DataFrame({"date": dates, "close": close.round(2), "vol": vol}), splits
+
+    def expiration_dates(self, date):
+        """ the next weekly expirations followed by monthly expirations on the third friday """
+        friday = date + timedelta(days=(4 - date.weekday()) % 7 or 7)
+        weeklies = [friday + timedelta(weeks=i) for i in range(WEEKLY_EXPIRATIONS)]
+        monthlies = []
+        month = datetime(weeklies[-1].year, weeklies[-1].month, 1)
+        while len(weeklies) + len(monthlies) < self.expirations:
+            third_friday = month + timedelta(days=(4 - month.weekday()) % 7 + 14)
+            if third_friday > weeklies[-1]:
+                monthlies.append(third_friday)
+            month = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+        return (weeklies + monthlies)[:self.expirations]
+
+    def strike_prices(self, close):
+        """ strikes centered on the close, spaced so they span about half the price either way """
+        step = next((s for s in STRIKE_STEPS if s >= close / self.strikes), STRIKE_STEPS[-1])
+        center = round(close / step)
+        strikes = step * (center + np.arange(self.strikes) - self.strikes // 2)
+        return strikes[strikes > 0]
+
+    def chain(self, date, close, vol):
+        """ returns: DataFrame with the columns of a chains/*.csv file and the days until each expiration """
+        expirations = self.expiration_dates(date)
+        strikes = self.strike_prices(close)
+        is_call = np.repeat([True, False], len(expirations) * len(strikes))
+        expiration = np.tile(np.repeat([small_date(e) for e in expirations], len(strikes)), 2)
+        strike = np.tile(strikes, 2 * len(expirations))
+        days = np.tile(np.repeat([(e - date).days for e in expirations], len(strikes)), 2)
+        years = days / 365
+
+        # a smile, with out of the money puts more expensive than calls
+        moneyness = np.log(strike / close)
+        iv = np.maximum(vol * (1 + 0.5 * moneyness ** 2 - 0.1 * moneyness), 0.05)
+        price, delta, theta, vega = black_scholes(is_call, close, strike, years, iv, self.rate)
+
+        return pd.DataFrame({
+            "direction": np.where(is_call, "call", "put"),
+            "expiration": expiration,
+            "strike": strike,
+            "price": np.maximum(price, 0.01).round(2),
+            "iv": iv.round(4),
+            "delta": delta.round(4),
+            "theta": theta.round(4),
+            "vega": vega.round(4),
+            "days": days,
+        })
+
+    def implied_volatilities(self, chain, close):
+        """ price weighted iv of out of the money contracts, the same as OptionChain.iv for IV_DAYS """
+        days = chain["days"].to_numpy()
+        strike = chain["strike"].to_numpy()
+        price = chain["price"].to_numpy()
+        iv = chain["iv"].to_numpy()
+        is_call = (chain["direction"] == "call").to_numpy()
+        otm = np.where(is_call, strike > close, strike < close) & (price > 0)
+
+        result = {}
+        expiration_days = np.unique(days)
+        for days_future in IV_DAYS:
+            # OptionChain.closest_expiration prefers the later date on a tie
+            closest = min(expiration_days, key=lambda d: (abs(d - days_future), -d))
+            contracts = otm & (days == closest)
+            weights = price[contracts].sum()
+            result[f"iv_{days_future}"] = (iv[contracts] * price[contracts]).sum() / weights if weights > 0 else None
+        return result
+
+    def to_csv(self, out_path, cv_proportion=0.2):
+        """ writes close.csv, splits.csv, chains/*.csv, training.csv and cross_validation.csv """
+        path = Path(out_path) / self.symbol
+        (path / "chains").mkdir(parents=True, exist_ok=True)
+        prices, splits = self.prices()
+
+        closes = []
+        for date, close, vol in prices.itertuples(index=False):
+            date = date.to_pydatetime()
+            chain = self.chain(date, close, vol)
+            closes.append({"date": small_date(date), "close": close, **self.implied_volatilities(chain, close)})
+            chain.drop(columns="days").to_csv(path / "chains" / f"{small_date(date)}.csv", encoding="utf-8", index=False)
+
+        pd.DataFrame(closes).to_csv(path / "close.csv", encoding="utf-8", index=False)
+        with open(path / "splits.csv", "w", encoding="utf-8") as f:
+            f.write("date,multiplier\n")
+            for date, multiplier in splits.items():
+                f.write(f"'{date:%Y-%m-%d}',{multiplier}\n")
+
+        TrainingSetGenerator(path).to_csv(cv_proportion=cv_proportion)
+        return path
+
+
+def generate(out_path, symbols=1, symbol="SYN", seed=0, **kwargs):
+    """
+    writes `symbols` independent data sets to out_path
+    a single data set is named symbol, otherwise they are numbered from symbol0
+    """
+    names = [symbol] if symbols == 1 else [f"{symbol}{i}" for i in range(symbols)]
+    return [SyntheticMarket(name, seed=seed + i, **kwargs).to_csv(out_path) for i, name in enumerate(names)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="generate synthetic market data")
+    parser.add_argument("out_path", help="directory to write data sets to, e.g. resources/data")
+    parser.add_argument("--symbol", default="SYN")
+    parser.add_argument("--symbols", type=int, default=1, help="number of independent data sets")
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--strikes", type=int, default=40, help="strikes per expiration")
+    parser.add_argument("--expirations", type=int, default=12, help="expirations listed per day")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in generate(args.out_path, args.symbols, args.symbol, args.seed, years=args.years,
+                         strikes=args.strikes, expirations=args.expirations):
+        print(f"wrote {path}")
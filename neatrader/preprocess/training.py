@@ -1,5 +1,4 @@
-import pandas as pd
-from neatrader.utils import small_date, from_small_date
+from neatrader.loader import CLOSE, SMALL_DATE, read_csv
 from ta.momentum import RSIIndicator
 from ta.trend import MACD
 from ta.volatility import BollingerBands
@@ -10,7 +9,7 @@ class TrainingSetGenerator:
         self.source_path = source_path
 
     def generate(self):
-        df = pd.read_csv(self.source_path / "close.csv", parse_dates=["date"], date_parser=from_small_date)
+        df = read_csv(self.source_path / "close.csv", CLOSE)
         df.dropna(axis=0)
         close = df["close"]
         self._macd(df, close)
@@ -21,7 +20,7 @@ class TrainingSetGenerator:
     def to_csv(self, out_path=None, cv_proportion=0.2):
         file_path = out_path if out_path else self.source_path
         df = self.generate()
-        df["date"] = df["date"].apply(small_date)
+        df["date"] = df["date"].dt.strftime(SMALL_DATE)
         size = len(df)
         training_size = int(size * (1 - cv_proportion))
         df[:training_size].to_csv(file_path / "training.csv", encoding="utf-8", index=False)
@@ -0,0 +1,115 @@
+from collections import deque
+from neat.reporting import BaseReporter
+from time import perf_counter_ns
+
+# phases nest: simulate includes everything below it, sell includes chain lookups and search
+PHASES = (
+    "window", "simulate", "engine_eval", "activate", "buy", "sell", "search",
+    "chain_lookup", "chain_parse", "contract_value", "fitness"
+)
+
+
+class TimedNetwork:
+    """ a network whose activations are timed """
+    def __init__(self, net, profiler):
+        self.activate = profiler.timed("activate", net.activate)
+
+
+class PhaseProfiler:
+    """
+    Wall time and call counts of each phase of a simulation.
+
+    Profiling is opt-in per Simulator: instrument() replaces the phase methods of one
+    simulator and its TradingEngine with timed wrappers, so simulators that are not
+    instrumented run exactly as before. Profilers of worker processes are combined
+    with merge().
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nanoseconds = dict.fromkeys(PHASES, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, nanoseconds, calls=1):
+        self.nanoseconds[phase] += nanoseconds
+        self.calls[phase] += calls
+
+    def merge(self, other):
+        for phase in PHASES:
+            self.add(phase, other.nanoseconds[phase], other.calls[phase])
+        return self
+
+    def timed(self, phase, function):
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.nanoseconds[phase] += perf_counter_ns() - start
+                self.calls[phase] += 1
+        return timed
+
+    def instrument(self, simulator):
+        simulate_window = simulator.simulate_window
+        simulator.simulate_window = self.timed(
+            "simulate",
+            lambda net, window, pruning=None: simulate_window(TimedNetwork(net, self), window, pruning)
+        )
+        simulator.engine.eval = self.timed("engine_eval", simulator.engine.eval)
+        simulator.importer.parse_chain = self.timed("chain_parse", simulator.importer.parse_chain)
+        for phase, method in (("buy", "_buy"), ("sell", "_sell"), ("search", "_search"),
+                              ("chain_lookup", "_most_recent_chain"), ("contract_value", "_contract_value"),
+                              ("fitness", "_calculate_fitness")):
+            setattr(simulator, method, self.timed(phase, getattr(simulator, method)))
+        return simulator
+
+    def summary(self):
+        """ returns: dict of phase: (calls, seconds) for phases that ran """
+        return {
+            phase: (self.calls[phase], self.nanoseconds[phase] / 1e9)
+            for phase in PHASES if self.calls[phase]
+        }
+
+    def __str__(self):
+        lines = [f"{'phase':<16}{'calls':>10}{'seconds':>10}{'us/call':>10}"]
+        for phase, (calls, seconds) in self.summary().items():
+            lines.append(f"{phase:<16}{calls:>10}{seconds:>10.3f}{seconds / calls * 1e6:>10.1f}")
+        return "\n".join(lines)
+
+
+class ProfileReporter(BaseReporter):
+    """
+    Collects the phase profile of every generation from the profilers it is given,
+    e.g. the training evaluator's and the cross validator's.
+
+    Cross validation runs in the background, so its work shows up in the generation
+    during which it was collected. Only the latest `history` generations are kept.
+    """
+    def __init__(self, *profilers, show=True, history=100):
+        self.profilers = profilers
+        self.show = show
+        self.generations = deque(maxlen=history)
+
+    def __getstate__(self):
+        # the species set holds on to its reporters and is pickled into every checkpoint,
+        # the collected profiles are left out
+        state = self.__dict__.copy()
+        state["generations"] = deque(maxlen=self.generations.maxlen)
+        return state
+
+    def start_generation(self, generation):
+        for profiler in self.profilers:
+            profiler.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        profile = PhaseProfiler()
+        for profiler in self.profilers:
+            profile.merge(profiler)
+        self.generations.append(profile)
+        if self.show:
+            print(profile)
+
+    def profile(self, generation=-1):
+        """ returns: dict of phase: (calls, seconds) of a kept generation, the latest by default """
+        return self.generations[generation].summary()
@@ -1,28 +1,97 @@
-from heapq import heappush, heappop
+from bisect import bisect_left, bisect_right
+from neatrader.loader import CLOSE, read_csv
+from neatrader.model import Quote
 
 
-class MaxHeapQuote:
-    def __init__(self, quote):
-        self.quote = quote
+class QuoteSeries:
+    """
+    The quotes of one security sorted by date, at most one per date.
+    Quotes arriving in date order are appended, as-of and range lookups are binary searches.
+    """
+    def __init__(self):
+        self.dates = []
+        self.quotes = []
+
+    def __len__(self):
+        return len(self.quotes)
+
+    def add(self, quote):
+        """ a quote for a date already in the series replaces it """
+        date = quote.datetime
+        if not self.dates or date > self.dates[-1]:
+            self.dates.append(date)
+            self.quotes.append(quote)
+            return
+        i = bisect_left(self.dates, date)
+        if self.dates[i] == date:
+            self.quotes[i] = quote
+        else:
+            self.dates.insert(i, date)
+            self.quotes.insert(i, quote)
+
+    def extend(self, quotes):
+        """ adds many quotes with a single sort """
+        by_date = dict(zip(self.dates, self.quotes))
+        for quote in quotes:
+            by_date[quote.datetime] = quote
+        self.dates = sorted(by_date)
+        self.quotes = [by_date[date] for date in self.dates]
+
+    def latest(self):
+        return self.quotes[-1] if self.quotes else None
+
+    def pop(self):
+        self.dates.pop()
+        return self.quotes.pop()
 
-    def __lt__(self, other):
-        return self.quote > other.quote
+    def as_of(self, date):
+        """ the most recent quote on or before date """
+        i = bisect_right(self.dates, date)
+        return self.quotes[i - 1] if i else None
+
+    def between(self, start, end):
+        """ the quotes from start to end, both inclusive """
+        return self.quotes[bisect_left(self.dates, start):bisect_right(self.dates, end)]
 
 
 class QuoteService:
+    """ Quotes of each security indexed by date """
     def __init__(self):
+        # security: QuoteSeries
         self.quotes = {}
 
+    def series(self, security):
+        series = self.quotes.get(security)
+        if series is None:
+            series = self.quotes[security] = QuoteSeries()
+        return series
+
     def add_quote(self, security, quote):
-        quote = MaxHeapQuote(quote)
-        quote_heap = self.quotes.get(security, [])
-        if not quote_heap:
-            self.quotes[security] = quote_heap
-        heappush(quote_heap, quote)
+        self.series(security).add(quote)
+
+    def add_quotes(self, security, quotes):
+        self.series(security).extend(quotes)
+
+    def load_close(self, security, path):
+        """ adds the closes of a close.csv """
+        df = read_csv(path, CLOSE, columns=["date", "close"])
+        self.add_quotes(security, map(Quote, df["close"].tolist(), df["date"].tolist()))
 
     def quote(self, security):
-        quotes = self.quotes.get(security)
-        return quotes[0].quote if quotes else None
+        """ the latest quote """
+        series = self.quotes.get(security)
+        return series.latest() if series else None
 
     def pop(self, security):
-        return heappop(self.quotes.get(security)).quote
+        """ removes and returns the latest quote """
+        return self.quotes[security].pop()
+
+    def as_of(self, security, date):
+        """ the most recent quote of security on or before date, None without one """
+        series = self.quotes.get(security)
+        return series.as_of(date) if series else None
+
+    def between(self, security, start, end):
+        """ the quotes of security from start to end, both inclusive """
+        series = self.quotes.get(security)
+        return series.between(start, end) if series else []
@@ -0,0 +1,130 @@
+import logging
+import neatrader.visualize as vis
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from neatrader.model import Portfolio
+from neatrader.reporter import TradeReporter
+from neatrader.stats import StatisticsHistory
+from neatrader.trading import Simulator
+from neatrader.trading.features import input_node_names
+
+log = logging.getLogger(__name__)
+
+OUTPUT_NAMES = {0: "open", 1: "close", 2: "hold", 3: "strike", 4: "expiration"}
+# StatisticsHistory by directory, the worker process lives on so each render reads new rows only
+_histories = {}
+
+
+class ReportSnapshot:
+    """ Everything needed to report on an iteration, detached from the live population """
+    def __init__(self, config, winner, win_net, statistics, security, path, inputs, training, daterange,
+                 traces=None):
+        """
+        statistics: directory of the run's StatisticsLog
+        traces: SimulationTraces of the winner's evaluation, the winner is simulated over daterange without
+        """
+        self.config = config
+        self.winner = winner
+        self.win_net = win_net
+        self.statistics = statistics
+        self.security = security
+        self.path = path
+        # only the rows of the trades plot window are shipped to the worker
+        start, end = daterange
+        self.training = training.loc[(training["date"] >= start) & (training["date"] <= end)]
+        self.daterange = daterange
+        self.traces = traces
+        self.inputs = inputs
+        self.node_names = {**input_node_names(inputs), **OUTPUT_NAMES}
+
+
+def render(snapshot, view=False):
+    """ plots statistics, the winner's trades and the winning network """
+    history = _histories.get(snapshot.statistics)
+    if history is None:
+        history = _histories[snapshot.statistics] = StatisticsHistory(snapshot.statistics)
+    history.refresh()
+    vis.plot_stats(history, ylog=False, view=view)
+    vis.plot_species(history, view=view)
+
+    if snapshot.traces:
+        render_traces(snapshot.traces, view)
+    else:
+        simulate_winner(snapshot, view)
+
+    # plot the network
+    vis.draw_net(
+        snapshot.config, snapshot.winner, view=view, node_names=snapshot.node_names,
+        filename="neural_net", prune_unused=False, show_disabled=False
+    )
+
+
+def render_traces(traces, view=False):
+    """ plots the first window of the winner's evaluation and prints all of them """
+    vis.plot_trace(traces[0], view=view)
+    for i, trace in enumerate(traces):
+        print(f"\nWinner simulation {i + 1} of {len(traces)}:\nfitness: {trace.fitness:.2f}")
+        print(f"trades:")
+        for trade in trace.trades.records():
+            print(trade)
+        print(f"\nending portfolio:\n{trace.portfolio}")
+
+
+def simulate_winner(snapshot, view=False):
+    """ simulates the winning network one time for a trades plot """
+    portfolio = Portfolio(cash=0.0, securities={snapshot.security: 100})
+    reporter = TradeReporter()
+    simulator = Simulator(
+        snapshot.security, portfolio, snapshot.path, snapshot.training, reporter, inputs=snapshot.inputs
+    )
+    vis.plot_trades(
+        snapshot.win_net, simulator, snapshot.daterange, snapshot.training, snapshot.path, reporter, view=view
+    )
+    print(f"\nWinner simulation:\nfitness: {reporter.fitness:.2f}")
+    print(f"trades:")
+    for trade in reporter.records():
+        print(trade)
+    print(f"\nending portfolio:\n{portfolio}")
+
+
+class ReportWorker:
+    """
+    Renders reports in a separate process so evolution never waits on matplotlib or graphviz.
+
+    Only one report is rendered at a time, a snapshot submitted while the previous one
+    is still rendering is skipped. A headless worker produces no artifacts at all.
+    """
+    def __init__(self, headless=False):
+        self.headless = headless
+        self.skipped = 0
+        self.future = None
+        self.executor = None
+        if not headless:
+            # spawn so the worker does not inherit the checkpointer thread's locks
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"))
+
+    def busy(self):
+        return self.future is not None and not self.future.done()
+
+    def submit(self, snapshot):
+        """ returns True if the snapshot will be rendered """
+        if self.headless:
+            return False
+        if self.busy():
+            self.skipped += 1
+            log.info(f"report worker busy, skipped {self.skipped} reports")
+            return False
+        self._check_result()
+        self.future = self.executor.submit(render, snapshot)
+        return True
+
+    def close(self):
+        """ waits for the report in progress to finish """
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self._check_result()
+
+    def _check_result(self):
+        if self.future is not None and self.future.exception() is not None:
+            log.error(f"failed to render report: {self.future.exception()}")
+        self.future = None
@@ -1,14 +1,209 @@
+import numpy as np
 import pandas as pd
+from array import array
+from datetime import date
+
+ACTIONS = ("buy", "sell", "assign", "exercise", "expire")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+# ordinal of 1970-01-01, dates are stored as day ordinals
+EPOCH = date(1970, 1, 1).toordinal()
+NO_GENOME = -1
 
 
 class TradeReporter:
-    def __init__(self):
-        self.row_list = []
+    """
+    Columnar trade log backed by typed arrays: date, action code, contract id, amount,
+    price and the genome that traded.
+
+    Securities are interned, the contract column holds an index into `securities`.
+    One reporter can log a single simulation, or the trades of a whole population by
+    setting genome_id before each genome is simulated.
+    """
+    def __init__(self, genome_id=NO_GENOME):
+        self.genome_id = genome_id
         self.fitness = 0.0
+        self.securities = []
+        self.security_ids = {}
+        self.clear()
+
+    def clear(self):
+        self.dates = array("i")
+        self.actions = array("b")
+        self.contracts = array("i")
+        self.amounts = array("i")
+        self.prices = array("d")
+        self.genomes = array("q")
 
     def record(self, date, action, security, amt=1, price=None):
-        record = {"date": date, "action": action, "security": security, "amt": amt, "price": price}
-        self.row_list.append(record)
+        security_id = self.security_ids.get(security)
+        if security_id is None:
+            security_id = self.security_ids[security] = len(self.securities)
+            self.securities.append(security)
+        self.dates.append(date.toordinal())
+        self.actions.append(ACTION_CODES[action])
+        self.contracts.append(security_id)
+        self.amounts.append(amt)
+        self.prices.append(np.nan if price is None else price)
+        self.genomes.append(self.genome_id)
+
+    def records(self):
+        """ yields a dict per trade """
+        for row in self.to_df().itertuples(index=False):
+            yield row._asdict()
 
     def to_df(self):
-        return pd.DataFrame(data=self.row_list)
+        securities = np.empty(len(self.securities), dtype=object)
+        securities[:] = self.securities
+        return pd.DataFrame({
+            "date": pd.to_datetime(np.asarray(self.dates, dtype=np.int64) - EPOCH, unit="D"),
+            "action": pd.Categorical.from_codes(np.asarray(self.actions), categories=ACTIONS),
+            "security": securities[np.asarray(self.contracts, dtype=np.intp)],
+            "amt": np.asarray(self.amounts),
+            "price": np.asarray(self.prices),
+            "genome": np.asarray(self.genomes),
+        })
+
+    def to_file(self, filename):
+        """ writes the columns to a compressed numpy .npz file, securities are stored by name """
+        np.savez_compressed(
+            filename,
+            date=np.asarray(self.dates),
+            action=np.asarray(self.actions),
+            contract=np.asarray(self.contracts),
+            amt=np.asarray(self.amounts),
+            price=np.asarray(self.prices),
+            genome=np.asarray(self.genomes),
+            securities=np.array([str(security) for security in self.securities], dtype=str),
+        )
+
+
+class NullReporter:
+    """ stands in for a TradeReporter when trades are not logged, so callers can always record """
+    __slots__ = ()
+
+    @property
+    def fitness(self):
+        return None
+
+    @fitness.setter
+    def fitness(self, fitness):
+        pass
+
+    def record(self, date, action, security, amt=1, price=None):
+        pass
+
+
+NULL_REPORTER = NullReporter()
+
+
+def read_trades(filename):
+    """ reads a file written by TradeReporter.to_file, securities are named rather than objects """
+    with np.load(filename) as data:
+        securities = data["securities"]
+        return pd.DataFrame({
+            "date": pd.to_datetime(data["date"].astype(np.int64) - EPOCH, unit="D"),
+            "action": pd.Categorical.from_codes(data["action"], categories=ACTIONS),
+            "security": securities[data["contract"]],
+            "amt": data["amt"],
+            "price": data["price"],
+            "genome": data["genome"],
+        })
+
+
+# decisions of a network on a day, NO_DECISION when it was not activated
+DECISIONS = ("hold", "buy", "sell")
+DECISION_CODES = {decision: code for code, decision in enumerate(DECISIONS)}
+NO_DECISION = -1
+
+
+class SimulationTrace:
+    """
+    What happened on each day of one simulation: the close, the network's inputs and
+    outputs, its decision and the portfolio value after trading, along with the trades
+    and the fitness. Recorded as the simulation runs, so it can be plotted and printed
+    later without simulating again.
+    """
+    def __init__(self, num_inputs, num_outputs=5):
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.trades = TradeReporter()
+        self.fitness = None
+        # the ending portfolio, as printed
+        self.portfolio = None
+        self.dates = array("i")
+        self.closes = array("d")
+        # row major, num_inputs and num_outputs values per day
+        self.inputs = array("d")
+        self.outputs = array("d")
+        self.decisions = array("b")
+        self.values = array("d")
+
+    def __len__(self):
+        return len(self.dates)
+
+    def record(self, date, close, value, inputs=None, outputs=None, decision=None):
+        """ inputs, outputs and decision are None on days the network was not activated """
+        self.dates.append(date.toordinal())
+        self.closes.append(close)
+        self.values.append(value)
+        if decision is None:
+            self.inputs.extend([np.nan] * self.num_inputs)
+            self.outputs.extend([np.nan] * self.num_outputs)
+            self.decisions.append(NO_DECISION)
+        else:
+            self.inputs.extend(inputs)
+            self.outputs.extend(outputs)
+            self.decisions.append(DECISION_CODES[decision])
+
+    def to_df(self):
+        """ a row per day: date, close, value, decision, input_<i> and output_<i> """
+        decisions = np.asarray(self.decisions)
+        df = pd.DataFrame({
+            "date": pd.to_datetime(np.asarray(self.dates, dtype=np.int64) - EPOCH, unit="D"),
+            "close": np.asarray(self.closes),
+            "value": np.asarray(self.values),
+            # days without a decision are missing
+            "decision": pd.Categorical.from_codes(decisions, categories=DECISIONS),
+        })
+        inputs = np.asarray(self.inputs).reshape(-1, self.num_inputs)
+        outputs = np.asarray(self.outputs).reshape(-1, self.num_outputs)
+        for i in range(self.num_inputs):
+            df[f"input_{i}"] = inputs[:, i]
+        for i in range(self.num_outputs):
+            df[f"output_{i}"] = outputs[:, i]
+        return df
+
+
+class TraceRecorder:
+    """
+    Keeps the simulation traces of the best genomes evaluated so far.
+
+    Once the fitness of a genome is known, its traces are recorded and kept only if it is
+    among the keep best genomes. A genome evaluated again, as an elite of a later generation,
+    keeps the traces of its best evaluation.
+    """
+    def __init__(self, keep=1):
+        self.keep = keep
+        # genome_id: (fitness, list of SimulationTrace)
+        self.traces = {}
+
+    def accepts(self, genome_id, fitness):
+        """ True if the traces of an evaluation with this fitness would be kept """
+        kept = self.traces.get(genome_id)
+        if kept is not None:
+            return fitness > kept[0]
+        return len(self.traces) < self.keep or fitness > min(kept for kept, _ in self.traces.values())
+
+    def offer(self, genome_id, fitness, traces):
+        """ returns True if the traces were kept """
+        if not self.accepts(genome_id, fitness):
+            return False
+        if genome_id not in self.traces and len(self.traces) >= self.keep:
+            del self.traces[min(self.traces, key=lambda key: self.traces[key][0])]
+        self.traces[genome_id] = (fitness, traces)
+        return True
+
+    def get(self, genome_id):
+        """ returns: the traces of a genome's best evaluation, None if they were not kept """
+        kept = self.traces.get(genome_id)
+        return kept[1] if kept else None
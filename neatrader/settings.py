@@ -0,0 +1,96 @@
+from configparser import ConfigParser
+from neatrader.trading.features import MARKET_INPUTS
+
+
+class Settings:
+    """
+    Options for neatrader itself, read from the [Neatrader] section of the NEAT config file.
+    NEAT ignores sections it does not know about.
+    """
+    SECTION = "Neatrader"
+
+    def __init__(self):
+        # data sets under resources/data to train on, the first is also cross validated
+        self.symbols = ("TSLA",)
+        # symbols sampled for each generation, 0 for all of them
+        self.symbols_per_generation = 0
+        # keep parsed training and cross validation tapes in hidden files next to them, read until a tape changes
+        self.csv_cache = False
+        self.simulation_days = 90
+        # date ranges every genome is evaluated on each generation
+        self.windows = 1
+        # how window fitnesses are combined: mean, min, max, median or a quantile such as q0.25
+        self.reducer = "mean"
+        # stop simulations once the portfolio can no longer trade, their fitness is unchanged
+        self.prune = True
+        # with a min, median, max or quantile reducer, stop simulating a genome on further windows
+        # once it is certain to score below this quantile of the previous generation, 0 to disable
+        self.prune_quantile = 0.0
+        # genomes per generation scored on the cross validation set
+        self.cv_top_k = 5
+        # tape columns used as network inputs after cash, shares and held option value
+        self.inputs = MARKET_INPUTS
+        # contracts imported from chain files: full, calls or tradable (calls the simulator can sell)
+        self.chain_profile = "tradable"
+        # theta and delta buckets of the memoized per day contract search, 0 to search every sell
+        self.search_buckets = 256
+        # threads loading the chains of upcoming simulation windows, 0 loads them as simulations reach them
+        self.prefetch_workers = 2
+        # chain cache entries, a (symbol, date) each, kept before the least recently used are evicted, 0 for no bound
+        self.chain_cache_size = 10000
+        # best genomes whose simulations are kept day by day, so the winner is reported without
+        # simulating it again. Every simulation is traced while it is set, 0 simulates the winner
+        # on a new random date range
+        self.trace_best = 1
+        # time the phases of every simulation and print them each generation
+        self.profile = False
+        # file receiving a line of performance metrics per generation, empty to disable
+        self.metrics = "metrics.jsonl"
+        # directory the fitness and species statistics of every generation are appended to
+        self.statistics = "statistics"
+        # file the winner of every iteration is pickled to for backtesting, empty to disable
+        self.winner = "winner.pkl"
+        # largest allocation sites to include in the metrics, tracemalloc slows evaluation down
+        self.trace_allocations = 0
+        # host:port to serve genomes to evaluation workers on, empty to evaluate in this process
+        self.coordinator = ""
+        # shared secret workers authenticate with, the coordinator unpickles what they send.
+        # a random one is generated and printed when empty
+        self.authkey = ""
+        # seconds a worker has to return a chunk before it is given to another worker
+        self.lease_seconds = 120
+        # genomes per task sent to a worker
+        self.chunk_size = 10
+
+    def read(self, config_file):
+        parser = ConfigParser()
+        parser.read(config_file)
+        if parser.has_section(Settings.SECTION):
+            section = parser[Settings.SECTION]
+            if "symbols" in section:
+                self.symbols = tuple(section["symbols"].split())
+            self.symbols_per_generation = section.getint("symbols_per_generation", self.symbols_per_generation)
+            self.csv_cache = section.getboolean("csv_cache", self.csv_cache)
+            self.simulation_days = section.getint("simulation_days", self.simulation_days)
+            self.windows = section.getint("windows", self.windows)
+            self.reducer = section.get("reducer", self.reducer)
+            self.prune = section.getboolean("prune", self.prune)
+            self.prune_quantile = section.getfloat("prune_quantile", self.prune_quantile)
+            self.cv_top_k = section.getint("cv_top_k", self.cv_top_k)
+            if "inputs" in section:
+                self.inputs = tuple(section["inputs"].split())
+            self.chain_profile = section.get("chain_profile", self.chain_profile)
+            self.search_buckets = section.getint("search_buckets", self.search_buckets)
+            self.prefetch_workers = section.getint("prefetch_workers", self.prefetch_workers)
+            self.chain_cache_size = section.getint("chain_cache_size", self.chain_cache_size)
+            self.trace_best = section.getint("trace_best", self.trace_best)
+            self.profile = section.getboolean("profile", self.profile)
+            self.metrics = section.get("metrics", self.metrics)
+            self.statistics = section.get("statistics", self.statistics)
+            self.winner = section.get("winner", self.winner)
+            self.trace_allocations = section.getint("trace_allocations", self.trace_allocations)
+            self.coordinator = section.get("coordinator", self.coordinator)
+            self.authkey = section.get("authkey", self.authkey)
+            self.lease_seconds = section.getfloat("lease_seconds", self.lease_seconds)
+            self.chunk_size = section.getint("chunk_size", self.chunk_size)
+        return self
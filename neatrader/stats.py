@@ -0,0 +1,153 @@
+import numpy as np
+import os
+from neat.reporting import BaseReporter
+from pathlib import Path
+from statistics import mean, pstdev
+
+DTYPE = np.dtype("<f8")
+FITNESS = ("generation", "best", "mean", "stdev")
+SPECIES = ("generation", "species", "size")
+# a row per cross validated generation, in the order they were scored
+CROSS_VALIDATION = ("best", "mean", "stdev")
+
+
+class ColumnLog:
+    """
+    An append only table on disk, a file of little endian float64 values per column.
+
+    Rows are appended without reading the table, and read back from any row, so
+    neither writers nor readers need to hold the whole table. A row whose write was
+    interrupted is not read until every column has it.
+    """
+    def __init__(self, directory, columns):
+        self.directory = Path(directory)
+        self.columns = columns
+
+    def path(self, column):
+        return self.directory / f"{column}.f8"
+
+    def append(self, *rows):
+        """ rows: tuples with a value per column """
+        if not rows:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        values = np.asarray(rows, dtype=DTYPE).reshape(len(rows), len(self.columns))
+        for i, column in enumerate(self.columns):
+            with open(self.path(column), "ab") as f:
+                values[:, i].tofile(f)
+
+    def truncate(self, rows):
+        """ drops every row after the first rows """
+        for column in self.columns:
+            path = self.path(column)
+            if path.exists() and path.stat().st_size > rows * DTYPE.itemsize:
+                os.truncate(path, rows * DTYPE.itemsize)
+
+    def __len__(self):
+        sizes = [self.path(column).stat().st_size if self.path(column).exists() else 0 for column in self.columns]
+        return min(sizes) // DTYPE.itemsize
+
+    def read(self, start=0):
+        """ returns: dict of column: array of the rows from start """
+        rows = max(len(self) - start, 0)
+        return {
+            column: np.fromfile(self.path(column), dtype=DTYPE, count=rows, offset=start * DTYPE.itemsize)
+            if rows else np.empty(0, dtype=DTYPE)
+            for column in self.columns
+        }
+
+
+class StatisticsLog(BaseReporter):
+    """
+    Appends a summary of every generation to column logs in a directory: the best, mean
+    and standard deviation of fitness and the size of each species. Also receives the
+    cross validation results of a CrossValidator, in place of CrossValidationStatistics.
+
+    Nothing is kept in memory, so the whole history of a run can be plotted however long
+    it runs. Read it with StatisticsHistory.
+    """
+    def __init__(self, directory, generation=0):
+        """
+        generation: the first generation of this run. A run resumed from a checkpoint appends
+            to the logs of the previous run, whose rows from that generation on are dropped
+            so they are not logged twice. 0 empties the logs, other files in directory are left alone.
+        """
+        self.directory = Path(directory)
+        self.fitness = ColumnLog(self.directory / "fitness", FITNESS)
+        self.species = ColumnLog(self.directory / "species", SPECIES)
+        self.cross_validation = ColumnLog(self.directory / "cross_validation", CROSS_VALIDATION)
+        self.generation = None
+        self._truncate(generation)
+
+    def _truncate(self, generation):
+        # every row is at or after generation 0, so a new run empties the logs
+        kept = _rows_before(self.fitness, generation)
+        self.fitness.truncate(kept)
+        self.species.truncate(_rows_before(self.species, generation))
+        # cross validation rows are paired with generations by their order
+        self.cross_validation.truncate(kept)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [genome.fitness for genome in population.values()]
+        self.fitness.append((self.generation, best_genome.fitness, mean(fitnesses), pstdev(fitnesses)))
+        self.species.append(*[
+            (self.generation, species_id, len(s.members)) for species_id, s in species.species.items()
+        ])
+
+    def add(self, best, results):
+        """ results of cross validating a generation, best: id of the genome with the best training fitness """
+        self.cross_validation.append((results[best], mean(results.values()), pstdev(results.values())))
+
+
+def _rows_before(log, generation):
+    """ returns: the number of leading rows of a log of generations before generation """
+    later = np.flatnonzero(log.read()["generation"] >= generation)
+    return int(later[0]) if len(later) else len(log)
+
+
+class StatisticsHistory:
+    """
+    Reads the logs of a StatisticsLog for plotting.
+    refresh() only reads the rows appended since it was last called.
+    """
+    def __init__(self, directory):
+        self.logs = {
+            "fitness": ColumnLog(Path(directory) / "fitness", FITNESS),
+            "species": ColumnLog(Path(directory) / "species", SPECIES),
+            "cross_validation": ColumnLog(Path(directory) / "cross_validation", CROSS_VALIDATION),
+        }
+        self.tables = {
+            name: {column: np.empty(0, dtype=DTYPE) for column in log.columns} for name, log in self.logs.items()
+        }
+
+    def refresh(self):
+        for name, log in self.logs.items():
+            table = self.tables[name]
+            rows = log.read(len(table[log.columns[0]]))
+            for column, values in rows.items():
+                table[column] = np.concatenate((table[column], values))
+        return self
+
+    @property
+    def fitness(self):
+        """ dict of FITNESS column: array, a row per generation """
+        return self.tables["fitness"]
+
+    @property
+    def cross_validation(self):
+        """ dict of CROSS_VALIDATION column: array, a row per cross validated generation """
+        return self.tables["cross_validation"]
+
+    def species_sizes(self):
+        """ returns: the generations and an array of the size of each species (columns) in each generation (rows) """
+        species = self.tables["species"]
+        generations = self.fitness["generation"]
+        sizes = np.zeros((len(generations), int(species["species"].max(initial=0))))
+        rows = np.minimum(np.searchsorted(generations, species["generation"]), len(generations) - 1)
+        # species of a generation whose fitness row is not written yet are left out
+        known = generations[rows] == species["generation"] if len(generations) else rows < 0
+        sizes[rows[known], species["species"][known].astype(int) - 1] = species["size"][known]
+        return generations, sizes
@@ -0,0 +1,230 @@
+import argparse
+import csv
+import itertools
+import logging
+import neat
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from configparser import ConfigParser
+from multiprocessing import get_context
+from neatrader.evaluation import Evaluator
+from neatrader.settings import Settings
+from neatrader.trading import PruningPolicy, Simulator
+from neatrader.universe import CROSS_VALIDATION, Universe
+
+log = logging.getLogger(__name__)
+
+# experiment worker state, set once per worker process. Every worker holds its own copy
+_universe = None
+
+
+def _init_worker(root):
+    global _universe
+    _universe = Universe(root)
+
+
+def parse_space(specs):
+    """
+    specs: "section.key=values" strings, values are either comma separated choices
+    or lo:hi for a uniform float range, e.g. NEAT.pop_size=64,128 or DefaultGenome.conn_add_prob=0.1:0.9
+    returns: dict of (section, key): list of choices or (lo, hi)
+    """
+    space = {}
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        section, key = name.split(".", 1)
+        if ":" in values:
+            lo, hi = values.split(":")
+            space[(section, key)] = (float(lo), float(hi))
+        else:
+            space[(section, key)] = values.split(",")
+    return space
+
+
+def grid(space):
+    """ returns: the overrides of every combination of choices """
+    ranges = [name for name, values in space.items() if isinstance(values, tuple)]
+    if ranges:
+        raise ValueError(f"ranges can only be sampled: {', '.join('.'.join(name) for name in ranges)}")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def sample(space, count, rng=random):
+    """ returns: the overrides of count random experiments, ranges are sampled uniformly """
+    return [
+        {
+            name: rng.uniform(*values) if isinstance(values, tuple) else rng.choice(values)
+            for name, values in space.items()
+        }
+        for _ in range(count)
+    ]
+
+
+def write_config(config_file, overrides, filename):
+    """ writes config_file with overrides of (section, key): value to filename """
+    parser = ConfigParser()
+    parser.read(config_file)
+    for (section, key), value in overrides.items():
+        if not parser.has_section(section):
+            raise ValueError(f"unknown config section: {section}")
+        parser[section][key] = str(value)
+    with open(filename, "w") as f:
+        parser.write(f)
+
+
+def run_experiment(config_file, overrides, symbol=None, generations=10, seconds=None, seed=0, cv_windows=5):
+    """
+    Evolves a population with a variant of config_file in this process until it has run
+    generations generations, or once more than seconds have passed since it started.
+    The winner is then scored on cv_windows random windows of the cross validation tape.
+    returns: dict of the experiment's results
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        variant = os.path.join(tmp, "config.ini")
+        write_config(config_file, overrides, variant)
+        settings = Settings().read(variant)
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            variant
+        )
+
+    random.seed(seed)
+    # the chains this worker keeps for its experiments
+    Simulator.chain_cache.max_size = settings.chain_cache_size
+    market = _universe.market(symbol or settings.symbols[0])
+    evaluator = Evaluator(market.security, market.path, market.tape(), market.daterange_factory(), settings)
+    if settings.prune:
+        evaluator.pruning = PruningPolicy(settings.reducer)
+
+    pop = neat.Population(config)
+    start = time.perf_counter()
+    evaluation_seconds = 0.0
+    # budgets are checked between generations, so every experiment runs at least one
+    while True:
+        evaluated = time.perf_counter()
+        winner = pop.run(evaluator.evaluate, 1)
+        evaluation_seconds += time.perf_counter() - evaluated
+        if pop.generation >= generations or winner.fitness >= config.fitness_threshold:
+            break
+        if seconds is not None and time.perf_counter() - start >= seconds:
+            break
+
+    validator = Evaluator(
+        market.security, market.path, market.tape(CROSS_VALIDATION), market.daterange_factory(CROSS_VALIDATION),
+        settings
+    )
+    net = evaluator.network_cache.get(winner, config)
+    cv_fitness = []
+    for _ in range(cv_windows):
+        window = validator.window(*validator.daterange_factory.random_date_range(settings.simulation_days))
+        cv_fitness.append(validator.simulate(net, window)[0])
+
+    return {
+        "generations": pop.generation,
+        "seconds": time.perf_counter() - start,
+        "fitness": winner.fitness,
+        "cv_fitness": sum(cv_fitness) / len(cv_fitness) if cv_fitness else None,
+        "simulations": evaluator.simulations,
+        "days_per_second": evaluator.days_simulated / evaluation_seconds if evaluation_seconds else None,
+        "nodes": len(winner.nodes),
+        "connections": sum(1 for connection in winner.connections.values() if connection.enabled),
+    }
+
+
+RESULTS = (
+    "generations", "seconds", "fitness", "cv_fitness", "simulations", "days_per_second", "nodes", "connections"
+)
+
+
+class Sweep:
+    """
+    Runs an experiment per set of config overrides in worker processes on this machine.
+
+    Each worker reads the market data once and keeps it, along with the option chains it
+    loads, for every experiment it runs. Nothing is shared between workers: each holds its
+    own copy of the tapes and up to chain_cache_size chains, so memory grows with the number
+    of workers. A row per experiment is appended to a csv file as experiments finish: its
+    number, seed, overrides and results, or the error it failed with.
+    """
+    def __init__(self, config_file, root, results, workers=os.cpu_count(), generations=10, seconds=None,
+                 seed=0, cv_windows=5, symbol=None):
+        self.config_file = config_file
+        self.root = root
+        self.results = results
+        self.workers = workers
+        self.generations = generations
+        self.seconds = seconds
+        self.seed = seed
+        self.cv_windows = cv_windows
+        self.symbol = symbol
+
+    def run(self, experiments):
+        """
+        experiments: list of overrides of (section, key): value
+        returns: the rows written, in the order experiments finished
+        """
+        names = sorted({name for overrides in experiments for name in overrides})
+        columns = ["experiment", "seed", *(".".join(name) for name in names), *RESULTS, "error"]
+        rows = []
+        with open(self.results, "w", newline="") as f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            # spawn so workers do not inherit the state of the process starting the sweep
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn"),
+                initializer=_init_worker, initargs=(self.root,)
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        run_experiment, self.config_file, overrides, self.symbol, self.generations,
+                        self.seconds, self.seed + i, self.cv_windows
+                    ): i
+                    for i, overrides in enumerate(experiments)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    row = {"experiment": i, "seed": self.seed + i}
+                    row.update({".".join(name): value for name, value in experiments[i].items()})
+                    try:
+                        row.update(future.result())
+                    except Exception as e:
+                        log.error(f"experiment {i} failed: {e}")
+                        row["error"] = repr(e)
+                    writer.writerow(row)
+                    f.flush()
+                    rows.append(row)
+        return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="evolve populations with variants of a config concurrently")
+    parser.add_argument("space", nargs="+", help="section.key=a,b,c for choices or section.key=lo:hi for a range")
+    parser.add_argument("--config", default=os.path.join("neatrader", "config.ini"))
+    parser.add_argument("--data", default=os.path.join("resources", "data"), help="directory of the symbols' data")
+    parser.add_argument("--symbol", help="symbol to train on, defaults to the first of the config's symbols")
+    parser.add_argument("--samples", type=int, default=0, help="random experiments, 0 runs the whole grid")
+    parser.add_argument("--generations", type=int, default=10, help="generations per experiment")
+    parser.add_argument("--seconds", type=float, help="time per experiment, checked between generations")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cv-windows", type=int, default=5, help="cross validation windows the winners are scored on")
+    parser.add_argument("-o", "--output", default="sweep.csv")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    space = parse_space(args.space)
+    experiments = sample(space, args.samples, random.Random(args.seed)) if args.samples else grid(space)
+    print(f"running {len(experiments)} experiments on {args.workers} workers")
+    sweep = Sweep(
+        args.config, args.data, args.output, args.workers, args.generations, args.seconds, args.seed,
+        args.cv_windows, args.symbol
+    )
+    for row in sweep.run(experiments):
+        print(row)
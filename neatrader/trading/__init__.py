@@ -1,3 +1,7 @@
 from neatrader.trading.engine import TradingEngine
 from neatrader.trading.stocksplit import StockSplitHandler
-from neatrader.trading.simulator import Simulator
+from neatrader.trading.features import MarketFeatures
+from neatrader.trading.window import SimulationWindow
+from neatrader.trading.simulator import ChainCache, Simulator
+from neatrader.trading.prefetch import ChainPrefetcher
+from neatrader.trading.pruning import PruningPolicy
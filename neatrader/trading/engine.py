@@ -1,7 +1,11 @@
+from neatrader.reporter import NULL_REPORTER
+
+
 class TradingEngine:
     def __init__(self, portfolios=[], reporter=None):
         self.portfolios = portfolios
-        self.reporter = reporter
+        # trades are recorded to the null reporter when none is given
+        self.reporter = NULL_REPORTER if reporter is None else reporter
 
     def eval(self, prices, date):
         """
@@ -21,16 +25,13 @@ class TradingEngine:
                         if contract.itm(price):
                             if amt < 0:
                                 self.assign(portfolio, contract, amt)
-                                if self.reporter:
-                                    self.reporter.record(date, 'assign', contract, 1)
+                                self.reporter.record(date, 'assign', contract, 1)
                             elif amt > 0:
                                 self.exercise(portfolio, contract, amt)
-                                if self.reporter:
-                                    self.reporter.record(date, 'exercise', contract, 1)
+                                self.reporter.record(date, 'exercise', contract, 1)
                         else:
                             self.expire(portfolio, contract, amt)
-                            if self.reporter:
-                                self.reporter.record(date, 'expire', contract, 1)
+                            self.reporter.record(date, 'expire', contract, 1)
 
     def expire(self, portfolio, contract, amt):
         """expires OTM contract, returns collateral if contract is short"""
@@ -0,0 +1,27 @@
+import numpy as np
+
+# network inputs that depend on the agent's portfolio, always the first inputs
+PORTFOLIO_INPUTS = ("cash", "shares", "held option value")
+# tape columns used as the remaining network inputs by default
+MARKET_INPUTS = ("iv_10", "iv_30", "rsi")
+INPUT_NAMES = {"iv_10": "10 day iv", "iv_30": "30 day iv", "rsi": "RSI"}
+
+
+def input_node_names(inputs):
+    """ names of the input nodes for the given market inputs, keyed by NEAT's negative input node keys """
+    names = [*PORTFOLIO_INPUTS, *(INPUT_NAMES.get(column, column) for column in inputs)]
+    return {-(i + 1): name for i, name in enumerate(names)}
+
+
+class MarketFeatures:
+    """
+    The network inputs which only depend on the market, one row per day of a tape,
+    and whether every one of them is present on that day.
+    Built once per tape and shared by every simulation over it.
+    """
+    def __init__(self, tape, inputs=MARKET_INPUTS):
+        self.inputs = tuple(inputs)
+        self.dates = tape["date"]
+        self.closes = tape["close"].to_numpy(dtype=float)
+        self.values = tape[list(self.inputs)].to_numpy(dtype=float)
+        self.valid = ~np.isnan(self.values).any(axis=1)
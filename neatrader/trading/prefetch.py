@@ -0,0 +1,94 @@
+import logging
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from neatrader.preprocess import CsvImporter
+from neatrader.trading.simulator import Simulator
+from neatrader.utils import from_small_date, small_date
+
+log = logging.getLogger(__name__)
+
+
+class ChainPrefetcher:
+    """
+    Loads the chains a simulation window will need into Simulator.chain_cache on background threads.
+
+    Each date of the window is mapped to its most recent chain file up front. Until a chain is
+    loaded, its cache entries hold a Future which a simulator reaching that day blocks on.
+    Once loaded, every date of the window is a cache hit, without walking back to the chain file.
+    A chain which fails to load is logged and dropped from the cache, simulators load it themselves.
+    """
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chain-prefetch")
+        self.importer = CsvImporter()
+        # data set path: sorted dates of its chain files
+        self.chain_dates = {}
+
+    def prefetch(self, path, security, dates, chain_profile="tradable"):
+        """ starts loading the chains of dates which are not cached yet, returns the futures started """
+        by_chain = {}
+        for date in dates:
+            if (path, date, chain_profile) not in Simulator.chain_cache:
+                chain_date = self.most_recent_chain_date(path, date)
+                if chain_date is not None:
+                    by_chain.setdefault(chain_date, []).append(date)
+
+        started = []
+        for chain_date, dates in by_chain.items():
+            key = (path, chain_date, chain_profile)
+            keys = [(path, date, chain_profile) for date in dates if date != chain_date]
+            chain = Simulator.chain_cache.get(key)
+            if chain is None:
+                chain = self.executor.submit(self._load, path, security, chain_date, chain_profile)
+                Simulator.chain_cache[key] = chain
+                keys.append(key)
+                started.append(chain)
+            for alias in keys:
+                Simulator.chain_cache[alias] = chain
+            if isinstance(chain, Future):
+                chain.add_done_callback(partial(self._store, key, keys))
+        return started
+
+    def most_recent_chain_date(self, path, date):
+        dates = self.chain_dates.get(path)
+        if dates is None:
+            dates = self.chain_dates[path] = sorted(
+                from_small_date(chain.stem) for chain in (path / "chains").glob("*.csv")
+            )
+        i = bisect_right(dates, date)
+        return dates[i - 1] if i else None
+
+    def close(self):
+        """ stops loading, chains which are not loaded yet are dropped from the cache """
+        with Simulator.chain_cache.lock:
+            pending = [chain for chain in Simulator.chain_cache.values() if isinstance(chain, Future)]
+        # loads which have not started are cancelled, running ones are waited for
+        for future in pending:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        with Simulator.chain_cache.lock:
+            for key, chain in list(Simulator.chain_cache.items()):
+                if isinstance(chain, Future):
+                    del Simulator.chain_cache[key]
+
+    def _load(self, path, security, chain_date, chain_profile):
+        chain = self.importer.parse_chain(
+            chain_date, security, path / "chains" / f"{small_date(chain_date)}.csv", chain_profile
+        )
+        Simulator.count("chain_misses")
+        return chain
+
+    def _store(self, chain_key, keys, future):
+        """ replaces the future with its chain, or drops it so simulators load the chain themselves """
+        if future.cancelled():
+            return
+        if future.exception() and chain_key in keys:
+            # logged once, by the callback of the prefetch which started the load
+            path, chain_date, _ = chain_key
+            log.warning(f"prefetching the {small_date(chain_date)} chain of {path} failed: {future.exception()}")
+        for key in keys:
+            if Simulator.chain_cache.get(key) is future:
+                if future.exception():
+                    del Simulator.chain_cache[key]
+                else:
+                    Simulator.chain_cache[key] = future.result()
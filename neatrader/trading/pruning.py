@@ -0,0 +1,46 @@
+import math
+import numpy as np
+from neatrader.math import reducer_quantile
+
+
+class PruningPolicy:
+    """
+    Decides when the simulations of a genome can stop early.
+
+    A portfolio without shares or contracts whose cash cannot buy 100 shares at any of the
+    remaining closes never trades again. Its fitness is final, so its simulation stops with
+    exactly the fitness it would end with.
+
+    With a reducer taking a quantile (min, median, max or q<fraction>), a genome is not
+    simulated on further windows once enough of its window fitnesses are below threshold
+    for the reduced fitness to be below it too. It is given an upper bound of its reduced
+    fitness instead, which is also below threshold.
+    """
+    def __init__(self, reducer="mean", threshold=-math.inf):
+        self.quantile = reducer_quantile(reducer)
+        self.threshold = threshold
+
+    def frozen(self, portfolio, window, i):
+        """ True if a portfolio can no longer change after day i of window """
+        # Simulator._attempt_to_buy_shares only buys when cash covers 101 shares
+        return not portfolio.has_securities() and portfolio.cash < 101 * window.min_close_after[i]
+
+    def bound(self, fitnesses, windows):
+        """
+        fitnesses: of the windows simulated so far
+        windows: number of windows the genome is evaluated on
+        returns: an upper bound on the reduced fitness when it is below threshold, otherwise None
+        """
+        if self.quantile is None:
+            return None
+        # np.quantile interpolates between the values ranked floor(h) and ceil(h)
+        rank = math.ceil(self.quantile * (windows - 1))
+        below = sorted(fitness for fitness in fitnesses if fitness < self.threshold)
+        # more windows can only lower the value at this rank
+        return below[rank] if len(below) > rank else None
+
+    def update(self, fitnesses, quantile):
+        """ sets the threshold to a quantile of a generation's fitnesses """
+        fitnesses = [fitness for fitness in fitnesses if fitness is not None]
+        if fitnesses:
+            self.threshold = float(np.quantile(fitnesses, quantile))
@@ -1,26 +1,86 @@
 import logging
-import numpy as np
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import timedelta
 from neatrader.preprocess import CsvImporter
-from neatrader.trading import TradingEngine, StockSplitHandler
+from neatrader.reporter import NULL_REPORTER
+from neatrader.trading import TradingEngine, StockSplitHandler, MarketFeatures, SimulationWindow
+from neatrader.trading.features import MARKET_INPUTS
 from neatrader.utils import small_date
 
 log = logging.getLogger(__name__)
 
 
+class ChainCache(OrderedDict):
+    """
+    A dict of chains which evicts the least recently used entries beyond max_size, 0 for no bound.
+    Entries are read and written by simulations and by ChainPrefetcher threads.
+    """
+    def __init__(self, max_size=0):
+        super().__init__()
+        self.max_size = max_size
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while self.max_size and len(self) > self.max_size:
+                self.popitem(last=False)
+                self.evictions += 1
+
+
 class Simulator:
-    chain_cache = {}
+    # chains by (data set path, date, chain profile name), so symbols never share a chain.
+    # a ChainPrefetcher stores a Future until the chain is loaded
+    chain_cache = ChainCache(10000)
+    # chain cache statistics of this process, a miss parses a chain file
+    # and a wait blocks on a chain a ChainPrefetcher is still loading
+    chain_hits = 0
+    chain_misses = 0
+    chain_waits = 0
 
-    def __init__(self, security, portfolio, path, training, reporter=None):
+    def __init__(self, security, portfolio, path, training, reporter=None, inputs=MARKET_INPUTS,
+                 chain_profile="tradable", search_buckets=0, trace=None):
+        """
+        chain_profile: name of the ChainProfile chains are imported with
+        search_buckets: theta and delta buckets of the per day SearchGrid, 0 searches every sell
+        trace: a SimulationTrace to record each day in, its trades are recorded unless a reporter is given
+        """
+        if reporter is None and trace is not None:
+            reporter = trace.trades
         self.security = security
         self.portfolio = portfolio
         self.path = path
         self.training = training
-        self.reporter = reporter
-        self.engine = TradingEngine([portfolio], reporter)
+        self.reporter = NULL_REPORTER if reporter is None else reporter
+        self.trace = trace
+        self.inputs = inputs
+        self.chain_profile = chain_profile
+        self.search_buckets = search_buckets
+        # days of the last window not simulated because the outcome was already known
+        self.days_skipped = 0
+        self.features = None
+        self.engine = TradingEngine([portfolio], self.reporter)
         self.split_handler = StockSplitHandler(path / 'splits.csv', security)
         self.importer = CsvImporter()
 
+    @staticmethod
+    def count(statistic):
+        """ increments a chain cache statistic, simulations and ChainPrefetcher threads both count """
+        with Simulator.chain_cache.lock:
+            setattr(Simulator, statistic, getattr(Simulator, statistic) + 1)
+
     def simulate(self, net, start=None, end=None):
         """
         runs a simulation with provided network
@@ -29,46 +89,102 @@ class Simulator:
         start: datetime to start simulation
         end: datetime to end the simulation
         """
+        return self.simulate_window(net, self.window(start, end))
+
+    def window(self, start, end):
+        if self.features is None:
+            self.features = MarketFeatures(self.training, self.inputs)
+        return SimulationWindow(self.features, self.split_handler.calendar(), start, end)
+
+    def simulate_window(self, net, window, pruning=None):
+        """
+        runs a simulation with provided network over a precomputed window,
+        the same window can be shared by many simulations
+        pruning: a PruningPolicy to stop once the portfolio can no longer change
+        """
         close = None
-        for row in self._days_in_range(start, end):
-            params = self._map_row(row)
-            date, close, macd, macd_signal, macd_diff, bb_bbm, bb_bbh, bb_bbl, rsi, iv_10, iv_30 = params
+        for i, (date, close, market, valid) in enumerate(window.rows):
             try:
-                # process assignments, expirations
-                self.engine.eval({self.security: close}, date)
+                # market inputs were checked for missing values when the window was built
+                activation = self.trade(net, date, close, market if valid else None, window.splits.get(date))
+                if self.trace is not None:
+                    self.trace.record(date, close, self.portfolio_value(close, date), *activation)
 
-                cash = self.portfolio.cash  # self._normalize(self.portfolio.cash)
-                shares = self.portfolio.available_shares().get(self.security, 0) / 100.0
-                held_option_value = self._contract_value(date) * 100
+            except Exception as e:
+                log.error(f"Failed on {self.security}:{date}")
+                raise e
 
-                params = (cash, shares, held_option_value, iv_10, iv_30, rsi)
+            if pruning and pruning.frozen(self.portfolio, window, i):
+                self.days_skipped = len(window) - i - 1
+                if self.trace is not None:
+                    # the portfolio only holds cash from now on
+                    for date, close, _, _ in window.rows[i + 1:]:
+                        self.trace.record(date, close, self.portfolio.cash)
+                return self._calculate_fitness(window.rows[-1][1], window.end, window.baseline)
 
-                if not np.isnan(params).any():
-                    # Check for stock split and adjust portfolio accordingly
-                    self.split_handler.check_and_invoke(self.portfolio, date)
+        return self._calculate_fitness(close, window.end, window.baseline)
 
-                    # Activate! 🤖
-                    buy, sell, hold, delta, theta = net.activate(params)
+    def trade(self, net, date, close, market, split=None):
+        """
+        trades one day: processes expirations and assignments, then acts on the network's decision
+        market: the day's market inputs, None when one is missing so the network is not activated
+        split: multiplier of a stock split on date
+        returns: the inputs, outputs and decision of the network, () when it was not activated
+        """
+        # process assignments, expirations
+        self.engine.eval({self.security: close}, date)
+        if market is None:
+            return ()
 
-                    # Buy
-                    if buy > sell and buy > hold:
-                        self._buy(date)
-                    # Sell
-                    elif sell > buy and sell > hold:
-                        self._sell(date, close, delta, theta)
+        cash = self.portfolio.cash  # self._normalize(self.portfolio.cash)
+        shares = self.portfolio.available_shares().get(self.security, 0) / 100.0
+        held_option_value = self._contract_value(date) * 100
 
-                    # Buy shares if 100% cash and can afford 100 shares
-                    self._attempt_to_buy_shares(date, close, 100)
+        # a held contract can be missing a price in the chain
+        if math.isnan(held_option_value):
+            return ()
 
-            except Exception as e:
-                log.error(f"Failed on {self.security}:{date}")
-                raise e
+        # Check for stock split and adjust portfolio accordingly
+        if split:
+            self.split_handler.invoke(self.portfolio, split)
 
-        return self._calculate_fitness(close, end)
+        # Activate! 🤖
+        params = (cash, shares, held_option_value) + market
+        outputs = net.activate(params)
+        buy, sell, hold, delta, theta = outputs
+
+        # Buy
+        if buy > sell and buy > hold:
+            self._buy(date)
+            decision = "buy"
+        # Sell
+        elif sell > buy and sell > hold:
+            self._sell(date, close, delta, theta)
+            decision = "sell"
+        else:
+            decision = "hold"
+
+        # Buy shares if 100% cash and can afford 100 shares
+        self._attempt_to_buy_shares(date, close, 100)
+        return (params, outputs, decision)
 
     def _most_recent_chain(self, date):
-        chain = Simulator.chain_cache.get(date)
-        if chain is not None:
+        key = (self.path, date, self.chain_profile)
+        chain = Simulator.chain_cache.get(key)
+        if isinstance(chain, Future):
+            # being loaded by a ChainPrefetcher
+            if chain.done():
+                Simulator.count("chain_hits")
+            else:
+                Simulator.count("chain_waits")
+            try:
+                return chain.result()
+            except Exception:
+                # the prefetch failed and was logged by the prefetcher, the chain is loaded below
+                if Simulator.chain_cache.get(key) is chain:
+                    del Simulator.chain_cache[key]
+        elif chain is not None:
+            Simulator.count("chain_hits")
             return chain
         """
         Iterates in reverse for each day until the most recent options chain is discovered
@@ -76,25 +192,38 @@ class Simulator:
         while True:
             path = self.path / "chains" / f"{small_date(date)}.csv"
             if path.exists():
-                chain = self.importer.parse_chain(date, self.security, path)
-                Simulator.chain_cache[date] = chain
+                cached = Simulator.chain_cache.get((self.path, date, self.chain_profile))
+                if cached is not None:
+                    # the chain is cached under its own date, only the later date was evicted
+                    return self._most_recent_chain(date)
+                chain = self.importer.parse_chain(date, self.security, path, self.chain_profile)
+                Simulator.chain_cache[(self.path, date, self.chain_profile)] = chain
+                Simulator.count("chain_misses")
                 return chain
             else:
                 date -= timedelta(days=1)
 
-    def _calculate_fitness(self, close, end):
+    def portfolio_value(self, close, date):
+        """ cash plus the value of shares at close and of contracts in the chain of date """
         cash = self.portfolio.cash
-        denorm_close = close  # self._denormalize(close)
         for contract, amt in self.portfolio.contracts().items():
-            chain = self._most_recent_chain(end)
+            chain = self._most_recent_chain(date)
             # option prices are not normalized
             cash += chain.get_price(contract) * amt * 100
         for stock, amt in self.portfolio.stocks().items():
-            cash += amt * denorm_close
+            cash += amt * close
+        return cash
+
+    def _calculate_fitness(self, close, end, baseline=None):
+        denorm_close = close  # self._denormalize(close)
         # compare against a buy-and-hold strategy
-        fitness = cash - (100 * denorm_close)
-        if self.reporter:
-            self.reporter.fitness = fitness
+        if baseline is None:
+            baseline = 100 * denorm_close
+        fitness = self.portfolio_value(denorm_close, end) - baseline
+        self.reporter.fitness = fitness
+        if self.trace is not None:
+            self.trace.fitness = fitness
+            self.trace.portfolio = str(self.portfolio)
         return fitness
 
     def _days_in_range(self, start, end):
@@ -102,20 +231,6 @@ class Simulator:
         for idx, row in self.training.loc[mask].iterrows():
             yield row
 
-    def _map_row(self, row):
-        date = row["date"]
-        close = row["close"]
-        macd = row["macd"]
-        macd_signal = row["macd_signal"]
-        macd_diff = row["macd_diff"]
-        bb_bbm = row["bb_bbm"]
-        bb_bbh = row["bb_bbh"]
-        bb_bbl = row["bb_bbl"]
-        rsi = row["rsi"]
-        iv_10 = row["iv_10"]
-        iv_30 = row["iv_30"]
-        return (date, close, macd, macd_signal, macd_diff, bb_bbm, bb_bbh, bb_bbl, rsi, iv_10, iv_30)
-
     def _buy(self, date):
         # only covered calls are supported right now so this means close the position
         for contract, amt in self.portfolio.contracts().items():
@@ -125,8 +240,7 @@ class Simulator:
                 new_price = chain.get_price(contract)
                 try:
                     self.engine.buy_contract(self.portfolio, contract, new_price)
-                    if self.reporter:
-                        self.reporter.record(date, "buy", contract, 1, new_price)
+                    self.reporter.record(date, "buy", contract, 1, new_price)
                 except Exception as e:
                     log.warn(e)
 
@@ -135,14 +249,18 @@ class Simulator:
         if not self.portfolio.contracts():
             chain = self._most_recent_chain(date)
             # sell a new contract
-            contract = chain.search(close, delta=delta, theta=theta)
+            contract = self._search(chain, close, delta, theta)
             try:
                 self.engine.sell_contract(self.portfolio, contract, contract.price)
-                if self.reporter:
-                    self.reporter.record(date, "sell", contract, -1, contract.price)
+                self.reporter.record(date, "sell", contract, -1, contract.price)
             except Exception as e:
                 log.warn(e)
 
+    def _search(self, chain, close, delta, theta):
+        if self.search_buckets:
+            return chain.search_grid(close, self.search_buckets).search(theta, delta)
+        return chain.search(close, delta=delta, theta=theta)
+
     def _contract_value(self, date):
         value = 0
         for contract, _ in self.portfolio.contracts().items():
@@ -154,5 +272,4 @@ class Simulator:
             num_shares_afford = num_shares % int(self.portfolio.cash / close)
             if num_shares_afford == num_shares:
                 self.engine.buy_shares(self.portfolio, self.security, close, num_shares_afford)
-                if self.reporter:
-                    self.reporter.record(date, "buy", self.security, num_shares, close)
+                self.reporter.record(date, "buy", self.security, num_shares, close)
@@ -1,22 +1,33 @@
-import pandas as pd
 from copy import deepcopy
+from neatrader.loader import SPLITS, read_csv
 
 
 class StockSplitHandler:
+    # parsed splits files keyed by path, a handler is created for every simulation
+    splits_cache = {}
+
     def __init__(self, path, security):
-        self.splits = pd.read_csv(path, parse_dates=['date'], header=0)
+        self.splits = StockSplitHandler.splits_cache.get(path)
+        if self.splits is None:
+            self.splits = read_csv(path, SPLITS, date_format="%Y-%m-%d")
+            StockSplitHandler.splits_cache[path] = self.splits
         self.security = security
 
+    def calendar(self):
+        """ returns: dict of split date: multiplier """
+        return {split_date: multiplier for split_date, multiplier in self.splits.itertuples(index=False)}
+
     def check_and_invoke(self, portfolio, date):
-        new_stocks = {}
-        for idx, row in self.splits.iterrows():
-            split_date, multiplier = row
+        for split_date, multiplier in self.splits.itertuples(index=False):
             if split_date == date:
-                new_stocks = self._calculate_new_stocks(portfolio.stocks(), multiplier)
-                new_contracts, to_del = self._calculate_new_contracts(portfolio.contracts(), multiplier)
-                for contract in to_del:
-                    del portfolio.securities[contract]
-                portfolio.securities = {**portfolio.securities, **new_stocks, **new_contracts}
+                self.invoke(portfolio, multiplier)
+
+    def invoke(self, portfolio, multiplier):
+        new_stocks = self._calculate_new_stocks(portfolio.stocks(), multiplier)
+        new_contracts, to_del = self._calculate_new_contracts(portfolio.contracts(), multiplier)
+        for contract in to_del:
+            del portfolio.securities[contract]
+        portfolio.securities = {**portfolio.securities, **new_stocks, **new_contracts}
 
     def _calculate_new_stocks(self, stocks, multiplier):
         new_stocks = {}
@@ -0,0 +1,41 @@
+import math
+
+
+class SimulationWindow:
+    """
+    The parts of a simulation that do not depend on the network: each day's close,
+    market inputs and whether they are all present, the stock splits and the
+    buy-and-hold baseline for a date range.
+    Computed once and shared by every genome simulated over the range.
+    """
+    def __init__(self, features, splits, start, end):
+        """
+        features: MarketFeatures of the training or cross validation tape
+        splits: dict of date: multiplier
+        start: datetime to start simulation (exclusive)
+        end: datetime to end the simulation (inclusive)
+        """
+        self.start = start
+        self.end = end
+        mask = ((features.dates > start) & (features.dates <= end)).to_numpy()
+        self.rows = list(zip(
+            features.dates[mask],
+            features.closes[mask].tolist(),
+            map(tuple, features.values[mask].tolist()),
+            features.valid[mask].tolist()
+        ))
+        self.splits = {row[0]: splits[row[0]] for row in self.rows if row[0] in splits}
+        # 100 shares held for the whole window
+        self.baseline = 100 * self.rows[-1][1] if self.rows else None
+        # constant policy: fitness, see netcache.constant_policy
+        self.policy_fitness = {}
+        # the lowest close of the days after each day
+        self.min_close_after = []
+        lowest = math.inf
+        for row in reversed(self.rows):
+            self.min_close_after.append(lowest)
+            lowest = min(lowest, row[1])
+        self.min_close_after.reverse()
+
+    def __len__(self):
+        return len(self.rows)
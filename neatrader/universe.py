@@ -0,0 +1,73 @@
+import random
+from neatrader.daterange import DateRangeFactory
+from neatrader.loader import read_csv, tape_columns
+from neatrader.model import Security
+from pathlib import Path
+
+TRAINING = "training.csv"
+CROSS_VALIDATION = "cross_validation.csv"
+
+
+class Market:
+    """
+    The data set of one symbol, in its own directory: close.csv, splits.csv, chains/
+    and the training and cross validation tapes. Tapes are read the first time they are used.
+    cache: keep the parsed tapes in sidecar files, see loader.read_csv
+    inputs: the market inputs simulations use, only their columns and the date and close of
+        the tapes are read. None reads every column
+    """
+    def __init__(self, path, cache=False, inputs=None):
+        self.path = Path(path)
+        self.cache = cache
+        self.columns = None if inputs is None else tape_columns(inputs)
+        self.security = Security(self.path.name)
+        self.tapes = {}
+        self.daterange_factories = {}
+
+    def __repr__(self):
+        return f"Market({self.security})"
+
+    def tape(self, name=TRAINING):
+        tape = self.tapes.get(name)
+        if tape is None:
+            tape = self.tapes[name] = read_csv(self.path / name, columns=self.columns, cache=self.cache)
+        return tape
+
+    def daterange_factory(self, name=TRAINING):
+        factory = self.daterange_factories.get(name)
+        if factory is None:
+            factory = self.daterange_factories[name] = DateRangeFactory(self.tape(name))
+        return factory
+
+
+class Universe:
+    """
+    The symbols to train on, each partitioned into its own Market under root, e.g. resources/data.
+    Only the markets of symbols which are simulated are ever read.
+    symbols: defaults to every directory under root with a training tape
+    cache: keep the parsed tapes in sidecar files, see loader.read_csv
+    inputs: the market inputs simulations use, see Market
+    """
+    def __init__(self, root, symbols=None, cache=False, inputs=None):
+        self.root = Path(root)
+        self.cache = cache
+        self.inputs = inputs
+        if symbols:
+            self.symbols = tuple(symbols)
+        else:
+            self.symbols = tuple(sorted(path.parent.name for path in self.root.glob(f"*/{TRAINING}")))
+        self.markets = {}
+
+    def market(self, symbol):
+        market = self.markets.get(symbol)
+        if market is None:
+            if symbol not in self.symbols:
+                raise Exception(f"{symbol} is not one of the symbols: {' '.join(self.symbols)}")
+            market = self.markets[symbol] = Market(self.root / symbol, self.cache, self.inputs)
+        return market
+
+    def sample(self, count=0):
+        """ returns: count random symbols, every symbol when count is 0 """
+        if 0 < count < len(self.symbols):
+            return random.sample(self.symbols, count)
+        return list(self.symbols)
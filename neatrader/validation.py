@@ -0,0 +1,151 @@
+import neat
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from neatrader.model import Portfolio
+from neatrader.profiler import PhaseProfiler
+from neatrader.trading.features import MARKET_INPUTS
+from neatrader.trading import MarketFeatures, SimulationWindow, Simulator, StockSplitHandler
+from statistics import mean, pstdev
+
+# cross validation worker state, set once per worker process
+_security = None
+_path = None
+_tape = None
+_features = None
+_splits = None
+_chain_profile = None
+_search_buckets = 0
+
+
+def _init_worker(security, path, tape, inputs, chain_profile="tradable", search_buckets=0):
+    global _security, _path, _tape, _features, _splits, _chain_profile, _search_buckets
+    _security = security
+    _path = path
+    _tape = tape
+    _features = MarketFeatures(tape, inputs)
+    _splits = StockSplitHandler(path / "splits.csv", security).calendar()
+    _chain_profile = chain_profile
+    _search_buckets = search_buckets
+
+
+def _cross_validate(genomes, config, start, end, profile=False, relative=False):
+    """
+    relative: divide fitness by the value of holding 100 shares, see UniverseEvaluator
+    returns: dict of genome_id: fitness, the number of days simulated
+    and a PhaseProfiler of the simulations if profiling
+    """
+    results = {}
+    profiler = PhaseProfiler() if profile else None
+    if profiler:
+        window = profiler.timed("window", SimulationWindow)(_features, _splits, start, end)
+    else:
+        window = SimulationWindow(_features, _splits, start, end)
+    for genome_id, genome in genomes:
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        portfolio = Portfolio(cash=0.0, securities={_security: 100})
+        sim = Simulator(
+            _security, portfolio, _path, _tape,
+            inputs=_features.inputs, chain_profile=_chain_profile, search_buckets=_search_buckets
+        )
+        if profiler:
+            profiler.instrument(sim)
+        results[genome_id] = sim.simulate_window(net, window)
+        if relative and window.baseline:
+            results[genome_id] /= window.baseline
+    return results, len(genomes) * len(window), profiler
+
+
+class CrossValidationStatistics:
+    """ per-generation cross validation fitness of the best genome and of every scored genome """
+    def __init__(self):
+        self.best_fitness = []
+        self.generation_statistics = []
+
+    def add(self, best, results):
+        self.best_fitness.append(results[best])
+        self.generation_statistics.append(results)
+
+    def get_fitness_mean(self):
+        return [mean(results.values()) for results in self.generation_statistics]
+
+    def get_fitness_stdev(self):
+        return [pstdev(results.values()) for results in self.generation_statistics]
+
+
+class CrossValidator:
+    """
+    Scores the top_k genomes of a generation on the cross validation tape.
+
+    Simulations run in worker processes while NEAT reproduces and evaluates the next
+    generation. Results are collected by the next flush(), which sets cv_fitness on the
+    scored genomes and appends to statistics. The cross validation fitness has no
+    impact on evolution. Set profiler to a PhaseProfiler to collect the phase timings
+    of the worker simulations. Set relative when training fitness is relative, so both
+    are in the same units.
+    """
+    def __init__(self, security, path, tape, daterange_factory, simulation_days, top_k=5, workers=1,
+                 inputs=MARKET_INPUTS, chain_profile="tradable", search_buckets=0, relative=False):
+        self.security = security
+        self.path = path
+        self.tape = tape
+        self.inputs = inputs
+        self.chain_profile = chain_profile
+        self.search_buckets = search_buckets
+        self.daterange_factory = daterange_factory
+        self.simulation_days = simulation_days
+        self.top_k = top_k
+        self.relative = relative
+        self.workers = workers
+        self.statistics = CrossValidationStatistics()
+        self.profiler = None
+        self.days_simulated = 0
+        self.executor = None
+        self.pending = None
+
+    def submit(self, genomes, config):
+        """ genomes: list of (genome_id, genome) which have a training fitness """
+        if self.pending is not None:
+            self.flush()
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.security, self.path, self.tape, self.inputs, self.chain_profile, self.search_buckets)
+            )
+
+        ranked = sorted(genomes, key=lambda item: item[1].fitness, reverse=True)[:self.top_k]
+        start, end = self.daterange_factory.random_date_range(self.simulation_days)
+        futures = [
+            self.executor.submit(
+                _cross_validate, ranked[i::self.workers], config, start, end, self.profiler is not None,
+                self.relative
+            )
+            for i in range(min(self.workers, len(ranked)))
+        ]
+        self.pending = (ranked, futures)
+
+    def flush(self):
+        """ waits for the submitted generation to be scored """
+        if self.pending is None:
+            return
+        ranked, futures = self.pending
+        self.pending = None
+
+        results = {}
+        for future in futures:
+            chunk, days, profiler = future.result()
+            results.update(chunk)
+            self.days_simulated += days
+            if self.profiler and profiler:
+                self.profiler.merge(profiler)
+        for genome_id, genome in ranked:
+            genome.cv_fitness = results[genome_id]
+        best, _ = ranked[0]
+        self.statistics.add(best, results)
+
+    def close(self):
+        self.flush()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -1,31 +1,33 @@
 import copy
 import graphviz
 import matplotlib.pyplot as plt
-import numpy as np
 import warnings
 
 
-def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg'):
-    """ Plots the population's average and best fitness. """
+def plot_stats(history, ylog=False, view=False, filename='avg_fitness.svg'):
+    """ Plots the population's average and best fitness from a StatisticsHistory, dashed for cross validation. """
     if plt is None:
         warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
         return
 
-    generation = range(len(statistics.most_fit_genomes))
-    best_fitness = [c.fitness for c in statistics.most_fit_genomes]
-    avg_fitness = np.array(statistics.get_fitness_mean())
-    stdev_fitness = np.array(statistics.get_fitness_stdev())
+    fitness = history.fitness
+    generation = fitness["generation"]
+    avg_fitness = fitness["mean"]
+    stdev_fitness = fitness["stdev"]
 
-    plt.plot(generation, best_fitness, 'g-', label="best")
+    plt.plot(generation, fitness["best"], 'g-', label="best")
     plt.plot(generation, avg_fitness + stdev_fitness, 'b-', label="+1 sd")
     plt.plot(generation, avg_fitness, 'm-', label="average")
     plt.plot(generation, avg_fitness - stdev_fitness, 'r-', label="-1 sd")
 
-    if hasattr(statistics.most_fit_genomes[0], 'cv_fitness'):
-        best_cv_fitness = [c.cv_fitness for c in statistics.most_fit_genomes]
-        avg_cv_fitness = np.array(statistics.get_fitness_mean(cross_validation=True))
-        stdev_cv_fitness = np.array(statistics.get_fitness_stdev(cross_validation=True))
-        plt.plot(generation, best_cv_fitness, 'g-.')
+    cross_validation = history.cross_validation
+    if len(cross_validation["best"]):
+        # generations are cross validated in order, the latest may still be running
+        count = min(len(cross_validation["best"]), len(generation))
+        generation = generation[:count]
+        avg_cv_fitness = cross_validation["mean"][:count]
+        stdev_cv_fitness = cross_validation["stdev"][:count]
+        plt.plot(generation, cross_validation["best"][:count], 'g-.')
         plt.plot(generation, avg_cv_fitness + stdev_cv_fitness, 'b-.')
         plt.plot(generation, avg_cv_fitness, 'm-.')
         plt.plot(generation, avg_cv_fitness - stdev_cv_fitness, 'r-.')
@@ -94,18 +96,16 @@ def plot_spikes(spikes, view=False, filename=None, title=None):
     return fig
 
 
-def plot_species(statistics, view=False, filename='speciation.svg'):
-    """ Visualizes speciation throughout evolution. """
+def plot_species(history, view=False, filename='speciation.svg'):
+    """ Visualizes speciation throughout evolution from a StatisticsHistory. """
     if plt is None:
         warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
         return
 
-    species_sizes = statistics.get_species_sizes()
-    num_generations = len(species_sizes)
-    curves = np.array(species_sizes).T
+    generations, sizes = history.species_sizes()
 
     fig, ax = plt.subplots()
-    ax.stackplot(range(num_generations), *curves)
+    ax.stackplot(generations, *sizes.T)
 
     plt.title("Speciation")
     plt.ylabel("Size per Species")
@@ -203,27 +203,39 @@ def draw_net(config, genome, view=False, filename=None, node_names=None,
 
 
 def plot_trades(network, simulator, daterange, training, path, reporter, view=False, filename='trades.svg'):
+    """ simulates network over daterange and plots its trades """
     if plt is None:
         warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
         return
 
-    plt.title("Trade Simulation")
-    plt.ylabel("Price")
-    plt.xlabel("Time")
-
     # plot price vs time
     start, end = daterange
     mask = (training["date"] >= start) & (training["date"] <= end)
     df = training.loc[mask]
-    plt.plot(df["date"], df["close"], zorder=0)
 
     # run simulation
     simulator.simulate(network, start, end)
 
-    # plot trades
-    df.date.astype("datetime64[ns]")
+    _draw_trades(df[["date", "close"]], reporter.to_df(), view, filename)
+
 
-    actions = reporter.to_df()
+def plot_trace(trace, view=False, filename='trades.svg'):
+    """ plots the trades of a recorded SimulationTrace """
+    if plt is None:
+        warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
+        return
+
+    _draw_trades(trace.to_df()[["date", "close"]], trace.trades.to_df(), view, filename)
+
+
+def _draw_trades(df, actions, view, filename):
+    """ df: date and close of each day, actions: trades as returned by TradeReporter.to_df """
+    plt.title("Trade Simulation")
+    plt.ylabel("Price")
+    plt.xlabel("Time")
+    plt.plot(df["date"], df["close"], zorder=0)
+
+    # plot trades
     if not actions.empty:
         actions = actions.merge(df, on="date")
         sells = actions[actions["action"] == "sell"]
@@ -1,5 +1,6 @@
 import neatrader.preprocess as p
 import pandas as pd
+from neatrader.model.option import IV_DAYS
 from neatrader.preprocess import CsvExporter
 from pathlib import Path
 
@@ -21,7 +22,7 @@ def add_iv(path):
     for chain in importer.chains(path / "TSLA"):
         quote = quotes[chain.date]
         iv = {}
-        for days_future in [10, 20, 30, 60, 90]:
+        for days_future in IV_DAYS:
             expiration = chain.closest_expiration(days_future)
             iv[f"iv_{days_future}"] = chain.iv(expiration, quote.quote)
         exporter.append_close("TSLA", quote, iv)
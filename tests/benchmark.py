@@ -0,0 +1,275 @@
+"""
+Benchmarks of the simulation and data hot paths.
+
+    python tests/benchmark.py                    # run everything, print JSON results
+    python tests/benchmark.py -o baseline.json   # save the results
+    python tests/benchmark.py -b baseline.json   # compare against saved results, exit 1 on a regression
+    python tests/benchmark.py -k simulate -r 10  # only benchmarks with "simulate" in the name
+
+Each benchmark is set up once, run once to warm caches, then timed `repeat` times.
+Comparisons use the fastest run, which is the least sensitive to a noisy machine.
+"""
+import argparse
+import json
+import logging
+import neat
+import platform
+import random
+import statistics
+import sys
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.model import Portfolio, Option, OptionChain, Security
+from neatrader.netcache import NetworkCache
+from neatrader.preprocess import CsvImporter, Normalizer
+from neatrader.settings import Settings
+from neatrader.trading import Simulator, TradingEngine
+from neatrader.utils import from_small_date
+from pathlib import Path
+from time import perf_counter
+from utils import AlwaysSellNet, BuyAndHoldNet, RandomNet
+
+TSLA = Security("TSLA")
+DATA_PATH = Path(__file__).parent / "test_data" / "TSLA"
+CONFIG_PATH = Path(__file__).parent / "test_configuration.ini"
+START = datetime(2020, 6, 1)
+END = datetime(2020, 9, 3)
+CHAIN_DATES = ["200601", "200706", "200803", "200901"]
+
+
+def load_training(path):
+    return read_csv(path / "training.csv")
+
+
+def load_tapes(path):
+    def run():
+        read_csv(path / "training.csv")
+        read_csv(path / "cross_validation.csv")
+    return run
+
+
+def simulate(create_net):
+    def setup(path):
+        training = load_training(path)
+
+        def run():
+            portfolio = Portfolio(cash=0.0, securities={TSLA: 100})
+            Simulator(TSLA, portfolio, path, training).simulate(create_net(), START, END)
+        return run
+    return setup
+
+
+def always_sell():
+    net = AlwaysSellNet()
+    net.delta = 0.3
+    net.theta = -1.5
+    return net
+
+
+def random_net():
+    random.seed(0)
+    return RandomNet(5)
+
+
+def parse_chain(profile=None):
+    def setup(path):
+        importer = CsvImporter()
+        files = [(from_small_date(date), path / "chains" / f"{date}.csv") for date in CHAIN_DATES]
+
+        def run():
+            for date, chain_path in files:
+                importer.parse_chain(date, TSLA, chain_path, profile)
+        return run
+    return setup
+
+
+def option_chain_search(path):
+    importer = CsvImporter()
+    training = load_training(path).set_index("date")
+    chains = []
+    for date in CHAIN_DATES:
+        chain = importer.parse_chain(from_small_date(date), TSLA, path / "chains" / f"{date}.csv")
+        chains.append((chain, training.loc[chain.date, "close"]))
+
+    def run():
+        # the price weighted thetas are cached per chain, time the first search of the day too
+        OptionChain._expirations_by_price_weighted_theta.cache_clear()
+        for chain, close in chains:
+            for delta in (0.1, 0.2, 0.3, 0.4, 0.5):
+                for theta in (-0.5, -1.0, -2.0, -4.0):
+                    chain.search(close, theta=theta, delta=delta)
+    return run
+
+
+def option_chain_search_grid(path):
+    importer = CsvImporter()
+    training = load_training(path).set_index("date")
+    chains = []
+    for date in CHAIN_DATES:
+        chain = importer.parse_chain(from_small_date(date), TSLA, path / "chains" / f"{date}.csv")
+        chains.append((chain, training.loc[chain.date, "close"]))
+    random.seed(0)
+    outputs = [(random.uniform(-1, 1), random.uniform(-1, 1)) for _ in range(200)]
+
+    def run():
+        # grids are filled as they are searched, time that too
+        OptionChain.search_grid.cache_clear()
+        for chain, close in chains:
+            grid = chain.search_grid(close, 256)
+            for theta, delta in outputs:
+                grid.search(theta, delta)
+    return run
+
+
+def trading_engine_eval(path):
+    training = load_training(path)
+    days = list(zip(training["date"], training["close"]))
+    expiration = datetime(2020, 12, 18)
+
+    def run():
+        # contracts never expire in range, so every day walks the whole portfolio
+        portfolio = Portfolio(cash=0.0, securities={TSLA: 100})
+        for strike in range(1000, 3000, 100):
+            portfolio.securities[Option(Option.CALL, TSLA, strike, expiration)] = -1
+        engine = TradingEngine([portfolio])
+        for _ in range(10):
+            for date, close in days:
+                engine.eval({TSLA: close}, date)
+    return run
+
+
+def normalizer(path):
+    def run():
+        Normalizer(path).normalize_training()
+    return run
+
+
+def eval_generation(path):
+    training = load_training(path)
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        str(CONFIG_PATH)
+    )
+    random.seed(0)
+    genomes = list(neat.Population(config).population.items())
+    settings = Settings()
+    settings.inputs = ("iv_10", "iv_30", "rsi")
+    evaluator = Evaluator(TSLA, path, training, None, settings)
+    windows = [evaluator.window(START, END)]
+
+    def run():
+        # a new generation is mostly new genomes, so networks are compiled every run
+        evaluator.network_cache = NetworkCache()
+        evaluator.evaluate(genomes, config, windows)
+    return run
+
+
+BENCHMARKS = {
+    "simulate_buy_and_hold": simulate(BuyAndHoldNet),
+    "simulate_always_sell": simulate(always_sell),
+    "simulate_random": simulate(random_net),
+    "parse_chain": parse_chain(),
+    "parse_chain_tradable": parse_chain("tradable"),
+    "option_chain_search": option_chain_search,
+    "option_chain_search_grid": option_chain_search_grid,
+    "trading_engine_eval": trading_engine_eval,
+    "normalizer": normalizer,
+    "load_tapes": load_tapes,
+    "eval_generation": eval_generation,
+}
+
+
+def measure(setup, path, repeat):
+    """ returns timing statistics of a benchmark in seconds """
+    run = setup(path)
+    run()
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        times.append(perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.pstdev(times),
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(names, path=DATA_PATH, repeat=5):
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "repeat": repeat,
+        },
+        "results": {name: measure(BENCHMARKS[name], path, repeat) for name in names},
+    }
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    compares the fastest run of each benchmark with the baseline
+    returns rows of (name, baseline, current, ratio, regressed)
+    """
+    rows = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            rows.append((name, None, current["min"], None, False))
+            continue
+        ratio = current["min"] / previous["min"]
+        rows.append((name, previous["min"], current["min"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_comparison(rows, out=sys.stderr):
+    print(f"{'benchmark':<24} {'baseline':>10} {'current':>10} {'ratio':>7}", file=out)
+    for name, previous, current, ratio, regressed in rows:
+        if previous is None:
+            print(f"{name:<24} {'-':>10} {current:>10.4f} {'new':>7}", file=out)
+        else:
+            flag = "  REGRESSED" if regressed else ""
+            print(f"{name:<24} {previous:>10.4f} {current:>10.4f} {ratio:>7.2f}{flag}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="neatrader benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks containing this text")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("-o", "--output", help="write JSON results to this file")
+    parser.add_argument("-b", "--baseline", help="JSON results to compare against")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.1,
+                        help="allowed slowdown before a benchmark counts as regressed")
+    parser.add_argument("--data", default=str(DATA_PATH), help="symbol data directory")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    # rejected trades are logged as errors, which would drown out the comparison
+    logging.basicConfig(level=logging.CRITICAL)
+    results = run_benchmarks(names, Path(args.data), args.repeat)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f), args.tolerance)
+        print_comparison(rows)
+        if any(regressed for *_, regressed in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
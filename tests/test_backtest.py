@@ -0,0 +1,84 @@
+import neat
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.backtest import Backtest, load_genomes, summarize, walk_forward_ranges
+from neatrader.preprocess.synthetic import generate
+from neatrader.settings import Settings
+from neatrader.universe import CROSS_VALIDATION, TRAINING
+
+local_dir = os.path.dirname(__file__)
+CONFIG = os.path.join(local_dir, "test_configuration.ini")
+DATES = [datetime(2020, 1, 2), datetime(2020, 1, 3), datetime(2020, 1, 6), datetime(2020, 1, 9), datetime(2020, 1, 10)]
+
+
+class TestBacktest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        generate(cls.root, symbols=1, years=0.5, strikes=10, expirations=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            CONFIG
+        )
+        random.seed(0)
+        self.pop = neat.Population(self.config)
+        self.genomes = sorted(self.pop.population.items())[:3]
+
+    def test_walk_forward_ranges(self):
+        self.assertEqual(
+            [(DATES[0], DATES[2]), (DATES[2], DATES[4])],
+            walk_forward_ranges(DATES, 4)
+        )
+        rolling = walk_forward_ranges(DATES, 4, step=2)
+        self.assertEqual(3, len(rolling))
+        self.assertEqual((datetime(2020, 1, 6), DATES[4]), rolling[-1])
+        self.assertEqual([], walk_forward_ranges(DATES, 30))
+
+    def test_load_winner(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "winner.pkl")
+            genome_id, winner = self.genomes[0]
+            with open(filename, "wb") as f:
+                pickle.dump(winner, f)
+            genomes, config = load_genomes(filename, CONFIG)
+            self.assertEqual([genome_id], [key for key, _ in genomes])
+            self.assertEqual(self.config.genome_config.num_inputs, config.genome_config.num_inputs)
+
+    def test_load_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = os.path.join(tmp, "neat-checkpoint-")
+            neat.Checkpointer(filename_prefix=prefix).save_checkpoint(
+                self.config, self.pop.population, self.pop.species, 3
+            )
+            genomes, _ = load_genomes(f"{prefix}3", CONFIG)
+            self.assertEqual(sorted(self.pop.population), [key for key, _ in genomes])
+
+    def test_run(self):
+        settings = Settings()
+        backtest = Backtest(os.path.join(self.root, "SYN"), settings, days=28, workers=2)
+        ranges = backtest.ranges()
+        self.assertEqual({TRAINING, CROSS_VALIDATION}, {tape for tape, _, _ in ranges})
+
+        table = backtest.run(self.genomes, self.config)
+        self.assertEqual(len(ranges), len(table))
+        self.assertEqual(["tape", "start", "end", *[key for key, _ in self.genomes]], list(table.columns))
+        self.assertFalse(table[[key for key, _ in self.genomes]].isna().any().any())
+        self.assertGreater(backtest.days_simulated, 0)
+
+        summary = summarize(table)
+        self.assertEqual(2 * len(self.genomes), len(summary))
+        self.assertTrue(((summary["positive"] >= 0) & (summary["positive"] <= 1)).all())
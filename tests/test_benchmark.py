@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmark import compare, main, measure, run_benchmarks
+
+
+def results(**timings):
+    return {"results": {name: {"min": seconds} for name, seconds in timings.items()}}
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_measure(self):
+        calls = []
+        stats = measure(lambda path: lambda: calls.append(path), "path", 3)
+        # one warm up run
+        self.assertEqual(4, len(calls))
+        self.assertEqual(3, stats["repeat"])
+        self.assertLessEqual(stats["min"], stats["median"])
+
+    def test_run_benchmarks(self):
+        output = run_benchmarks(["simulate_buy_and_hold"], repeat=1)
+        self.assertEqual(["simulate_buy_and_hold"], list(output["results"]))
+        self.assertGreater(output["results"]["simulate_buy_and_hold"]["min"], 0)
+
+    def test_compare(self):
+        rows = compare(results(a=1.05, b=1.5, c=0.5, d=1.0), results(a=1.0, b=1.0, c=1.0), tolerance=0.1)
+        regressed = {name: flag for name, *_, flag in rows}
+        self.assertEqual({"a": False, "b": True, "c": False, "d": False}, regressed)
+        # benchmarks missing from the baseline are reported as new
+        self.assertEqual(("d", None, 1.0, None, False), rows[3])
+
+    def test_main_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w") as f:
+                json.dump(results(simulate_buy_and_hold=1e-9), f)
+            output = os.path.join(tmp, "results.json")
+            code = main(["-k", "buy_and_hold", "-r", "1", "-o", output, "-b", baseline])
+            self.assertEqual(1, code)
+            with open(output) as f:
+                self.assertIn("simulate_buy_and_hold", json.load(f)["results"])
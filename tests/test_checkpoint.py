@@ -0,0 +1,69 @@
+import neat
+import os
+import random
+import tempfile
+import unittest
+from neatrader.checkpoint import AsyncCheckpointer, find_checkpoints
+from os.path import exists, join
+
+local_dir = os.path.dirname(__file__)
+
+
+def eval_genomes(genomes, config):
+    for genome_id, genome in genomes:
+        genome.fitness = random.random() / 2
+
+
+class TestAsyncCheckpointer(unittest.TestCase):
+    def load_pop(self):
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            join(local_dir, "test_configuration.ini")
+        )
+        return neat.Population(config)
+
+    def test_bounded_retention(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = join(tmp, "neat-checkpoint-")
+            pop = self.load_pop()
+            checkpointer = AsyncCheckpointer(1, keep=2, prefix=prefix)
+            pop.add_reporter(checkpointer)
+
+            pop.run(eval_genomes, 5)
+            checkpointer.close()
+
+            self.assertEqual([f"{prefix}4", f"{prefix}3"], find_checkpoints(prefix))
+            # no temporary files left behind
+            self.assertEqual(2, len(os.listdir(tmp)))
+
+    def test_restore(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = join(tmp, "neat-checkpoint-")
+            pop = self.load_pop()
+            checkpointer = AsyncCheckpointer(2, prefix=prefix)
+            pop.add_reporter(checkpointer)
+
+            pop.run(eval_genomes, 2)
+            checkpointer.flush()
+
+            restored = neat.Checkpointer.restore_checkpoint(f"{prefix}1")
+            self.assertEqual(1, restored.generation)
+            self.assertEqual(set(pop.population.keys()), set(restored.population.keys()))
+            checkpointer.close()
+
+    def test_seeded_with_existing_checkpoints(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = join(tmp, "neat-checkpoint-")
+            for generation in (8, 9, 10):
+                open(f"{prefix}{generation}", "w").close()
+
+            checkpointer = AsyncCheckpointer(1, keep=1, prefix=prefix)
+            pop = self.load_pop()
+            checkpointer.save_checkpoint(pop.config, pop.population, pop.species, 11)
+            checkpointer.close()
+
+            self.assertFalse(exists(f"{prefix}10"))
+            self.assertTrue(exists(f"{prefix}11"))
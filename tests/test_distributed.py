@@ -0,0 +1,186 @@
+import multiprocessing
+import neat
+import os
+import random
+import socket
+import unittest
+from datetime import datetime
+from neatrader.distributed import COUNTERS, STOP, Coordinator, DistributedEvaluator, TaskBoard, WorkerManager, work
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.settings import Settings
+from pathlib import Path
+from utils import TSLA, FixedDateRangeFactory
+
+local_dir = os.path.dirname(__file__)
+AUTHKEY = b"test"
+RANGES = [(datetime(2020, 7, 1), datetime(2020, 7, 14)), (datetime(2020, 8, 3), datetime(2020, 8, 14))]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTaskBoard(unittest.TestCase):
+    def test_lease_expires(self):
+        clock = FakeClock()
+        board = TaskBoard(lease_seconds=10, clock=clock)
+        task_id = board.submit("task")
+
+        self.assertEqual((task_id, "task"), board.lease("a"))
+        self.assertIsNone(board.lease("b"))
+
+        clock.now = 11
+        self.assertEqual((task_id, "task"), board.lease("b"))
+        self.assertEqual(1, board.resubmitted)
+
+        self.assertTrue(board.complete(task_id, "from b"))
+        # the first worker finishing late is ignored
+        self.assertFalse(board.complete(task_id, "from a"))
+        self.assertEqual("from b", board.collect(task_id))
+        self.assertIsNone(board.collect(task_id))
+
+    def test_late_result_of_resubmitted_task(self):
+        clock = FakeClock()
+        board = TaskBoard(lease_seconds=10, clock=clock)
+        task_id = board.submit("task")
+        board.lease("a")
+        clock.now = 11
+        board._expire()
+
+        self.assertTrue(board.complete(task_id, "from a"))
+        self.assertIsNone(board.lease("b"))
+
+    def test_close(self):
+        board = TaskBoard()
+        board.submit("task")
+        board.close()
+        self.assertEqual(STOP, board.lease("a"))
+
+
+class TestCoordinator(unittest.TestCase):
+    def test_close_releases_the_port(self):
+        coordinator = Coordinator(("127.0.0.1", 0), AUTHKEY)
+        # a connected worker is still told to stop
+        manager = WorkerManager(address=coordinator.address, authkey=AUTHKEY)
+        manager.connect()
+        board = manager.board()
+        self.assertIsNone(board.lease("a"))
+
+        coordinator.close()
+        self.assertFalse(coordinator.thread.is_alive())
+        self.assertEqual(STOP, board.lease("a"))
+
+        # the connections to the coordinator are still open, as they would be for a new coordinator
+        with socket.socket() as listener:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(coordinator.address)
+            listener.listen()
+        with self.assertRaises(ConnectionRefusedError):
+            socket.create_connection(coordinator.address, timeout=1).close()
+
+
+class TestDistributedEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        self.path = Path(local_dir) / "test_data" / "TSLA"
+        training = read_csv(self.path / "training.csv")
+        settings = Settings()
+        settings.windows = len(RANGES)
+        self.evaluator = Evaluator(TSLA, self.path, training, FixedDateRangeFactory(*RANGES), settings)
+        random.seed(0)
+        self.genomes = list(neat.Population(self.config).population.items())[:6]
+
+    def expected_fitnesses(self):
+        windows = [self.evaluator.window(start, end) for start, end in RANGES]
+        self.evaluator.evaluate(self.genomes, self.config, windows)
+        return {genome_id: genome.fitness for genome_id, genome in self.genomes}
+
+    def start_workers(self, address, count):
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=work, args=(address, AUTHKEY, self.path), kwargs={"poll_seconds": 0.05})
+            for _ in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        return workers
+
+    def test_same_fitness_as_local(self):
+        # two genomes of the first chunk which only hold, the second shares the simulations of the first
+        for genome_id, genome in self.genomes[:2]:
+            genome.connections.clear()
+            for node in genome.nodes.values():
+                node.bias = 0.0
+        expected = self.expected_fitnesses()
+        local = {counter: getattr(self.evaluator, counter) for counter in COUNTERS}
+        for counter in COUNTERS:
+            setattr(self.evaluator, counter, 0)
+
+        distributed = DistributedEvaluator(self.evaluator, ("127.0.0.1", 0), AUTHKEY, chunk_size=2)
+        workers = self.start_workers(distributed.coordinator.address, 2)
+        try:
+            for genome_id, genome in self.genomes:
+                genome.fitness = None
+            distributed.evaluate(self.genomes, self.config)
+        finally:
+            distributed.close()
+            for worker in workers:
+                worker.join(30)
+
+        self.assertEqual(expected, {genome_id: genome.fitness for genome_id, genome in self.genomes})
+        # the same simulations are run, skipped and shared as in this process
+        self.assertEqual(local, {counter: getattr(self.evaluator, counter) for counter in COUNTERS})
+        self.assertEqual(len(RANGES), local["simulations_shared"])
+        for worker in workers:
+            self.assertEqual(0, worker.exitcode)
+
+    def test_warns_without_workers(self):
+        distributed = DistributedEvaluator(self.evaluator, ("127.0.0.1", 0), AUTHKEY)
+        try:
+            task_id = distributed.coordinator.board.submit("task")
+            with self.assertLogs("neatrader.distributed", "WARNING") as logs:
+                with self.assertRaises(TimeoutError):
+                    distributed.coordinator.wait([task_id], poll_seconds=0.01, timeout=0.5, warn_seconds=0.1)
+        finally:
+            distributed.close()
+        self.assertIn("1 tasks, 0 leased to workers", logs.output[0])
+
+    def test_lost_worker(self):
+        expected = self.expected_fitnesses()
+        self.evaluator.daterange_factory = FixedDateRangeFactory(*RANGES)
+
+        distributed = DistributedEvaluator(self.evaluator, ("127.0.0.1", 0), AUTHKEY, lease_seconds=1, chunk_size=3)
+        # a worker that leases the first task and never returns it
+        manager = WorkerManager(address=distributed.coordinator.address, authkey=AUTHKEY)
+        manager.connect()
+        board = manager.board()
+        workers = []
+        try:
+            for genome_id, genome in self.genomes:
+                genome.fitness = None
+            original_wait = distributed.coordinator.wait
+
+            def wait(task_ids, **kwargs):
+                self.assertIsNotNone(board.lease("lost"))
+                workers.extend(self.start_workers(distributed.coordinator.address, 1))
+                return original_wait(task_ids, timeout=120)
+            distributed.coordinator.wait = wait
+            distributed.evaluate(self.genomes, self.config)
+        finally:
+            distributed.close()
+            for worker in workers:
+                worker.join(30)
+
+        self.assertEqual(expected, {genome_id: genome.fitness for genome_id, genome in self.genomes})
+        self.assertEqual(1, distributed.coordinator.board.resubmitted)
@@ -0,0 +1,31 @@
+import unittest
+from neatrader.loader import read_csv
+from neatrader.trading import MarketFeatures
+from neatrader.trading.features import input_node_names
+from pathlib import Path
+
+
+class TestMarketFeatures(unittest.TestCase):
+    def setUp(self):
+        path = Path("tests/test_data/TSLA")
+        self.training = read_csv(path / "training.csv")
+
+    def test_validity_mask(self):
+        features = MarketFeatures(self.training)
+
+        self.assertEqual((len(self.training), 3), features.values.shape)
+        # rsi needs 14 days of history, the first 13 days have none
+        self.assertFalse(features.valid[:13].any())
+        self.assertTrue(features.valid[13:].all())
+
+    def test_configured_inputs(self):
+        features = MarketFeatures(self.training, ("close", "macd", "rsi"))
+
+        self.assertEqual(898.1, features.values[0][0])
+        # macd needs 26 days of history
+        self.assertFalse(features.valid[:25].any())
+        self.assertTrue(features.valid[-1])
+
+    def test_input_node_names(self):
+        names = input_node_names(("iv_30", "macd"))
+        self.assertEqual({-1: "cash", -2: "shares", -3: "held option value", -4: "30 day iv", -5: "macd"}, names)
@@ -1,9 +1,12 @@
+import json
 import math
 import pandas as pd
+import tempfile
 import unittest
 import utils
 from datetime import datetime
-from neatrader.preprocess import EtradeImporter, CsvImporter
+from neatrader.model import Option
+from neatrader.preprocess import EtradeImporter, CsvImporter, CHAIN_PROFILES
 from neatrader.quote_service import QuoteService
 from pathlib import Path
 
@@ -31,6 +34,20 @@ class TestImporter(unittest.TestCase):
         chains = list(importer.for_dates("TSLA", daterange))
         self.assertEqual(2, len(chains))
 
+    def test_etrade_load_quotes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for day, price in (("2020-09-09", 366.28), ("2020-09-10", 371.34)):
+                Path(tmp, day).mkdir()
+                with open(Path(tmp, day, "TSLA.json"), "w") as f:
+                    json.dump({"quote": {"symbol": "TSLA", "lastTrade": price}}, f)
+            importer = EtradeImporter(Path(tmp))
+            security = importer.load_quotes("TSLA", pd.date_range(start="2020-09-08", end="2020-09-11"))
+
+            quotes = importer.quote_service.between(security, datetime(2020, 9, 1), datetime(2020, 9, 30))
+            self.assertEqual([366.28, 371.34], [quote.quote for quote in quotes])
+            self.assertEqual(datetime(2020, 9, 10), importer.quote_service.quote(security).datetime)
+            self.assertIsNone(importer.load_quotes("TSLA", pd.date_range(start="2021-01-01", end="2021-01-02")))
+
     def test_etrade_for_dates_with_missing_file(self):
         importer = EtradeImporter(utils.test_path("test_data/etrade"))
         daterange = pd.date_range(start="2020-09-09", end="2020-12-04")
@@ -49,6 +66,31 @@ class TestImporter(unittest.TestCase):
         self.assertEqual(chain.security.symbol, "TSLA")
         self.assertIsNotNone(chain.get_option("call", datetime(2020, 9, 18), 420))
 
+    def test_csv_parse_chain_with_profile(self):
+        importer = CsvImporter()
+        path = Path("tests/test_data/TSLA/chains/200601.csv")
+        full = importer.parse_chain(datetime(2020, 6, 1), utils.TSLA, path)
+        calls = importer.parse_chain(datetime(2020, 6, 1), utils.TSLA, path, "calls")
+        tradable = importer.parse_chain(datetime(2020, 6, 1), utils.TSLA, path, CHAIN_PROFILES["tradable"])
+
+        self.assertFalse(calls.puts())
+        self.assertEqual(full.calls().keys(), calls.calls().keys())
+        self.assertFalse(tradable.puts())
+        contracts = [option for strikes in tradable.calls().values() for option in strikes.values()]
+        self.assertTrue(contracts)
+        for option in contracts:
+            self.assertGreater(option.price, 0)
+            self.assertFalse(math.isnan(option.delta) and math.isnan(option.theta))
+
+        # pruned calls are still priced, as they may be held
+        pruned = [
+            option for strikes in full.calls().values() for option in strikes.values()
+            if tradable.get_option(Option.CALL, option.expiration, option.strike) is None
+        ]
+        self.assertTrue(pruned)
+        for option in pruned:
+            self.assertEqual(option.price, tradable.get_price(option))
+
     def test_csv_parse_quotes(self):
         importer = CsvImporter()
         quote = next(importer.parse_quotes(Path("tests/test_data/TSLA/close.csv")))
@@ -0,0 +1,22 @@
+import math
+import unittest
+from neatrader.preprocess import IncrementalIndicators, TrainingSetGenerator
+from neatrader.preprocess.indicators import COLUMNS
+from pathlib import Path
+
+PATH = Path("tests/test_data/TSLA")
+
+
+class TestIncrementalIndicators(unittest.TestCase):
+    def test_matches_training_set(self):
+        expected = TrainingSetGenerator(PATH).generate()
+        indicators = IncrementalIndicators()
+        rows = [indicators.update(close) for close in expected["close"].tolist()]
+
+        for column in COLUMNS:
+            for i, (row, value) in enumerate(zip(rows, expected[column].tolist())):
+                with self.subTest(column=column, day=i):
+                    if math.isnan(value):
+                        self.assertIsNone(row[column])
+                    else:
+                        self.assertAlmostEqual(value, row[column], places=9)
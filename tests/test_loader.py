@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.loader import CHAIN, SPLITS, read_csv, sidecar, tape_columns
+from pathlib import Path
+
+PATH = Path("tests/test_data/TSLA")
+
+
+class TestLoader(unittest.TestCase):
+    def test_tape(self):
+        df = read_csv(PATH / "training.csv")
+        self.assertEqual(datetime(2020, 6, 1), df["date"][0])
+        self.assertEqual("datetime64[ns]", str(df["date"].dtype))
+        self.assertTrue(all(str(dtype) == "float64" for dtype in df.dtypes[1:]))
+        self.assertEqual(898.1, df["close"][0])
+
+    def test_columns(self):
+        df = read_csv(PATH / "close.csv", columns=["date", "close"])
+        self.assertEqual(["date", "close"], list(df.columns))
+
+    def test_tape_columns(self):
+        self.assertEqual(["date", "close", "iv_30", "rsi"], tape_columns(("iv_30", "rsi")))
+        self.assertEqual(["date", "close", "macd"], tape_columns(("close", "macd")))
+        df = read_csv(PATH / "training.csv", columns=tape_columns(("rsi",)))
+        self.assertEqual({"date", "close", "rsi"}, set(df.columns))
+
+    def test_chain(self):
+        df = read_csv(PATH / "chains" / "200601.csv", CHAIN, dates=("expiration",))
+        self.assertEqual("category", str(df["direction"].dtype))
+        self.assertEqual("datetime64[ns]", str(df["expiration"].dtype))
+
+        raw = read_csv(PATH / "chains" / "200601.csv", CHAIN, dates=())
+        self.assertIsInstance(raw["expiration"][0], str)
+
+    def test_quoted_dates(self):
+        df = read_csv(PATH / "splits.csv", SPLITS, date_format="%Y-%m-%d")
+        self.assertEqual([(datetime(2020, 8, 31), 5)], list(df.itertuples(index=False)))
+        self.assertEqual("int64", str(df["multiplier"].dtype))
+
+    def test_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "training.csv"
+            shutil.copy(PATH / "training.csv", path)
+            expected = read_csv(path, cache=True)
+            self.assertTrue(sidecar(path).exists())
+            self.assertTrue(expected.equals(read_csv(path, cache=True)))
+
+            # a modified file is parsed again
+            with open(path, "a") as f:
+                f.write("210101,1.0,,,,,,,,,,,,\n")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(len(expected) + 1, len(read_csv(path, cache=True)))
+            # the cache only holds the columns read
+            self.assertEqual(["date", "close"], list(read_csv(path, columns=["date", "close"], cache=True).columns))
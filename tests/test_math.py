@@ -1,5 +1,5 @@
 import unittest
-from neatrader.math import min_max, un_min_max
+from neatrader.math import min_max, un_min_max, reducer, reducer_quantile
 
 
 class TestMath(unittest.TestCase):
@@ -15,3 +15,19 @@ class TestMath(unittest.TestCase):
         x = min_max(2, -5, 100)
         result = un_min_max(x, -5, 100)
         self.assertAlmostEqual(2, result, places=6)
+
+    def test_reducer(self):
+        values = [4, 1, 3, 2]
+        self.assertEqual(2.5, reducer("mean")(values))
+        self.assertEqual(1, reducer("min")(values))
+        self.assertEqual(4, reducer("max")(values))
+        self.assertEqual(2.5, reducer("median")(values))
+        self.assertEqual(1.75, reducer("q0.25")(values))
+        self.assertRaises(ValueError, reducer, "mode")
+
+    def test_reducer_quantile(self):
+        self.assertEqual(0, reducer_quantile("min"))
+        self.assertEqual(0.5, reducer_quantile("median"))
+        self.assertEqual(1, reducer_quantile("max"))
+        self.assertEqual(0.25, reducer_quantile("q0.25"))
+        self.assertIsNone(reducer_quantile("mean"))
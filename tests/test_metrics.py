@@ -0,0 +1,86 @@
+import json
+import neat
+import os
+import pickle
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.metrics import MetricsReporter, distribution
+from neatrader.settings import Settings
+from pathlib import Path
+from utils import TSLA
+
+local_dir = os.path.dirname(__file__)
+
+
+class TestMetricsReporter(unittest.TestCase):
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        path = Path(local_dir) / "test_data" / "TSLA"
+        training = read_csv(path / "training.csv")
+        self.evaluator = Evaluator(TSLA, path, training, None, Settings())
+        self.window = self.evaluator.window(datetime(2020, 8, 3), datetime(2020, 8, 14))
+
+    def run_generations(self, reporter, generations):
+        self.config.no_fitness_termination = True
+        pop = neat.Population(self.config)
+        pop.add_reporter(reporter)
+        pop.run(lambda genomes, config: self.evaluator.evaluate(genomes, config, [self.window]), generations)
+        return pop
+
+    def test_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "metrics.jsonl")
+            reporter = MetricsReporter(filename, self.evaluator)
+            self.run_generations(reporter, 2)
+
+            with open(filename) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual([0, 1], [line["generation"] for line in lines])
+        first = lines[0]
+        pop_size = self.config.pop_size
+        self.assertEqual(pop_size, first["simulations"])
+        self.assertEqual(pop_size * len(self.window), first["days_simulated"])
+        self.assertGreater(first["days_per_second"], 0)
+        self.assertGreater(first["genomes_per_second"], 0)
+        self.assertEqual(0, first["cv_days_simulated"])
+        self.assertEqual(pop_size, first["network_cache"]["hits"] + first["network_cache"]["misses"])
+        self.assertEqual(0, first["chain_cache"]["evictions"])
+        self.assertEqual(0, first["chain_cache"]["waits"])
+        self.assertGreater(first["rss_bytes"], 0)
+        self.assertEqual([], first["top_allocations"])
+        # the initial population has no hidden nodes, one node per output
+        self.assertEqual(5, first["network_size"]["nodes"]["min"])
+        self.assertEqual(2 * pop_size * len(self.window), reporter.days_simulated)
+
+        # checkpoints pickle reporters, the evaluator stays behind
+        restored = pickle.loads(pickle.dumps(reporter))
+        self.assertIsNone(restored.evaluator)
+
+    def test_top_allocations(self):
+        tracing = tracemalloc.is_tracing()
+        try:
+            reporter = MetricsReporter(None, self.evaluator, trace_allocations=3)
+            self.run_generations(reporter, 1)
+            line = reporter.post_evaluate(
+                self.config, {}, neat.DefaultSpeciesSet(self.config.species_set_config, None), None
+            )
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        self.assertEqual(3, len(line["top_allocations"]))
+        self.assertGreater(line["top_allocations"][0]["size"], 0)
+
+    def test_distribution(self):
+        self.assertEqual({"min": 1, "median": 2, "mean": 2, "max": 3}, distribution([3, 1, 2]))
+        self.assertIsNone(distribution([]))
@@ -0,0 +1,117 @@
+import neat
+import os
+import unittest
+from datetime import datetime
+from neat.activations import identity_activation
+from neat.aggregations import sum_aggregation
+from neat.nn import FeedForwardNetwork
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.model import Portfolio
+from neatrader.netcache import NetworkCache, constant_policy, structural_key
+from neatrader.settings import Settings
+from neatrader.trading import Simulator
+from pathlib import Path
+from utils import TSLA
+
+local_dir = os.path.dirname(__file__)
+
+
+def network(biases, links={}):
+    """ a network of 6 inputs and 5 outputs, biases and links by node in evaluation order """
+    node_evals = [
+        (node, identity_activation, sum_aggregation, bias, 1.0, links.get(node, []))
+        for node, bias in biases.items()
+    ]
+    return FeedForwardNetwork([-1, -2, -3, -4, -5, -6], [0, 1, 2, 3, 4], node_evals)
+
+
+class TestNetworkCache(unittest.TestCase):
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        self.genomes = list(neat.Population(self.config).population.items())[:5]
+
+    def test_structural_key(self):
+        _, genome = self.genomes[0]
+        key = structural_key(genome)
+        self.assertEqual(key, structural_key(genome))
+
+        connection = next(iter(genome.connections.values()))
+        connection.weight += 1
+        self.assertNotEqual(key, structural_key(genome))
+
+        connection.weight -= 1
+        connection.enabled = False
+        self.assertNotEqual(key, structural_key(genome))
+
+        connection.enabled = True
+        next(iter(genome.nodes.values())).activation = "tanh"
+        self.assertNotEqual(key, structural_key(genome))
+
+    def test_reuse_across_generations(self):
+        cache = NetworkCache()
+        first = cache.networks_for(self.genomes, self.config)
+        self.assertEqual(5, cache.misses)
+
+        # two survivors carried over into the next generation
+        second = cache.networks_for(self.genomes[:2], self.config)
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(3, cache.evictions)
+        self.assertEqual(2, len(cache.networks))
+        for genome_id, net in second.items():
+            self.assertIs(first[genome_id], net)
+
+    def test_cached_network_activates_like_a_new_one(self):
+        cache = NetworkCache()
+        _, genome = self.genomes[0]
+        cached = cache.get(genome, self.config)
+        cache.get(self.genomes[1][1], self.config).activate((1, 1, 1, 1, 1, 1))
+
+        fresh = neat.nn.FeedForwardNetwork.create(genome, self.config)
+        params = (0.5, 1, 0, 0.3, 0.2, 0.6)
+        self.assertEqual(fresh.activate(params), cached.activate(params))
+        self.assertIs(cached, cache.get(genome, self.config))
+
+
+class TestConstantPolicy(unittest.TestCase):
+    def test_unconnected_network_holds(self):
+        self.assertEqual(("hold",), constant_policy(network({})))
+        # buying without a contract to close does nothing
+        self.assertEqual(("hold",), constant_policy(network({0: 1.0, 3: 0.3}, {3: [(-1, 1.0)]})))
+
+    def test_constant_sell(self):
+        net = network({1: 1.0, 3: 0.32, 4: -3.2})
+        self.assertEqual(("sell", 0.32, -3.2), constant_policy(net))
+
+    def test_input_dependent(self):
+        self.assertIsNone(constant_policy(network({1: 1.0}, {1: [(-1, 1.0)]})))
+        # the contract sold depends on the inputs
+        self.assertIsNone(constant_policy(network({1: 1.0, 3: 0.32}, {3: [(-2, 1.0)]})))
+
+    def test_dependence_through_hidden_nodes(self):
+        net = network({5: 0.0, 2: 1.0}, {5: [(-1, 1.0)], 2: [(5, 1.0)]})
+        self.assertIsNone(constant_policy(net))
+
+    def test_windows_are_simulated_once_per_policy(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        evaluator = Evaluator(TSLA, path, training, None, Settings())
+        window = evaluator.window(datetime(2020, 7, 19), datetime(2020, 8, 22))
+        net = network({1: 1.0, 3: 0.32, 4: -3.2})
+        # the same policy from a different network
+        other = network({5: 1.0, 2: 0.0, 1: 2.0, 3: 0.32, 4: -3.2}, {2: [(5, 0.5)]})
+
+        fitness, _ = evaluator.simulate(net, window)
+        self.assertEqual((fitness, len(window)), evaluator.simulate(other, window))
+        self.assertEqual(1, evaluator.simulations_shared)
+
+        portfolio = Portfolio(cash=0.0, securities={TSLA: 100})
+        expected = Simulator(TSLA, portfolio, path, training).simulate_window(other, window)
+        self.assertEqual(expected, fitness)
+        self.assertNotEqual(fitness, evaluator.simulate(network({1: 1.0, 3: 0.5, 4: -3.2}), window)[0])
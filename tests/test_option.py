@@ -1,3 +1,4 @@
+import random
 import unittest
 from datetime import datetime
 from neatrader.model import Option, Security, OptionChain, Quote
@@ -67,6 +68,21 @@ class TestOptionChain(unittest.TestCase):
         self.assertEqual(datetime(2022, 9, 16), result.expiration)
         self.assertEqual(1000, result.strike)
 
+    def test_search_grid(self):
+        importer = CsvImporter()
+        chain = next(importer.chains(Path("tests/test_data/TSLA")))
+        grid = chain.search_grid(372.72, 16)
+        self.assertIs(grid, chain.search_grid(372.72, 16))
+
+        random.seed(0)
+        edges = [-1 + i / 8 for i in range(17)]
+        points = [(theta, delta) for theta in edges for delta in edges]
+        points += [(random.uniform(-1.5, 1.5), random.uniform(-1.5, 1.5)) for _ in range(2000)]
+        for theta, delta in points:
+            self.assertIs(chain.search(372.72, theta=theta, delta=delta), grid.search(theta, delta))
+        self.assertGreater(grid.hits, 0)
+        self.assertGreater(grid.misses, 0)
+
     def test_otm(self):
         security = Security("TSLA")
         o1 = Option("call", security, 500, datetime(2020, 4, 20))
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import math
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.loader import CHAIN, CLOSE, read_csv
+from neatrader.model import Portfolio
+from neatrader.paper import DropDirectory, PaperTrader
+from neatrader.preprocess import TrainingSetGenerator
+from neatrader.preprocess.normalizer import normalize_greeks, normalize_value, read_scales
+from neatrader.reporter import SimulationTrace
+from neatrader.settings import Settings
+from neatrader.trading import Simulator
+from pathlib import Path
+from utils import TSLA, SellOnceNet
+
+PATH = Path("tests/test_data/TSLA")
+HISTORY_END = datetime(2020, 8, 31)
+CSV_DAYS = ["200901", "200902"]
+JSON_DAYS = ["2020-09-03", "2020-09-04"]
+
+
+def net():
+    net = SellOnceNet()
+    net.theta = -3.2
+    net.delta = 0.32
+    return net
+
+
+def write_etrade_json(path, chain_csv, close):
+    """ writes a chain csv in the layout of the etrade cache """
+    df = read_csv(chain_csv, CHAIN, dates=("expiration",))
+    chain = {"quote": {"symbol": TSLA.symbol, "lastTrade": close}}
+    scrub = lambda value: -9999999.0 if math.isnan(value) else value  # noqa: E731
+    for row in df.itertuples(index=False):
+        chain.setdefault(f"{row.expiration:%Y-%m-%d}", []).append({
+            "optionType": row.direction.upper(),
+            "strikePrice": row.strike,
+            "lastPrice": scrub(row.price),
+            "OptionGreeks": {"delta": scrub(row.delta), "theta": scrub(row.theta),
+                             "vega": scrub(row.vega), "iv": scrub(row.iv)},
+        })
+    path.parent.mkdir(parents=True)
+    with open(path, "w") as f:
+        json.dump(chain, f)
+
+
+class TestPaperTrader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.closes = read_csv(PATH / "close.csv", CLOSE)
+        # the data set ends where the feed begins
+        self.data = self.tmp / "TSLA"
+        self.data.mkdir()
+        shutil.copy(PATH / "splits.csv", self.data)
+        history = self.closes[self.closes["date"] <= HISTORY_END].copy()
+        history["date"] = history["date"].dt.strftime("%y%m%d")
+        history.to_csv(self.data / "close.csv", index=False)
+        self.drop = self.tmp / "drop"
+        (self.drop / "chains").mkdir(parents=True)
+        self.state = self.tmp / "paper.pkl"
+        self.journal = self.tmp / "paper.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        Simulator.chain_cache.clear()
+
+    def close(self, date):
+        return self.closes.loc[self.closes["date"] == date, "close"].item()
+
+    def drop_csv(self, day):
+        shutil.copy(PATH / "chains" / f"{day}.csv", self.drop / "chains")
+        date = datetime.strptime(day, "%y%m%d")
+        new = not (self.drop / "close.csv").exists()
+        with open(self.drop / "close.csv", "a") as f:
+            if new:
+                f.write("date,close\n")
+            f.write(f"{day},{self.close(date)}\n")
+
+    def drop_json(self, day):
+        date = datetime.strptime(day, "%Y-%m-%d")
+        write_etrade_json(self.drop / day / "TSLA.json", PATH / "chains" / f"{date:%y%m%d}.csv", self.close(date))
+
+    def trader(self, net, settings=None):
+        return PaperTrader(self.data, net, self.drop, settings or Settings(), str(self.state), str(self.journal))
+
+    def simulate(self, path, tape, inputs):
+        """ returns: the simulator and trace of the days of the feed simulated over a tape """
+        trace = SimulationTrace(3 + len(inputs))
+        simulator = Simulator(
+            TSLA, Portfolio(cash=0.0, securities={TSLA: 100}), path, tape, inputs=inputs, trace=trace
+        )
+        simulator.simulate_window(net(), simulator.window(HISTORY_END, datetime(2020, 9, 4)))
+        return simulator, trace.to_df()
+
+    def assert_simulated(self, trader, entries, simulator, simulated):
+        self.assertEqual(str(simulator.portfolio), str(trader.state.portfolio))
+        # the feed's last days
+        for entry, value in zip(entries, simulated["value"][-len(entries):]):
+            self.assertAlmostEqual(value, entry["value"])
+        inputs = simulated[[f"input_{i}" for i in range(len(entries[-1]["inputs"]))]].to_numpy()[-1]
+        for expected, actual in zip(inputs, entries[-1]["inputs"]):
+            self.assertAlmostEqual(expected, actual, places=6)
+
+    def test_days(self):
+        feed = DropDirectory(self.drop, TSLA)
+        self.drop_csv("200901")
+        self.drop_json("2020-09-03")
+        self.assertEqual(
+            [datetime(2020, 9, 1), datetime(2020, 9, 3)],
+            [date for date, _ in feed.days()]
+        )
+        self.assertEqual([datetime(2020, 9, 3)], [date for date, _ in feed.days(datetime(2020, 9, 1))])
+
+        # a chain csv is only complete once its close arrives
+        shutil.copy(PATH / "chains" / "200902.csv", self.drop / "chains")
+        self.assertIsNone(feed.load(datetime(2020, 9, 2), self.drop / "chains" / "200902.csv"))
+        close, chain = feed.load(datetime(2020, 9, 1), self.drop / "chains" / "200901.csv")
+        self.assertEqual(self.close(datetime(2020, 9, 1)), close)
+        self.assertEqual(datetime(2020, 9, 1), chain.date)
+
+    def test_trades_as_simulated(self):
+        self.drop_csv(CSV_DAYS[0])
+        trader = self.trader(net())
+        entries = trader.poll()
+        self.assertEqual(["2020-09-01"], [entry["date"] for entry in entries])
+        self.assertEqual("sell", entries[0]["decision"])
+        self.assertGreater(entries[0]["latency_ms"], 0)
+        self.assertEqual([], trader.poll())
+
+        # a restarted trader carries on with the same portfolio
+        sold = trader.net
+        for day in CSV_DAYS[1:]:
+            self.drop_csv(day)
+        for day in JSON_DAYS:
+            self.drop_json(day)
+        trader = self.trader(sold)
+        entries = trader.poll()
+        self.assertEqual(["2020-09-02", *JSON_DAYS], [entry["date"] for entry in entries])
+        with open(self.journal) as f:
+            self.assertEqual(4, len(f.readlines()))
+
+        # the same days simulated over the tape the data set would have
+        tape = TrainingSetGenerator(PATH).generate()
+        self.assert_simulated(trader, entries, *self.simulate(PATH, tape, Settings().inputs))
+
+    def test_trades_normalized_as_simulated(self):
+        scales = read_scales("tests/scales.csv")
+        shutil.copy("tests/scales.csv", self.data)
+        settings = Settings()
+        settings.inputs = ["close", "macd", "bb_bbh", "rsi", "iv_30"]
+        for day in CSV_DAYS:
+            self.drop_csv(day)
+        for day in JSON_DAYS:
+            self.drop_json(day)
+        trader = self.trader(net(), settings)
+        entries = trader.poll()
+        self.assertEqual(4, len(entries))
+        self.assertEqual("sell", entries[0]["decision"])
+
+        # the same days simulated over the data set normalized with the same scales
+        normalized = self.tmp / "normalized" / "TSLA"
+        (normalized / "chains").mkdir(parents=True)
+        shutil.copy(PATH / "splits.csv", normalized)
+        for day in ["200831", *CSV_DAYS, "200903", "200904"]:
+            chain = read_csv(PATH / "chains" / f"{day}.csv", CHAIN, dates=())
+            normalize_greeks(chain, scales).to_csv(normalized / "chains" / f"{day}.csv", index=False)
+        tape = TrainingSetGenerator(PATH).generate()
+        for column in tape.columns[1:]:
+            tape[column] = normalize_value(column, tape[column], scales)
+
+        self.assert_simulated(trader, entries, *self.simulate(normalized, tape, settings.inputs))
+
+    def test_watch(self):
+        async def watch():
+            trader = self.trader(net())
+            stop = asyncio.Event()
+            task = asyncio.create_task(trader.watch(0.01, stop))
+            self.drop_csv("200901")
+            for _ in range(500):
+                if trader.state.date == datetime(2020, 9, 1):
+                    break
+                await asyncio.sleep(0.01)
+            stop.set()
+            await task
+            return trader
+
+        trader = asyncio.run(watch())
+        self.assertEqual(datetime(2020, 9, 1), trader.state.date)
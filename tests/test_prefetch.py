@@ -0,0 +1,130 @@
+import threading
+import unittest
+from concurrent.futures import Future, wait
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.model import OptionChain, Portfolio
+from neatrader.settings import Settings
+from neatrader.trading import ChainCache, ChainPrefetcher, Simulator
+from pathlib import Path
+from utils import TSLA, FixedDateRangeFactory, SellOnceNet
+
+PATH = Path("tests/test_data/TSLA")
+START = datetime(2020, 7, 19)
+END = datetime(2020, 8, 22)
+
+
+class TestChainPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.cache = Simulator.chain_cache
+        Simulator.chain_cache = ChainCache()
+        self.training = read_csv(PATH / "training.csv")
+        self.prefetcher = ChainPrefetcher(2)
+
+    def tearDown(self):
+        self.prefetcher.close()
+        Simulator.chain_cache = self.cache
+
+    def simulate(self, window):
+        net = SellOnceNet()
+        net.theta = -3.2
+        net.delta = 0.32
+        simulator = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), PATH, self.training)
+        return simulator.simulate_window(net, window)
+
+    def test_most_recent_chain_date(self):
+        # 2020-08-22 is a saturday
+        self.assertEqual(datetime(2020, 8, 21), self.prefetcher.most_recent_chain_date(PATH, datetime(2020, 8, 22)))
+        self.assertEqual(datetime(2020, 8, 21), self.prefetcher.most_recent_chain_date(PATH, datetime(2020, 8, 21)))
+        self.assertIsNone(self.prefetcher.most_recent_chain_date(PATH, datetime(2000, 1, 1)))
+
+    def test_prefetched_window(self):
+        window = Simulator(TSLA, Portfolio(), PATH, self.training).window(START, END)
+        expected = self.simulate(window)
+        Simulator.chain_cache = ChainCache()
+
+        dates = [row[0] for row in window.rows] + [END]
+        futures = self.prefetcher.prefetch(PATH, TSLA, dates)
+        self.assertTrue(futures)
+        wait(futures)
+        # a second request for the same dates starts nothing
+        self.assertEqual([], self.prefetcher.prefetch(PATH, TSLA, dates))
+
+        for date in dates:
+            self.assertIsInstance(Simulator.chain_cache[(PATH, date, "tradable")], OptionChain)
+        misses = Simulator.chain_misses
+        self.assertEqual(expected, self.simulate(window))
+        self.assertEqual(misses, Simulator.chain_misses)
+
+    def test_simulators_block_on_pending_chains(self):
+        window = Simulator(TSLA, Portfolio(), PATH, self.training).window(START, END)
+        expected = self.simulate(window)
+        Simulator.chain_cache = ChainCache()
+
+        self.prefetcher.prefetch(PATH, TSLA, [row[0] for row in window.rows] + [END])
+        self.assertEqual(expected, self.simulate(window))
+
+    def test_failed_chains_are_loaded_by_simulators(self):
+        window = Simulator(TSLA, Portfolio(), PATH, self.training).window(START, END)
+        expected = self.simulate(window)
+        Simulator.chain_cache = ChainCache()
+
+        def fail(*args):
+            raise OSError("unreadable")
+        self.prefetcher._load = fail
+        with self.assertLogs("neatrader.trading.prefetch", "WARNING"):
+            wait(self.prefetcher.prefetch(PATH, TSLA, [row[0] for row in window.rows] + [END]))
+        self.assertEqual([], [chain for chain in Simulator.chain_cache.values() if isinstance(chain, Future)])
+        self.assertEqual(expected, self.simulate(window))
+
+    def test_waits_are_not_hits(self):
+        simulator = Simulator(TSLA, Portfolio(), PATH, self.training)
+        date = datetime(2020, 8, 21)
+        chain = Future()
+        Simulator.chain_cache[(PATH, date, "tradable")] = chain
+        threading.Timer(0.05, chain.set_result, ["chain"]).start()
+        hits, waits = Simulator.chain_hits, Simulator.chain_waits
+
+        self.assertEqual("chain", simulator._most_recent_chain(date))
+        self.assertEqual((hits, waits + 1), (Simulator.chain_hits, Simulator.chain_waits))
+        self.assertEqual("chain", simulator._most_recent_chain(date))
+        self.assertEqual((hits + 1, waits + 1), (Simulator.chain_hits, Simulator.chain_waits))
+
+    def test_close_drops_pending_chains(self):
+        blocker = Future()
+        self.prefetcher.executor.submit(blocker.result)
+        self.prefetcher.executor.submit(blocker.result)
+        futures = self.prefetcher.prefetch(PATH, TSLA, [datetime(2020, 8, 21)])
+        self.assertIsInstance(Simulator.chain_cache[(PATH, datetime(2020, 8, 21), "tradable")], Future)
+
+        # the running loads are waited for, the queued chain is never loaded
+        threading.Timer(0.05, blocker.set_result, [None]).start()
+        self.prefetcher.close()
+        self.assertTrue(futures[0].cancelled())
+        for chain in Simulator.chain_cache.values():
+            self.assertNotIsInstance(chain, Future)
+
+    def test_statistics_are_counted_across_threads(self):
+        misses = Simulator.chain_misses
+
+        def count():
+            for _ in range(10000):
+                Simulator.count("chain_misses")
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(misses + 40000, Simulator.chain_misses)
+
+    def test_evaluator_prefetches_next_windows(self):
+        evaluator = Evaluator(TSLA, PATH, self.training, FixedDateRangeFactory((START, END)), Settings())
+        evaluator.prefetcher = self.prefetcher
+        evaluator.prefetch_next()
+
+        self.assertEqual(1, len(evaluator.next_windows))
+        self.assertIn((PATH, datetime(2020, 8, 21), "tradable"), Simulator.chain_cache)
+        windows = evaluator.random_windows()
+        self.assertEqual(END, windows[0].end)
+        self.assertIsNone(evaluator.next_windows)
@@ -0,0 +1,90 @@
+import pickle
+import unittest
+from datetime import datetime
+from neatrader.loader import read_csv
+from neatrader.model import Portfolio
+from neatrader.profiler import PhaseProfiler, ProfileReporter
+from neatrader.trading import PruningPolicy, Simulator
+from pathlib import Path
+from utils import TSLA, SellOnceNet
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def simulate(self, profiler=None, pruning=None):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        sim = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training)
+        if profiler:
+            profiler.instrument(sim)
+        net = SellOnceNet()
+        net.theta = -3.2
+        net.delta = 0.32
+        window = sim.window(datetime(2020, 7, 19), datetime(2020, 8, 22))
+        return sim.simulate_window(net, window, pruning), len(window)
+
+    def test_instrument(self):
+        profiler = PhaseProfiler()
+        fitness, days = self.simulate(profiler)
+
+        # instrumenting does not change the outcome
+        self.assertAlmostEqual(self.simulate()[0], fitness)
+
+        summary = profiler.summary()
+        self.assertEqual(1, summary["simulate"][0])
+        self.assertEqual(days, summary["engine_eval"][0])
+        self.assertEqual(days, summary["activate"][0])
+        self.assertEqual(1, summary["search"][0])
+        self.assertEqual(1, summary["fitness"][0])
+        self.assertNotIn("window", summary)
+        self.assertGreaterEqual(summary["simulate"][1], summary["activate"][1])
+
+    def test_instrument_with_pruning(self):
+        # evaluators pass their pruning policy through the instrumented simulation
+        fitness, _ = self.simulate(PhaseProfiler(), PruningPolicy())
+        self.assertAlmostEqual(self.simulate()[0], fitness)
+
+    def test_merge_and_reset(self):
+        first = PhaseProfiler()
+        first.add("activate", 1_000, 2)
+        second = PhaseProfiler()
+        second.add("activate", 3_000, 1)
+        second.add("search", 500)
+
+        first.merge(second)
+        self.assertEqual({"activate": (3, 4e-6), "search": (1, 5e-7)}, first.summary())
+
+        first.reset()
+        self.assertEqual({}, first.summary())
+
+    def test_reporter(self):
+        training = PhaseProfiler()
+        validation = PhaseProfiler()
+        reporter = ProfileReporter(training, validation, show=False)
+
+        reporter.start_generation(0)
+        training.add("activate", 1_000)
+        validation.add("activate", 1_000)
+        reporter.post_evaluate(None, None, None, None)
+
+        reporter.start_generation(1)
+        training.add("search", 1_000)
+        reporter.post_evaluate(None, None, None, None)
+
+        self.assertEqual({"search": (1, 1e-6)}, reporter.profile())
+        self.assertEqual({"activate": (2, 2e-6)}, reporter.profile(0))
+
+    def test_reporter_history(self):
+        training = PhaseProfiler()
+        reporter = ProfileReporter(training, show=False, history=2)
+        for generation in range(3):
+            reporter.start_generation(generation)
+            training.add("activate", 1_000, generation + 1)
+            reporter.post_evaluate(None, None, None, None)
+
+        self.assertEqual([2, 3], [profile.calls["activate"] for profile in reporter.generations])
+
+        # checkpoints do not carry the collected profiles
+        restored = pickle.loads(pickle.dumps(reporter))
+        self.assertEqual(0, len(restored.generations))
+        self.assertEqual(2, restored.generations.maxlen)
+        self.assertEqual(2, len(reporter.generations))
@@ -0,0 +1,91 @@
+import math
+import unittest
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.model import Portfolio
+from neatrader.settings import Settings
+from neatrader.trading import PruningPolicy, Simulator
+from pathlib import Path
+from utils import TSLA, AlwaysSellNet, BuyAndHoldNet
+
+PATH = Path("tests/test_data/TSLA")
+START = datetime(2020, 7, 19)
+END = datetime(2020, 8, 22)
+
+
+class ScriptedEvaluator(Evaluator):
+    """ returns the fitnesses of a script instead of simulating """
+    def __init__(self, script):
+        super().__init__(TSLA, PATH, None, None, Settings())
+        self.script = iter(script)
+
+    def simulate(self, net, window, reporter=None, traces=None):
+        return next(self.script), 0
+
+
+class TestPruningPolicy(unittest.TestCase):
+    def setUp(self):
+        self.training = read_csv(PATH / "training.csv")
+        self.window = Simulator(TSLA, Portfolio(), PATH, self.training).window(START, END)
+
+    def simulate(self, portfolio, net, pruning=None):
+        simulator = Simulator(TSLA, portfolio, PATH, self.training)
+        return simulator.simulate_window(net, self.window, pruning), simulator.days_skipped
+
+    def test_min_close_after(self):
+        closes = [row[1] for row in self.window.rows]
+        self.assertEqual(min(closes[1:]), self.window.min_close_after[0])
+        self.assertEqual(closes[-1], self.window.min_close_after[-2])
+        self.assertEqual(math.inf, self.window.min_close_after[-1])
+
+    def test_frozen_portfolio_stops_with_the_same_fitness(self):
+        # cash for 50 shares can never buy 100
+        cash = 50 * max(row[1] for row in self.window.rows)
+        expected, skipped = self.simulate(Portfolio(cash=cash), BuyAndHoldNet())
+        self.assertEqual(0, skipped)
+
+        fitness, skipped = self.simulate(Portfolio(cash=cash), BuyAndHoldNet(), PruningPolicy())
+        self.assertEqual(expected, fitness)
+        self.assertEqual(len(self.window) - 1, skipped)
+
+    def test_trading_portfolio_is_not_frozen(self):
+        net = AlwaysSellNet()
+        net.theta = -3.2
+        net.delta = 0.32
+        expected, _ = self.simulate(Portfolio(cash=0, securities={TSLA: 100}), net)
+
+        fitness, skipped = self.simulate(Portfolio(cash=0, securities={TSLA: 100}), net, PruningPolicy())
+        self.assertEqual(expected, fitness)
+        self.assertEqual(0, skipped)
+
+    def test_bound(self):
+        pruning = PruningPolicy("min", threshold=0)
+        self.assertIsNone(pruning.bound([5], 3))
+        self.assertEqual(-2, pruning.bound([5, -1, -2], 3))
+
+        # the median of 3 windows needs 2 of them below threshold
+        pruning = PruningPolicy("median", threshold=0)
+        self.assertIsNone(pruning.bound([-1, 5], 3))
+        self.assertEqual(-1, pruning.bound([-1, 5, -3], 3))
+
+        # the mean can always be raised by the remaining windows
+        self.assertIsNone(PruningPolicy("mean", threshold=0).bound([-100, -100], 3))
+
+    def test_update(self):
+        pruning = PruningPolicy("min")
+        pruning.update([1, 2, 3, None, 4, 5], 0.5)
+        self.assertEqual(3, pruning.threshold)
+
+    def test_evaluator_skips_windows(self):
+        evaluator = ScriptedEvaluator([-5, 1, 2, 3])
+        evaluator.pruning = PruningPolicy("min", threshold=0)
+        windows = [self.window] * 3
+        bound = lambda fitnesses: evaluator.pruning.bound(fitnesses, len(windows))
+
+        self.assertEqual([-5, -5, -5], evaluator.simulate_genome(1, None, windows, bound))
+        self.assertEqual([1, 2, 3], evaluator.simulate_genome(2, None, windows, bound))
+        self.assertEqual(2, evaluator.simulations_skipped)
+        self.assertEqual(2 * len(self.window), evaluator.days_skipped)
+        self.assertEqual(6, evaluator.simulations)
+        self.assertEqual(4 * len(self.window), evaluator.days_simulated)
@@ -30,3 +30,40 @@ class TestQuoteService(unittest.TestCase):
         self.assertEqual(third, service.pop(TSLA))
         self.assertEqual(second, service.pop(TSLA))
         self.assertEqual(first, service.pop(TSLA))
+
+    def test_quote_per_date(self):
+        service = QuoteService()
+        service.add_quote(TSLA, Quote(100, datetime(2020, 4, 1)))
+        service.add_quote(TSLA, Quote(110, datetime(2020, 4, 1)))
+        self.assertEqual(110, service.quote(TSLA).quote)
+        self.assertEqual(1, len(service.series(TSLA)))
+
+    def test_as_of(self):
+        service = QuoteService()
+        service.add_quotes(TSLA, [
+            Quote(300, datetime(2020, 4, 6)), Quote(100, datetime(2020, 4, 1)), Quote(200, datetime(2020, 4, 3))
+        ])
+
+        self.assertIsNone(service.as_of(TSLA, datetime(2020, 3, 31)))
+        self.assertEqual(100, service.as_of(TSLA, datetime(2020, 4, 1)).quote)
+        # the weekend gets friday's quote
+        self.assertEqual(200, service.as_of(TSLA, datetime(2020, 4, 5)).quote)
+        self.assertEqual(300, service.as_of(TSLA, datetime(2021, 1, 1)).quote)
+        self.assertIsNone(service.as_of(Security("AAPL"), datetime(2020, 4, 1)))
+
+    def test_between(self):
+        service = QuoteService()
+        for day in range(1, 11):
+            service.add_quote(TSLA, Quote(day, datetime(2020, 4, day)))
+
+        quotes = service.between(TSLA, datetime(2020, 4, 3), datetime(2020, 4, 5))
+        self.assertEqual([3, 4, 5], [quote.quote for quote in quotes])
+        self.assertEqual([], service.between(TSLA, datetime(2020, 5, 1), datetime(2020, 5, 5)))
+        self.assertEqual([], service.between(Security("AAPL"), datetime(2020, 4, 1), datetime(2020, 4, 5)))
+
+    def test_load_close(self):
+        service = QuoteService()
+        service.load_close(TSLA, "tests/test_data/TSLA/close.csv")
+
+        self.assertEqual(898.1, service.as_of(TSLA, datetime(2020, 6, 1)).quote)
+        self.assertEqual(881.56, service.as_of(TSLA, datetime(2020, 6, 2, 16)).quote)
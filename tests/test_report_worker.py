@@ -0,0 +1,99 @@
+import neat
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.report_worker import ReportSnapshot, ReportWorker, render_traces
+from neatrader.reporter import TraceRecorder
+from neatrader.settings import Settings
+from neatrader.stats import StatisticsLog
+from neatrader.trading.features import MARKET_INPUTS
+from pathlib import Path
+from utils import TSLA
+
+local_dir = os.path.dirname(__file__)
+
+
+def eval_genomes(genomes, config):
+    for genome_id, genome in genomes:
+        genome.fitness = random.random() / 2
+
+
+class TestReportWorker(unittest.TestCase):
+    def setUp(self):
+        self.statistics = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.statistics)
+
+    def snapshot(self, traced=False):
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        pop = neat.Population(config)
+        pop.add_reporter(StatisticsLog(self.statistics))
+        winner = pop.run(eval_genomes, 2)
+
+        path = Path(local_dir) / "test_data" / "TSLA"
+        training = read_csv(path / "training.csv")
+        daterange = (datetime(2020, 7, 19), datetime(2020, 8, 22))
+        win_net = neat.nn.FeedForwardNetwork.create(winner, config)
+        traces = None
+        if traced:
+            evaluator = Evaluator(TSLA, path, training, None, Settings())
+            evaluator.tracer = TraceRecorder()
+            evaluator.evaluate([(winner.key, winner)], config, [evaluator.window(*daterange)])
+            traces = evaluator.tracer.get(winner.key)
+        return ReportSnapshot(
+            config, winner, win_net, self.statistics,
+            TSLA, path, MARKET_INPUTS, training, daterange, traces
+        )
+
+    def test_snapshot_only_ships_plot_window(self):
+        snapshot = self.snapshot()
+        self.assertEqual(datetime(2020, 7, 20), snapshot.training["date"].min())
+        self.assertEqual(datetime(2020, 8, 21), snapshot.training["date"].max())
+
+    def test_headless(self):
+        worker = ReportWorker(headless=True)
+        self.assertFalse(worker.submit(self.snapshot()))
+        self.assertIsNone(worker.executor)
+        worker.close()
+
+    def test_skip_if_busy(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                os.chdir(tmp)
+                snapshot = self.snapshot()
+                worker = ReportWorker()
+
+                self.assertTrue(worker.submit(snapshot))
+                self.assertFalse(worker.submit(snapshot))
+                self.assertEqual(1, worker.skipped)
+
+                worker.close()
+                self.assertTrue(os.path.exists(os.path.join(tmp, "avg_fitness.svg")))
+            finally:
+                os.chdir(cwd)
+
+    def test_render_recorded_traces(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                os.chdir(tmp)
+                snapshot = self.snapshot(traced=True)
+                self.assertEqual(1, len(snapshot.traces))
+
+                render_traces(snapshot.traces)
+                self.assertTrue(os.path.exists(os.path.join(tmp, "trades.svg")))
+            finally:
+                os.chdir(cwd)
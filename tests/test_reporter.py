@@ -0,0 +1,196 @@
+import neat
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.evaluation import Evaluator
+from neatrader.loader import read_csv
+from neatrader.model import Option, Portfolio
+from neatrader.reporter import NULL_REPORTER, SimulationTrace, TradeReporter, TraceRecorder, read_trades
+from neatrader.settings import Settings
+from neatrader.trading import PruningPolicy, Simulator
+from pathlib import Path
+from utils import TSLA, AlwaysSellNet, BuyAndHoldNet
+
+local_dir = os.path.dirname(__file__)
+
+
+class TestTradeReporter(unittest.TestCase):
+    def reporter(self):
+        call = Option(Option.CALL, TSLA, 2000, datetime(2020, 8, 21))
+        reporter = TradeReporter(genome_id=7)
+        reporter.record(pd.Timestamp("2020-07-20"), "sell", call, -1, 108.75)
+        reporter.record(datetime(2020, 8, 21), "expire", call, 1)
+        reporter.record(datetime(2020, 8, 24), "buy", TSLA, 100, 2014.2)
+        return reporter, call
+
+    def test_to_df(self):
+        reporter, call = self.reporter()
+        df = reporter.to_df()
+
+        self.assertEqual(["sell", "expire", "buy"], list(df["action"]))
+        self.assertEqual(pd.Timestamp("2020-07-20"), df["date"][0])
+        self.assertEqual([call, call, TSLA], list(df["security"]))
+        self.assertEqual([-1, 1, 100], list(df["amt"]))
+        self.assertTrue(np.isnan(df["price"][1]))
+        self.assertEqual([7, 7, 7], list(df["genome"]))
+        # securities are interned
+        self.assertEqual([call, TSLA], reporter.securities)
+        self.assertEqual([0, 0, 1], list(reporter.contracts))
+
+    def test_empty(self):
+        df = TradeReporter().to_df()
+        self.assertTrue(df.empty)
+        self.assertEqual(["date", "action", "security", "amt", "price", "genome"], list(df.columns))
+
+    def test_file_round_trip(self):
+        reporter, call = self.reporter()
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "trades.npz")
+            reporter.to_file(filename)
+            df = read_trades(filename)
+
+        expected = reporter.to_df()
+        pd.testing.assert_series_equal(expected["date"], df["date"])
+        self.assertEqual(list(expected["action"]), list(df["action"]))
+        self.assertEqual([str(call), str(call), "TSLA"], list(df["security"]))
+        self.assertEqual(list(expected["amt"]), list(df["amt"]))
+
+    def test_population_wide(self):
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        path = Path(local_dir) / "test_data" / "TSLA"
+        training = read_csv(path / "training.csv")
+        evaluator = Evaluator(TSLA, path, training, None, Settings())
+        evaluator.trade_log = TradeReporter()
+        genomes = list(neat.Population(config).population.items())[:20]
+
+        evaluator.evaluate(genomes, config, [evaluator.window(datetime(2020, 6, 1), datetime(2020, 9, 1))])
+
+        trades = evaluator.trade_log.to_df()
+        self.assertTrue(set(trades["genome"]) <= {genome_id for genome_id, _ in genomes})
+        self.assertFalse(trades.empty)
+
+    def test_null_reporter(self):
+        path = Path(local_dir) / "test_data" / "TSLA"
+        training = read_csv(path / "training.csv")
+        sim = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training)
+        self.assertIs(NULL_REPORTER, sim.reporter)
+        self.assertIs(NULL_REPORTER, sim.engine.reporter)
+
+        net = AlwaysSellNet()
+        net.delta = 0.32
+        net.theta = -3.2
+        # trades are recorded to the null reporter, which keeps nothing
+        sim.simulate(net, datetime(2020, 7, 19), datetime(2020, 8, 22))
+        self.assertIsNone(NULL_REPORTER.fitness)
+
+
+class TestSimulationTrace(unittest.TestCase):
+    def setUp(self):
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        self.config = config
+        self.path = Path(local_dir) / "test_data" / "TSLA"
+        self.training = read_csv(self.path / "training.csv")
+        self.window = Simulator(TSLA, Portfolio(), self.path, self.training).window(
+            datetime(2020, 7, 19), datetime(2020, 8, 22)
+        )
+
+    def simulate(self, net, trace=None, reporter=None, portfolio=None, pruning=None):
+        portfolio = portfolio or Portfolio(cash=0, securities={TSLA: 100})
+        simulator = Simulator(TSLA, portfolio, self.path, self.training, reporter, trace=trace)
+        return simulator.simulate_window(net, self.window, pruning)
+
+    def test_to_df(self):
+        trace = SimulationTrace(2, 1)
+        trace.record(datetime(2020, 7, 20), 100.0, 10000.0, (1.0, 2.0), (0.5,), "sell")
+        trace.record(datetime(2020, 7, 21), 101.0, 10050.0)
+
+        df = trace.to_df()
+        self.assertEqual(
+            ["date", "close", "value", "decision", "input_0", "input_1", "output_0"], list(df.columns)
+        )
+        self.assertEqual(pd.Timestamp("2020-07-21"), df["date"][1])
+        self.assertEqual("sell", df["decision"][0])
+        self.assertTrue(pd.isna(df["decision"][1]))
+        self.assertEqual(2.0, df["input_1"][0])
+        self.assertTrue(np.isnan(df["output_0"][1]))
+
+    def test_traced_simulation(self):
+        net = AlwaysSellNet()
+        net.theta = -3.2
+        net.delta = 0.32
+        reporter = TradeReporter()
+        expected = self.simulate(net, reporter=reporter)
+
+        trace = SimulationTrace(6)
+        self.assertEqual(expected, self.simulate(net, trace))
+        self.assertEqual(expected, trace.fitness)
+        self.assertEqual(len(self.window), len(trace))
+        pd.testing.assert_frame_equal(reporter.to_df(), trace.trades.to_df())
+
+        df = trace.to_df()
+        self.assertEqual([row[1] for row in self.window.rows], list(df["close"]))
+        self.assertAlmostEqual(expected, df["value"].iloc[-1] - self.window.baseline)
+        self.assertIn("sell", set(df["decision"]))
+
+    def test_pruned_simulation_is_traced_to_the_end(self):
+        cash = 50 * max(row[1] for row in self.window.rows)
+        trace = SimulationTrace(6)
+        self.simulate(BuyAndHoldNet(), trace, portfolio=Portfolio(cash=cash), pruning=PruningPolicy())
+
+        df = trace.to_df()
+        self.assertEqual(len(self.window), len(df))
+        self.assertEqual([cash] * len(df), list(df["value"]))
+        self.assertEqual(len(df) - 1, df["decision"].isna().sum())
+
+    def test_recorder_keeps_the_best(self):
+        recorder = TraceRecorder(keep=2)
+        self.assertTrue(recorder.offer(1, 5.0, ["a"]))
+        self.assertTrue(recorder.offer(2, 1.0, ["b"]))
+        self.assertTrue(recorder.offer(3, 3.0, ["c"]))
+        self.assertFalse(recorder.offer(4, 2.0, ["d"]))
+        self.assertIsNone(recorder.get(2))
+        self.assertEqual(["c"], recorder.get(3))
+
+        # a genome evaluated again keeps its best evaluation
+        self.assertFalse(recorder.offer(1, 4.0, ["e"]))
+        self.assertTrue(recorder.offer(1, 6.0, ["f"]))
+        self.assertEqual(["f"], recorder.get(1))
+
+    def test_evaluator_traces_the_best_genome(self):
+        evaluator = Evaluator(TSLA, self.path, self.training, None, Settings())
+        evaluator.tracer = TraceRecorder()
+        genomes = list(neat.Population(self.config).population.items())[:10]
+        windows = [self.window, evaluator.window(datetime(2020, 6, 1), datetime(2020, 7, 1))]
+
+        evaluator.settings.reducer = "min"
+        simulate = evaluator.simulate
+        calls = []
+
+        def counted(*args, **kwargs):
+            calls.append(args)
+            return simulate(*args, **kwargs)
+        evaluator.simulate = counted
+        evaluator.evaluate(genomes, self.config, windows)
+
+        # traces are recorded during evaluation, the best genome is not simulated again
+        self.assertEqual(len(genomes) * len(windows), len(calls))
+
+        genome_id, best = max(genomes, key=lambda genome: genome[1].fitness)
+        traces = evaluator.tracer.get(genome_id)
+        self.assertEqual([len(window) for window in windows], [len(trace) for trace in traces])
+        self.assertEqual(best.fitness, min(trace.fitness for trace in traces))
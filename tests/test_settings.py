@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+from neatrader.settings import Settings
+
+local_dir = os.path.dirname(__file__)
+
+
+class TestSettings(unittest.TestCase):
+    def test_defaults_without_section(self):
+        settings = Settings().read(os.path.join(local_dir, "test_configuration.ini"))
+        self.assertEqual(90, settings.simulation_days)
+        self.assertEqual(1, settings.windows)
+        self.assertEqual("mean", settings.reducer)
+
+    def test_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.ini")
+            with open(path, "w") as f:
+                f.write("[Neatrader]\nsimulation_days = 30\nwindows = 4\nreducer = q0.25\n")
+
+            settings = Settings().read(path)
+
+            self.assertEqual(30, settings.simulation_days)
+            self.assertEqual(4, settings.windows)
+            self.assertEqual("q0.25", settings.reducer)
+            self.assertEqual(5, settings.cv_top_k)
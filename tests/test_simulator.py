@@ -1,17 +1,21 @@
+import gc
 import pandas as pd
+import random
 import unittest
+import weakref
 from datetime import datetime
+from neatrader.loader import read_csv
 from neatrader.model import Portfolio, Option
-from neatrader.trading import Simulator
-from neatrader.utils import from_small_date
+from neatrader.reporter import TradeReporter
+from neatrader.trading import ChainCache, Simulator
 from pathlib import Path
-from utils import TSLA, BuyAndHoldNet, AlwaysSellNet, SellOnceNet
+from utils import TSLA, BuyAndHoldNet, AlwaysSellNet, SellOnceNet, RandomNet
 
 
 class TestSimulator(unittest.TestCase):
     def test_simulate_range(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
 
         sim = Simulator(TSLA, portfolio, path, training)
@@ -22,7 +26,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_days_in_range(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
 
         sim = Simulator(TSLA, portfolio, path, training)
@@ -33,7 +37,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_close_no_op(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
 
         sim = Simulator(TSLA, portfolio, path, training)
@@ -45,7 +49,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_close_short_call(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         call = Option(Option.CALL, TSLA, 420, datetime(2020, 7, 17))
         portfolio = Portfolio(cash=133535, securities={call: -1})
 
@@ -57,7 +61,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_open_short_call(self):
         path = Path("tests/test_data/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
 
         sim = Simulator(TSLA, portfolio, path, training)
@@ -76,7 +80,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_calculate_fitness(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         call = Option(Option.CALL, TSLA, 420, datetime(2020, 9, 11))
         portfolio = Portfolio(cash=10, securities={TSLA: 100, call: -1})
 
@@ -88,7 +92,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_hold_only(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
         sim = Simulator(TSLA, portfolio, path, training)
         net = BuyAndHoldNet()
@@ -101,7 +105,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_sell_and_get_assigned(self):
         path = Path("tests/test_data/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
         sim = Simulator(TSLA, portfolio, path, training)
         net = SellOnceNet()
@@ -121,7 +125,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_sell_and_expire(self):
         path = Path("tests/test_data/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=0, securities={TSLA: 100})
         sim = Simulator(TSLA, portfolio, path, training)
         net = SellOnceNet()
@@ -141,7 +145,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_expire_without_close_on_expiration(self):
         path = Path("tests/test_data/normalized/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         call = Option(Option.CALL, TSLA, 2800, datetime(2020, 7, 24))
         portfolio = Portfolio(cash=0, securities={TSLA: 100, call: -1})
         portfolio.collateral = {TSLA: 100}
@@ -154,7 +158,7 @@ class TestSimulator(unittest.TestCase):
 
     def test_buy_shares_when_all_cash(self):
         path = Path("tests/test_data/TSLA")
-        training = pd.read_csv(path / "training.csv", parse_dates=["date"], date_parser=from_small_date)
+        training = read_csv(path / "training.csv")
         portfolio = Portfolio(cash=1_000_000, securities={})
 
         sim = Simulator(TSLA, portfolio, path, training)
@@ -166,3 +170,119 @@ class TestSimulator(unittest.TestCase):
 
         self.assertAlmostEqual(85_7709, portfolio.cash, places=2)
         self.assertEqual(100, portfolio.securities[TSLA])
+
+    def test_window(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        sim = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training)
+
+        window = sim.window(datetime(2020, 8, 20), datetime(2020, 9, 1))
+
+        self.assertEqual(8, len(window))
+        self.assertEqual(pd.Timestamp("2020-8-21"), window.rows[0][0])
+        self.assertEqual({pd.Timestamp("2020-8-31"): 5}, window.splits)
+        # 9/1 close was 475.05
+        self.assertAlmostEqual(475.05 * 100, window.baseline, places=2)
+
+    def test_shared_window(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        start, end = datetime(2020, 7, 19), datetime(2020, 8, 22)
+        window = Simulator(TSLA, Portfolio(), path, training).window(start, end)
+
+        for delta in (0.9486, 0.32):
+            net = SellOnceNet()
+            net.theta = -3.2
+            net.delta = delta
+            shared = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training)
+            shared_fitness = shared.simulate_window(net, window)
+
+            net = SellOnceNet()
+            net.theta = -3.2
+            net.delta = delta
+            own = Simulator(TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training)
+            self.assertAlmostEqual(own.simulate(net, start, end), shared_fitness, places=6)
+
+    def test_chain_profiles_trade_the_same(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        window = Simulator(TSLA, Portfolio(), path, training).window(datetime(2020, 6, 1), datetime(2020, 9, 30))
+
+        results = {}
+        for profile in ("full", "calls", "tradable"):
+            random.seed(7)
+            reporter = TradeReporter()
+            sim = Simulator(
+                TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training, reporter, chain_profile=profile
+            )
+            fitness = sim.simulate_window(RandomNet(5), window)
+            results[profile] = (fitness, reporter.to_df())
+
+        fitness, trades = results["full"]
+        self.assertFalse(trades.empty)
+        for profile in ("calls", "tradable"):
+            self.assertAlmostEqual(fitness, results[profile][0], places=6)
+            pd.testing.assert_frame_equal(trades, results[profile][1])
+
+    def test_search_grid_trades_the_same(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        window = Simulator(TSLA, Portfolio(), path, training).window(datetime(2020, 6, 1), datetime(2020, 9, 30))
+
+        results = []
+        for buckets in (0, 256):
+            random.seed(3)
+            reporter = TradeReporter()
+            sim = Simulator(
+                TSLA, Portfolio(cash=0, securities={TSLA: 100}), path, training, reporter, search_buckets=buckets
+            )
+            results.append((sim.simulate_window(RandomNet(5), window), reporter.to_df()))
+
+        (exact, exact_trades), (grid, grid_trades) = results
+        self.assertTrue((exact_trades["action"] == "sell").any())
+        self.assertAlmostEqual(exact, grid, places=6)
+        pd.testing.assert_frame_equal(exact_trades, grid_trades)
+
+    def test_bounded_chain_cache(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        cache = Simulator.chain_cache
+        Simulator.chain_cache = ChainCache(2)
+        try:
+            sim = Simulator(TSLA, Portfolio(), path, training)
+            sim._most_recent_chain(datetime(2020, 8, 21))
+            sim._most_recent_chain(datetime(2020, 8, 24))
+            sim._most_recent_chain(datetime(2020, 8, 25))
+            self.assertEqual(1, Simulator.chain_cache.evictions)
+            self.assertNotIn((path, datetime(2020, 8, 21), "tradable"), Simulator.chain_cache)
+
+            # a weekend day reuses friday's cached chain rather than parsing it again
+            friday = sim._most_recent_chain(datetime(2020, 8, 21))
+            misses = Simulator.chain_misses
+            self.assertIs(friday, sim._most_recent_chain(datetime(2020, 8, 22)))
+            self.assertEqual(misses, Simulator.chain_misses)
+        finally:
+            Simulator.chain_cache = cache
+
+    def test_evicted_chains_are_collected(self):
+        path = Path("tests/test_data/TSLA")
+        training = read_csv(path / "training.csv")
+        cache = Simulator.chain_cache
+        Simulator.chain_cache = ChainCache(1)
+        try:
+            sim = Simulator(TSLA, Portfolio(), path, training)
+            chain = sim._most_recent_chain(datetime(2020, 8, 21))
+            close = 2049.98
+            # memoized lookups do not hold on to the chain
+            contract = chain.search(close, theta=-1.0, delta=0.3)
+            chain.get_price(contract)
+            chain.iv(chain.closest_expiration(30), close)
+            chain.search_grid(close, 8).search(-1.0, 0.3)
+            collected = weakref.ref(chain)
+            del chain, contract
+
+            sim._most_recent_chain(datetime(2020, 8, 24))
+            gc.collect()
+            self.assertIsNone(collected())
+        finally:
+            Simulator.chain_cache = cache
@@ -0,0 +1,115 @@
+import neat
+import numpy as np
+import os
+import random
+import tempfile
+import unittest
+from neatrader.stats import ColumnLog, StatisticsHistory, StatisticsLog
+
+local_dir = os.path.dirname(__file__)
+
+
+def eval_genomes(genomes, config):
+    for genome_id, genome in genomes:
+        genome.fitness = random.random() / 2
+
+
+def cv(genomes):
+    """ a cross validation result of the first genome """
+    genome_id, genome = genomes[0]
+    return genome_id, {genome_id: genome.fitness}
+
+
+class TestColumnLog(unittest.TestCase):
+    def test_append_and_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = ColumnLog(os.path.join(tmp, "table"), ("a", "b"))
+            self.assertEqual(0, len(log))
+            self.assertEqual(0, len(log.read()["a"]))
+
+            log.append((1, 2.5))
+            log.append((3, 4), (5, 6))
+            self.assertEqual(3, len(log))
+            np.testing.assert_array_equal([1, 3, 5], log.read()["a"])
+            np.testing.assert_array_equal([4, 6], log.read(1)["b"])
+
+    def test_interrupted_row_is_not_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = ColumnLog(tmp, ("a", "b"))
+            log.append((1, 2))
+            with open(log.path("a"), "ab") as f:
+                np.asarray([3.0], dtype="<f8").tofile(f)
+            self.assertEqual(1, len(log))
+            self.assertEqual([1], list(log.read()["a"]))
+
+
+class TestStatisticsLog(unittest.TestCase):
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+
+    def test_generations_are_logged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "statistics")
+            pop = neat.Population(self.config)
+            stats = StatisticsLog(directory)
+            reference = neat.StatisticsReporter()
+            pop.add_reporter(stats)
+            pop.add_reporter(reference)
+            pop.run(eval_genomes, 3)
+
+            history = StatisticsHistory(directory).refresh()
+            self.assertEqual([0, 1, 2], list(history.fitness["generation"]))
+            self.assertEqual([genome.fitness for genome in reference.most_fit_genomes], list(history.fitness["best"]))
+            np.testing.assert_allclose(reference.get_fitness_mean(), history.fitness["mean"])
+            np.testing.assert_allclose(reference.get_fitness_stdev(), history.fitness["stdev"])
+
+            generations, sizes = history.species_sizes()
+            self.assertEqual([0, 1, 2], list(generations))
+            np.testing.assert_array_equal(np.array(reference.get_species_sizes()), sizes)
+
+    def test_history_reads_new_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = StatisticsLog(tmp)
+            history = StatisticsHistory(tmp)
+            stats.add(1, {1: 3.0, 2: 1.0})
+            self.assertEqual([3.0], list(history.refresh().cross_validation["best"]))
+
+            stats.add(2, {1: 3.0, 2: 1.0})
+            self.assertEqual(1, len(stats.cross_validation.read(1)["best"]))
+            self.assertEqual([3.0, 1.0], list(history.refresh().cross_validation["best"]))
+            self.assertEqual([2.0, 2.0], list(history.cross_validation["mean"]))
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pop = neat.Population(self.config)
+            stats = StatisticsLog(tmp)
+            pop.add_reporter(stats)
+            pop.run(lambda genomes, config: (eval_genomes(genomes, config), stats.add(*cv(genomes))), 5)
+
+            # resumed from the checkpoint of generation 3, generations 3 and 4 are evolved again
+            pop = neat.Population(self.config)
+            pop.generation = 3
+            stats = StatisticsLog(tmp, pop.generation)
+            pop.add_reporter(stats)
+            pop.run(lambda genomes, config: (eval_genomes(genomes, config), stats.add(*cv(genomes))), 2)
+
+            history = StatisticsHistory(tmp).refresh()
+            self.assertEqual([0, 1, 2, 3, 4], list(history.fitness["generation"]))
+            self.assertEqual(5, len(history.cross_validation["best"]))
+            generations, sizes = history.species_sizes()
+            self.assertTrue(sizes.sum(axis=1).all())
+
+            # a run without a checkpoint starts new logs, and only empties the files of its logs
+            other = os.path.join(tmp, "fitness", "notes.txt")
+            with open(other, "w") as f:
+                f.write("kept")
+            stats = StatisticsLog(tmp)
+            self.assertEqual(0, len(stats.fitness))
+            self.assertEqual(0, len(stats.cross_validation))
+            self.assertTrue(os.path.exists(other))
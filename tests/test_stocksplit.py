@@ -30,3 +30,7 @@ class TestStockSplitHandler(unittest.TestCase):
         self.assertEqual(-1 * 5, p.securities[new_call])
         self.assertEqual(7, contract.price)
         self.assertEqual(420 / 5, contract.strike)
+
+    def test_calendar(self):
+        ss = StockSplitHandler(Path('tests/test_data/TSLA/splits.csv'), TSLA)
+        self.assertEqual({datetime(2020, 8, 31): 5}, ss.calendar())
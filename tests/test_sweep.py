@@ -0,0 +1,97 @@
+import csv
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from configparser import ConfigParser
+from datetime import datetime
+from neatrader import sweep
+from neatrader.preprocess.synthetic import generate
+from neatrader.settings import Settings
+from neatrader.trading import Simulator
+from neatrader.universe import CROSS_VALIDATION, TRAINING
+from utils import FixedDateRangeFactory
+
+local_dir = os.path.dirname(__file__)
+CONFIG = os.path.join(local_dir, "test_configuration.ini")
+RANGES = [(datetime(2019, 2, 1), datetime(2019, 3, 1)), (datetime(2019, 3, 15), datetime(2019, 4, 15))]
+CV_RANGES = [(datetime(2019, 5, 23), datetime(2019, 6, 20))]
+
+
+class TestSweep(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        generate(cls.root, symbols=1, years=0.5, strikes=10, expirations=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_parse_space(self):
+        space = sweep.parse_space(["NEAT.pop_size=10,20", "DefaultGenome.conn_add_prob=0.1:0.9"])
+        self.assertEqual(["10", "20"], space[("NEAT", "pop_size")])
+        self.assertEqual((0.1, 0.9), space[("DefaultGenome", "conn_add_prob")])
+
+    def test_grid(self):
+        space = sweep.parse_space(["NEAT.pop_size=10,20", "DefaultGenome.node_add_prob=0.1,0.2,0.3"])
+        experiments = sweep.grid(space)
+        self.assertEqual(6, len(experiments))
+        self.assertIn({("NEAT", "pop_size"): "20", ("DefaultGenome", "node_add_prob"): "0.1"}, experiments)
+
+        with self.assertRaises(ValueError):
+            sweep.grid(sweep.parse_space(["DefaultGenome.conn_add_prob=0.1:0.9"]))
+
+    def test_sample(self):
+        space = sweep.parse_space(["NEAT.pop_size=10,20", "DefaultGenome.conn_add_prob=0.1:0.9"])
+        experiments = sweep.sample(space, 5, random.Random(0))
+        self.assertEqual(5, len(experiments))
+        for overrides in experiments:
+            self.assertIn(overrides[("NEAT", "pop_size")], ["10", "20"])
+            self.assertTrue(0.1 <= overrides[("DefaultGenome", "conn_add_prob")] <= 0.9)
+
+    def test_write_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            variant = os.path.join(tmp, "config.ini")
+            sweep.write_config(CONFIG, {("NEAT", "pop_size"): 12}, variant)
+            parser = ConfigParser()
+            parser.read(variant)
+            self.assertEqual("12", parser["NEAT"]["pop_size"])
+            self.assertEqual("0.9", parser["NEAT"]["fitness_threshold"])
+
+            with self.assertRaises(ValueError):
+                sweep.write_config(CONFIG, {("Nope", "pop_size"): 12}, variant)
+
+    def test_run_experiment(self):
+        # the experiment runs in this process rather than a worker
+        sweep._init_worker(self.root)
+        market = sweep._universe.market("SYN")
+        market.daterange_factories[TRAINING] = FixedDateRangeFactory(*RANGES)
+        market.daterange_factories[CROSS_VALIDATION] = FixedDateRangeFactory(*CV_RANGES)
+
+        max_size = Simulator.chain_cache.max_size
+        Simulator.chain_cache.max_size = 0
+        try:
+            results = sweep.run_experiment(
+                CONFIG, {("NEAT", "pop_size"): 6, ("NEAT", "fitness_threshold"): 1e9}, "SYN",
+                generations=2, cv_windows=2
+            )
+            # the worker's chain cache is bounded by the experiment's settings
+            self.assertEqual(Settings().chain_cache_size, Simulator.chain_cache.max_size)
+        finally:
+            Simulator.chain_cache.max_size = max_size
+        self.assertEqual(set(sweep.RESULTS), set(results))
+        self.assertEqual(2, results["generations"])
+        self.assertGreater(results["simulations"], 0)
+        self.assertIsNotNone(results["cv_fitness"])
+
+    def test_failed_experiments_are_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = os.path.join(tmp, "sweep.csv")
+            rows = sweep.Sweep(CONFIG, self.root, results, workers=1).run([{("Nope", "pop_size"): 6}])
+            self.assertIn("unknown config section", rows[0]["error"])
+            with open(results) as f:
+                written = list(csv.DictReader(f))
+            self.assertEqual(1, len(written))
+            self.assertEqual("6", written[0]["Nope.pop_size"])
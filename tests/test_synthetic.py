@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.model import Security
+from neatrader.preprocess import CsvImporter, SyntheticMarket
+from neatrader.preprocess.synthetic import black_scholes, generate
+from neatrader.trading import StockSplitHandler
+from pathlib import Path
+
+
+class TestSyntheticMarket(unittest.TestCase):
+    def test_layout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = SyntheticMarket("SYN", years=0.25, strikes=10, expirations=5).to_csv(tmp)
+
+            tsla = pd.read_csv("tests/test_data/TSLA/training.csv", nrows=1)
+            training = pd.read_csv(path / "training.csv")
+            cv = pd.read_csv(path / "cross_validation.csv")
+            self.assertEqual(list(tsla.columns), list(training.columns))
+            self.assertEqual(63, len(training) + len(cv))
+            self.assertEqual(63, len(list((path / "chains").glob("*.csv"))))
+
+            chain = CsvImporter().parse_chain(datetime(2019, 1, 2), Security("SYN"), path / "chains" / "190102.csv")
+            self.assertEqual(5, len(chain.calls()))
+            self.assertEqual(10, len(chain.calls()[datetime(2019, 1, 4)]))
+            contract = chain.search(100.0, theta=-0.1, delta=0.3)
+            self.assertEqual("call", contract.direction)
+            self.assertGreater(contract.strike, 100.0)
+
+    def test_seeded(self):
+        first, first_splits = SyntheticMarket(years=1, seed=1).prices()
+        second, second_splits = SyntheticMarket(years=1, seed=1).prices()
+        other, _ = SyntheticMarket(years=1, seed=2).prices()
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(first_splits, second_splits)
+        self.assertFalse(first["close"].equals(other["close"]))
+
+    def test_splits(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            market = SyntheticMarket("SYN", years=0.1, strikes=4, expirations=2, split_above=90)
+            path = market.to_csv(tmp)
+            prices, splits = market.prices()
+            self.assertEqual(1, len(splits))
+            split_date = next(iter(splits))
+            self.assertEqual(splits, StockSplitHandler(path / "splits.csv", Security("SYN")).calendar())
+            # the close reflects the split
+            self.assertEqual(20.0, prices.set_index("date")["close"][split_date])
+            self.assertTrue((prices["close"] <= 90).all())
+
+    def test_black_scholes_put_call_parity(self):
+        strike = np.array([80.0, 100.0, 120.0])
+        years = np.full(3, 0.5)
+        iv = np.full(3, 0.4)
+        call, call_delta, call_theta, vega = black_scholes(np.full(3, True), 100.0, strike, years, iv, 0.01)
+        put, put_delta, put_theta, _ = black_scholes(np.full(3, False), 100.0, strike, years, iv, 0.01)
+        np.testing.assert_allclose(call - put, 100.0 - strike * np.exp(-0.01 * 0.5))
+        np.testing.assert_allclose(call_delta - put_delta, 1.0)
+        self.assertTrue(all(call_theta < 0))
+        self.assertTrue(all(vega > 0))
+
+    def test_generate_symbols(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = generate(tmp, symbols=2, years=0.05, strikes=4, expirations=2)
+            self.assertEqual([Path(tmp) / "SYN0", Path(tmp) / "SYN1"], paths)
+            first = pd.read_csv(paths[0] / "close.csv")
+            second = pd.read_csv(paths[1] / "close.csv")
+            self.assertFalse(first["close"].equals(second["close"]))
@@ -0,0 +1,130 @@
+import neat
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from neatrader.evaluation import Evaluator, UniverseEvaluator, relative_fitness
+from neatrader.model import Portfolio
+from neatrader.preprocess.synthetic import generate
+from neatrader.settings import Settings
+from neatrader.trading import Simulator
+from neatrader.universe import CROSS_VALIDATION, TRAINING, Universe
+from utils import FixedDateRangeFactory
+
+local_dir = os.path.dirname(__file__)
+RANGES = [(datetime(2019, 2, 1), datetime(2019, 3, 1)), (datetime(2019, 3, 15), datetime(2019, 4, 15))]
+
+
+class TestUniverse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        generate(cls.root, symbols=2, years=0.5, strikes=10, expirations=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        self.settings = Settings()
+        self.settings.windows = len(RANGES)
+        random.seed(0)
+        self.genomes = list(neat.Population(self.config).population.items())[:5]
+
+    def universe(self, symbols=None):
+        universe = Universe(self.root, symbols)
+        for symbol in universe.symbols:
+            universe.market(symbol).daterange_factories[TRAINING] = FixedDateRangeFactory(*RANGES)
+        return universe
+
+    def test_symbols(self):
+        self.assertEqual(("SYN0", "SYN1"), Universe(self.root).symbols)
+        self.assertEqual(("SYN1",), Universe(self.root, ["SYN1"]).symbols)
+        with self.assertRaises(Exception):
+            Universe(self.root, ["SYN1"]).market("SYN0")
+
+    def test_tapes_are_read_when_used(self):
+        market = Universe(self.root).market("SYN0")
+        self.assertEqual({}, market.tapes)
+
+        training = market.tape()
+        self.assertIs(training, market.tape(TRAINING))
+        self.assertGreater(len(market.tape(CROSS_VALIDATION)), 0)
+        self.assertEqual({TRAINING, CROSS_VALIDATION}, set(market.tapes))
+
+    def test_tapes_read_only_the_inputs(self):
+        market = Universe(self.root, inputs=("iv_30", "rsi")).market("SYN0")
+        self.assertEqual(["date", "close", "iv_30", "rsi"], list(market.tape().columns))
+        self.assertGreater(len(Universe(self.root).market("SYN0").tape().columns), 4)
+
+    def test_sample(self):
+        universe = Universe(self.root)
+        self.assertEqual(["SYN0", "SYN1"], universe.sample())
+        self.assertEqual(1, len(universe.sample(1)))
+
+    def test_evaluate_sampled_symbols(self):
+        universe = self.universe()
+        self.settings.symbols_per_generation = 1
+        evaluator = UniverseEvaluator(universe, self.settings)
+
+        evaluator.evaluate(self.genomes, self.config)
+
+        for _, genome in self.genomes:
+            self.assertIsNotNone(genome.fitness)
+        # only the sampled symbol was simulated
+        self.assertEqual(1, len(evaluator.evaluators))
+        self.assertEqual(len(self.genomes) * len(RANGES), evaluator.simulations)
+        self.assertGreater(evaluator.days_simulated, 0)
+
+    def test_fitness_reduced_over_symbols(self):
+        self.settings.reducer = "min"
+        evaluator = UniverseEvaluator(self.universe(), self.settings)
+        evaluator.evaluate(self.genomes, self.config)
+        fitness = {genome_id: genome.fitness for genome_id, genome in self.genomes}
+
+        for symbol in ("SYN0", "SYN1"):
+            single = UniverseEvaluator(self.universe([symbol]), self.settings)
+            single.relative = True
+            single.evaluate(self.genomes, self.config)
+            for genome_id, genome in self.genomes:
+                self.assertLessEqual(fitness[genome_id], genome.fitness)
+        self.assertEqual(2 * len(self.genomes) * len(RANGES), evaluator.simulations)
+
+    def test_relative_fitness(self):
+        self.assertTrue(UniverseEvaluator(self.universe(), self.settings).relative)
+        self.assertFalse(UniverseEvaluator(self.universe(["SYN0"]), self.settings).relative)
+
+        evaluator = UniverseEvaluator(self.universe(), self.settings)
+        windows = [evaluator.evaluator("SYN0").window(start, end) for start, end in RANGES]
+        fitnesses = relative_fitness([1.0, 2.0], windows)
+        for fitness, expected, window in zip(fitnesses, [1.0, 2.0], windows):
+            self.assertAlmostEqual(expected, fitness * window.baseline)
+
+    def test_single_symbol_matches_evaluator(self):
+        evaluator = UniverseEvaluator(self.universe(["SYN0"]), self.settings)
+        evaluator.evaluate(self.genomes, self.config)
+        expected = {genome_id: genome.fitness for genome_id, genome in self.genomes}
+
+        market = Universe(self.root).market("SYN0")
+        single = Evaluator(market.security, market.path, market.tape(), FixedDateRangeFactory(*RANGES), self.settings)
+        single.evaluate(self.genomes, self.config)
+        self.assertEqual(expected, {genome_id: genome.fitness for genome_id, genome in self.genomes})
+
+    def test_chains_are_cached_per_symbol(self):
+        universe = Universe(self.root)
+        date = datetime(2019, 1, 2)
+        chains = []
+        for symbol in universe.symbols:
+            market = universe.market(symbol)
+            simulator = Simulator(market.security, Portfolio(), market.path, market.tape())
+            chains.append(simulator._most_recent_chain(date))
+        self.assertEqual(["SYN0", "SYN1"], [chain.security.symbol for chain in chains])
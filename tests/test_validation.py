@@ -0,0 +1,77 @@
+import neat
+import os
+import unittest
+from datetime import datetime
+from neatrader.loader import read_csv
+from neatrader.model import Portfolio
+from neatrader.profiler import PhaseProfiler
+from neatrader.trading import Simulator
+from neatrader.validation import CrossValidator
+from pathlib import Path
+from utils import TSLA, FixedDateRangeFactory
+
+local_dir = os.path.dirname(__file__)
+RANGE = (datetime(2020, 9, 4), datetime(2020, 9, 25))
+
+
+class TestCrossValidator(unittest.TestCase):
+    def setUp(self):
+        self.config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            os.path.join(local_dir, "test_configuration.ini")
+        )
+        self.path = Path(local_dir) / "test_data" / "TSLA"
+        self.tape = read_csv(self.path / "cross_validation.csv")
+        self.genomes = list(neat.Population(self.config).population.items())[:10]
+        for i, (genome_id, genome) in enumerate(self.genomes):
+            genome.fitness = i
+
+    def test_scores_top_k(self):
+        validator = CrossValidator(TSLA, self.path, self.tape, FixedDateRangeFactory(RANGE), 21, top_k=3, workers=2)
+        try:
+            validator.submit(self.genomes, self.config)
+            validator.flush()
+        finally:
+            validator.close()
+
+        scored = [genome for _, genome in self.genomes if hasattr(genome, "cv_fitness")]
+        self.assertEqual([9, 8, 7], sorted((genome.fitness for genome in scored), reverse=True))
+        self.assertEqual(1, len(validator.statistics.generation_statistics))
+        self.assertEqual(3, len(validator.statistics.generation_statistics[0]))
+
+        best_id, best = self.genomes[-1]
+        self.assertEqual(best.cv_fitness, validator.statistics.best_fitness[0])
+
+        # the worker's score matches an in process simulation
+        net = neat.nn.FeedForwardNetwork.create(best, self.config)
+        sim = Simulator(TSLA, Portfolio(cash=0.0, securities={TSLA: 100}), self.path, self.tape)
+        start, end = RANGE
+        self.assertAlmostEqual(sim.simulate(net, start, end), best.cv_fitness)
+
+    def test_profile(self):
+        validator = CrossValidator(TSLA, self.path, self.tape, FixedDateRangeFactory(RANGE), 21, top_k=3, workers=2)
+        validator.profiler = PhaseProfiler()
+        try:
+            validator.submit(self.genomes, self.config)
+            validator.flush()
+        finally:
+            validator.close()
+
+        summary = validator.profiler.summary()
+        # one window per worker
+        self.assertEqual(2, summary["window"][0])
+        self.assertEqual(3, summary["simulate"][0])
+
+    def test_submit_collects_previous_generation(self):
+        validator = CrossValidator(TSLA, self.path, self.tape, FixedDateRangeFactory(RANGE), 21, top_k=1)
+        try:
+            validator.submit(self.genomes, self.config)
+            validator.submit(self.genomes, self.config)
+            self.assertEqual(1, len(validator.statistics.best_fitness))
+        finally:
+            validator.close()
+        self.assertEqual(2, len(validator.statistics.best_fitness))
+        self.assertEqual(2, len(validator.statistics.get_fitness_mean()))
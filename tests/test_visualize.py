@@ -3,12 +3,14 @@ import unittest
 import neat
 import random
 import pandas as pd
+import tempfile
 import neatrader.visualize as vis
 from neatrader.reporter import TradeReporter
 from neatrader.model import Portfolio
 from neatrader.utils import from_small_date
 from neatrader.trading import Simulator
 from neatrader.daterange import DateRangeFactory
+from neatrader.stats import StatisticsHistory, StatisticsLog
 from pathlib import Path
 from utils import RandomNet, TSLA
 
@@ -33,18 +35,23 @@ class TestVisualize(unittest.TestCase):
         return neat.Population(config)
 
     def test_plot_without_crossover(self):
-        pop = self.load_pop()
-        stats = neat.StatisticsReporter()
-        pop.add_reporter(stats)
-        pop.run(eval_genomes, 10)
-        vis.plot_stats(stats, view=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            pop = self.load_pop()
+            pop.add_reporter(StatisticsLog(tmp))
+            pop.run(eval_genomes, 10)
+            history = StatisticsHistory(tmp).refresh()
+            vis.plot_stats(history, view=False)
+            vis.plot_species(history, view=False)
 
     def test_plot_with_crossover(self):
-        pop = self.load_pop()
-        stats = neat.StatisticsReporter()
-        pop.add_reporter(stats)
-        pop.run(eval_genomes, 10)
-        vis.plot_stats(stats, view=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            pop = self.load_pop()
+            stats = StatisticsLog(tmp)
+            pop.add_reporter(stats)
+            pop.run(eval_genomes, 10)
+            for _ in range(9):
+                stats.add(0, {0: random.random(), 1: random.random()})
+            vis.plot_stats(StatisticsHistory(tmp).refresh(), view=False)
 
     def test_plot_trades(self):
         net = RandomNet(5)
@@ -6,6 +6,17 @@ from neatrader.model import Security
 TSLA = Security('TSLA')
 
 
+class FixedDateRangeFactory:
+    """ hands out the given (start, end) ranges in turn instead of random ones """
+    def __init__(self, *ranges):
+        self.ranges = ranges
+        self.i = 0
+
+    def random_date_range(self, days):
+        self.i += 1
+        return self.ranges[(self.i - 1) % len(self.ranges)]
+
+
 def fetch_resource(resource_name=None):
     local_dir = os.path.dirname(__file__)
     if not resource_name: